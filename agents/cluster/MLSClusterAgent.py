@@ -20,6 +20,7 @@ from copy import deepcopy
 
 import mlsysops
 from mlsysops.agent import MLSAgent
+from mlsysops.data.dict_diff import VersionedDict
 
 from mlsysops.logger_util import logger
 import copy
@@ -34,6 +35,10 @@ class MLSClusterAgent(MLSAgent):
 
         self.nodes_state = {}
 
+        # Versioned copies of what was last synchronised with each node
+        self.node_descriptions = {}
+        self.nodes_state_sync = {}
+
     async def run(self):
         """
         Main process of the MLSAgent.
@@ -107,10 +112,31 @@ class MLSClusterAgent(MLSAgent):
                         self.telemetry_controller.remove_otel_configuration(data['node'])
                     case mlsysops.events.MessageEvents.NODE_SYSTEM_DESCRIPTION_SUBMITTED.value:
                         logger.debug(f"Received {mlsysops.events.MessageEvents.NODE_SYSTEM_DESCRIPTION_SUBMITTED.value} from spade")
+                        if 'snapshot' in data:
+                            node_description = self.node_descriptions.setdefault(data['node'], VersionedDict())
+                            node_description.receive(data)
+                            data = copy.deepcopy(node_description.snapshot)
                         await self.state.active_mechanisms["fluidity"]['module'].send_message({
                             "event": mlsysops.events.MessageEvents.NODE_SYSTEM_DESCRIPTION_SUBMITTED.value,
                             "payload": data
                         })
+                    case mlsysops.events.MessageEvents.NODE_SYSTEM_DESCRIPTION_DELTA.value:
+                        node_description = self.node_descriptions.get(data['node'])
+                        if node_description is None or not node_description.receive(data):
+                            version = node_description.version if node_description else None
+                            logger.debug(f"Description delta of {data['node']} does not match version {version}, requesting snapshot")
+                            await self.send_message_to_node(
+                                data['node'],
+                                MessageEvents.NODE_SYSTEM_DESCRIPTION_RESYNC.value,
+                                {"version": version})
+                            continue
+                        await self.state.active_mechanisms["fluidity"]['module'].send_message({
+                            "event": mlsysops.events.MessageEvents.NODE_SYSTEM_DESCRIPTION_DELTA.value,
+                            "payload": {
+                                "delta": data['delta'],
+                                "description": copy.deepcopy(node_description.snapshot)
+                            }
+                        })
 
                     case mlsysops.events.MessageEvents.MESSAGE_TO_FLUIDITY.value:
                         await self.mechanisms_controller.queues['fluidity']['outbound'].put({
@@ -124,11 +150,15 @@ class MLSClusterAgent(MLSAgent):
                         logger.debug(f"Received node exporter remove msg from node")
                         self.telemetry_controller.remote_remove_node_exporter_pod(data['node'])
                     case mlsysops.events.MessageEvents.NODE_STATE_SYNC.value:
-                        # logger.debug(f"Going to send {self.nodes_state[data['node']]} to node {data['node']}")
+                        # Only the changed paths are sent if the node holds the last version sent
+                        node_state_sync = self.nodes_state_sync.setdefault(data['node'], VersionedDict())
+                        sync_message = node_state_sync.diff(self.nodes_state.get(data['node'], {}), data.get('version'))
+                        if sync_message is None:
+                            continue
                         await self.send_message_to_node(
                             data['node'],
                             MessageEvents.NODE_STATE_SYNC.value,
-                            self.nodes_state[data['node']])
+                            sync_message)
                     case _:
                         logger.error(f"Unhandled event type: {event}")
 
@@ -136,6 +166,20 @@ class MLSClusterAgent(MLSAgent):
                 logger.error(f"Error processing message in message_queue_listener: {e}")
         logger.debug("Started Message Queue Listener...")
 
+    @staticmethod
+    def fluidity_proxy_outbox_key(msg):
+        """
+        Outbox key of a message to a node fluidity proxy, from the application,
+        component and operation the fluidity mechanism attaches to it: each plan
+        outcome is kept, while a newer state update of a component supersedes the
+        previous one.
+        """
+        key = f"fluidity_proxy:{msg.get('app')}:{msg.get('component')}:{msg.get('operation')}"
+        if msg.get("operation") == MessageEvents.FLUIDITY_INTERNAL_PLAN_UPDATE.value:
+            plan_uid = msg.get("payload", {}).get("payload", {}).get("payload", {}).get("plan_uid")
+            key += f":{plan_uid}"
+        return key
+
     async def fluidity_message_listener(self):
         """
         An asynchronous function that listens for incoming fluidity messages and handles events accordingly. This function operates
@@ -303,7 +347,8 @@ class MLSClusterAgent(MLSAgent):
                                         await self.send_message_to_node(
                                             node_name_spec_changed,
                                             MessageEvents.COMPONENT_UPDATED.value,
-                                            send_msg)
+                                            send_msg,
+                                            outbox_key=f"component:{application_name}:{component_name_in_plan}")
 
                                     # Failed do nothing
                                 elif component_action['action'] in ['move', 'deploy', 'remove']:
@@ -321,7 +366,8 @@ class MLSClusterAgent(MLSAgent):
                                                 await self.send_message_to_node(
                                                     node_name_removed,
                                                     MessageEvents.COMPONENT_REMOVED.value,
-                                                    send_msg)
+                                                    send_msg,
+                                                    outbox_key=f"component:{application_name}:{component_name}")
 
                                                 # remove from local state
                                                 del self.nodes_state[node_name_removed][application_name]['components'][component_name]
@@ -361,11 +407,13 @@ class MLSClusterAgent(MLSAgent):
                                             await self.send_message_to_node(
                                                 node_name_placed,
                                                 MessageEvents.COMPONENT_PLACED.value,
-                                                send_msg)
+                                                send_msg,
+                                                outbox_key=f"component:{application_name}:{component_name}")
                     case MessageEvents.MESSAGE_TO_FLUIDITY_PROXY.value:
                         # forward to node
                         logger.debug(f"Received {event} from fluidity proxy to node {msg['node']}")
-                        await self.send_message_to_node(msg['node'],event,data)
+                        await self.send_message_to_node(msg['node'], event, data,
+                                                        outbox_key=self.fluidity_proxy_outbox_key(msg))
                     case _:
                         logger.debug(f"Unknown event: Received payload from fluidity: {data}")
                         if data and 'hostname' in data:
@@ -26,6 +26,38 @@ VERSION = 'v1'
 NAMESPACE = ''
 CLUSTER_ID = None
 
+#: Seconds to wait for a deleted Pod to stop running
+POD_TERMINATION_TIMEOUT = int(os.getenv('FLUIDITY_POD_TERMINATION_TIMEOUT', 60))
+#: Seconds to wait for a created Pod to start running
+POD_READY_TIMEOUT = int(os.getenv('FLUIDITY_POD_READY_TIMEOUT', 300))
+#: Maximum number of components of an application rolled out concurrently
+ROLLOUT_CONCURRENCY = int(os.getenv('FLUIDITY_ROLLOUT_CONCURRENCY', 8))
+#: Maximum number of concurrent Pod deletions when deletecollection is not allowed
+CLEANUP_CONCURRENCY = int(os.getenv('FLUIDITY_CLEANUP_CONCURRENCY', 32))
+#: Adopt the Pods of existing apps on start instead of deleting and redeploying them
+RECONCILE_ON_START = os.getenv('FLUIDITY_RECONCILE_ON_START', 'true').lower() in ('true', '1', 'yes')
+#: Maximum number of app requests (descriptions and plans) handled concurrently
+APP_HANDLER_CONCURRENCY = int(os.getenv('FLUIDITY_APP_HANDLER_CONCURRENCY', 4))
+#: Seconds an idle request shard worker waits before it exits
+APP_SHARD_IDLE_TIMEOUT = float(os.getenv('FLUIDITY_APP_SHARD_IDLE_TIMEOUT', 60))
+#: How Pods are replaced on move/change_spec: 'make_before_break' starts the new Pod
+#: and waits for it to be Ready before removing the old one, 'break_before_make' does not wait
+RELOCATION_MODE = os.getenv('FLUIDITY_RELOCATION_MODE', 'make_before_break')
+#: Seconds a drained Pod keeps running after it left the Service endpoints
+RELOCATION_DRAIN_SECONDS = float(os.getenv('FLUIDITY_RELOCATION_DRAIN_SECONDS', 2))
+#: Seconds a resource reservation of an in-flight plan is held if it is not committed
+RESERVATION_TTL = float(os.getenv('FLUIDITY_RESERVATION_TTL', 60))
+#: Seconds watch events of the same object are held to deliver only the latest
+WATCH_COALESCE_WINDOW = float(os.getenv('FLUIDITY_WATCH_COALESCE_WINDOW', 0.2))
+#: Field manager of the objects Fluidity reconciles with server-side apply
+FIELD_MANAGER = os.getenv('FLUIDITY_FIELD_MANAGER', 'fluidity')
+#: Pull the images of a moved or added component on its target nodes before creating its Pods
+PREPULL_ON_RELOCATION = os.getenv('FLUIDITY_PREPULL_ON_RELOCATION', 'true').lower() in ('true', '1', 'yes')
+#: Seconds a pre-pull may take before the Pods are created anyway (and pull the image at start)
+PREPULL_TIMEOUT = float(os.getenv('FLUIDITY_PREPULL_TIMEOUT', 60))
+#: CPU request of a warm standby replica, if the component description does not set one
+STANDBY_CPU = os.getenv('FLUIDITY_STANDBY_CPU', '100m')
+
 #: System file directory of CRDs
 _CRDS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), './manifests/templates/'))
 
@@ -66,5 +98,8 @@ mlsysops_app_dict = {
 }
 
 
+#: Annotation holding the hash of the manifest a CRD was last applied from
+CRD_HASH_ANNOTATION = 'mlsysops.eu/crd-hash'
+
 #: list: List with info regarding the supported custom resources
 CRDS_INFO_LIST = [mlsysops_node_dict, mlsysops_cluster_dict, mlsysops_app_dict]
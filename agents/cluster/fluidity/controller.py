@@ -19,7 +19,9 @@
 from __future__ import print_function
 import argparse
 import asyncio
+import contextlib
 import copy
+import hashlib
 import json
 import logging
 import os
@@ -42,13 +44,14 @@ from deepdiff import DeepDiff
 from mlsysops.data.task_log import Status
 from mlsysops import MessageEvents
 from mlsysops.logger_util import logger
-from cluster_config import CRDS_INFO_LIST, API_GROUP, VERSION
+from cluster_config import CRDS_INFO_LIST, API_GROUP, VERSION, CRD_HASH_ANNOTATION
 from objects_api import FluidityObjectsApi, FluidityApiException
 from fluidity_monitor import FluidityMonitor
+from informer import CACHE
 from util import FluidityAppInfoDict, FluidityCompInfoDict
 from objects_util import get_crd_info
 from spade_msg import PodDict, CompDict, EventDict, create_pod_dict, create_msg
-from dict_diff import DeepDiffPathApplier
+from dict_diff import DeepDiffPathApplier, compute_delta, delta_to_merge_patch
 
 
 from nodes import append_host_to_list, get_k8s_nodes, get_custom_nodes, get_mls_nodes, \
@@ -58,7 +61,10 @@ from deploy import cleanup_pods, delete_running_pods, check_for_hosts_to_delete,
                    create_adjusted_pods_and_configs, create_svc, deploy_app_pods_and_configs, \
                    deploy_new_pods, create_pod_object, extend_pod_label_template, \
                    extend_pod_env_template, create_svc_object, create_svc_manifest, \
-                   create_pod_manifest, change_comp_spec, validate_host
+                   create_pod_manifest, change_comp_spec, validate_host, gate_relocation, \
+                   annotate_template_hash, adopt_app_pods, mark_adopted_instances, remove_pod_instance, \
+                   forget_applied, prepull_images, prewarm_images, cleanup_prepull_pods, place_standby, \
+                   promote_standby, standby_info, close_api_client, TEMPLATES
 
 
 def check_diff(d1, d2):
@@ -190,6 +196,22 @@ def load_custom_resource(filepath):
         data = yaml.safe_load(f)
     return data
 
+async def get_app_names():
+    """Names of the existing MLSysOpsApp CRs, None if they cannot be listed."""
+    informer = CACHE.cr('mlsysopsapps')
+    if informer is not None:
+        return [app['metadata']['name'] for app in informer.list()]
+
+    co_api = kubernetes_asyncio.client.CustomObjectsApi()
+    try:
+        resp = await co_api.list_namespaced_custom_object(group=API_GROUP, version=VERSION,
+                                                          namespace=cluster_config.NAMESPACE,
+                                                          plural='mlsysopsapps')
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        logger.error('Failed to list mlsysopsapps: %s', exc)
+        return None
+    return [app['metadata']['name'] for app in resp['items']]
+
 def create_cr(cr_dict, cr_kind):
     # Create the API client for Custom Resources
     api = client.CustomObjectsApi()
@@ -218,30 +240,34 @@ def create_cr(cr_dict, cr_kind):
     updated_dict.update(cr_dict)
     logger.info(f'Updated dict {updated_dict}')
     
-    resp = None
-    try:
-        logger.info('Trying to read cr_kind %s with name %s if already exists', cr_kind, cr_name)
-        resp = api.get_namespaced_custom_object(
-            name=cr_name,
-            group=API_GROUP,
-            version=VERSION,
-            namespace=cluster_config.NAMESPACE,
-            plural=plural)
-    except ApiException as exc:
-        if exc.status != 404:
-            logger.error('Unknown error reading service: %s', exc)
-            return None
-    if resp:
+    informer = CACHE.cr(plural)
+    resp = informer.get(cr_name) if informer is not None else None
+    if resp is None:
+        # Not cached yet, it may have just been created
         try:
-            logger.info('Trying to delete cr %s as it already exists', cr_name)
-            resp = api.delete_namespaced_custom_object(
+            logger.info('Trying to read cr_kind %s with name %s if already exists', cr_kind, cr_name)
+            resp = api.get_namespaced_custom_object(
                 name=cr_name,
                 group=API_GROUP,
                 version=VERSION,
                 namespace=cluster_config.NAMESPACE,
                 plural=plural)
         except ApiException as exc:
-            logger.error('Failed to delete service: %s', exc)
+            if exc.status != 404:
+                logger.error('Unknown error reading service: %s', exc)
+                return None
+    if resp:
+        # Patch only the fields that differ instead of recreating the CR. The live
+        # fields missing from the description are diffed too, so they are removed
+        current_dict = {key: value for key, value in resp.items()
+                        if key not in ('apiVersion', 'kind', 'metadata', 'status')}
+        current_dict.update({key: resp.get(key) for key in cr_dict if key not in current_dict})
+        delta = compute_delta(current_dict, cr_dict)
+        if not delta:
+            logger.info('CR %s is up to date', cr_name)
+            return
+        patch_cr(cr_name, delta_to_merge_patch(delta, cr_dict), cr_kind)
+        return
 
     try:
         api.create_namespaced_custom_object(
@@ -256,6 +282,64 @@ def create_cr(cr_dict, cr_kind):
         logger.error('Create CR %s failed: %s', cr_kind, exc)
 
 
+def patch_cr(cr_name, patch, cr_kind):
+    """Apply a JSON merge patch to an existing MLSysOpsNode/MLSysOpsCluster CR.
+
+    Returns:
+        bool: True if patched, False otherwise (e.g. the CR does not exist).
+    """
+    api = client.CustomObjectsApi()
+
+    if cr_kind == 'MLSysOpsNode':
+        plural = "mlsysopsnodes"
+    elif cr_kind == 'MLSysOpsCluster':
+        plural = "mlsysopsclusters"
+    else:
+        logger.error('patch_cr: Invalid CR kind.')
+        return False
+
+    try:
+        api.patch_namespaced_custom_object(
+            name=cr_name,
+            group=API_GROUP,
+            version=VERSION,
+            namespace=cluster_config.NAMESPACE,
+            plural=plural,
+            body=patch,
+            _content_type='application/merge-patch+json')
+        logger.info('Custom resource %s patched with %s', cr_name, patch)
+    except ApiException as exc:
+        if exc.status != 404:
+            logger.error('Patch CR %s failed: %s', cr_kind, exc)
+        return False
+    return True
+
+
+def apply_description_delta(delta, description):
+    """Patch the CRs of a system description with the paths changed by delta.
+
+    Args:
+        delta (dict): Changed paths, as produced by compute_delta.
+        description (dict): The full description after the delta was applied,
+            used to create a CR that does not exist yet.
+    """
+    patch = delta_to_merge_patch(delta, description)
+    for cr_kind, cr_patch in patch.items():
+        cr_dict = description.get(cr_kind)
+        if not isinstance(cr_dict, dict):
+            continue
+        if cr_kind == 'MLSysOpsNode':
+            cr_name = cr_dict.get("name", "")
+            cr_patch.pop("name", None)
+        else:
+            cr_name = cr_dict.get("cluster_id", "")
+        if not cr_patch:
+            continue
+        if not patch_cr(cr_name, cr_patch, cr_kind):
+            logger.info('Could not patch CR %s, creating it from the full description', cr_name)
+            create_cr(copy.deepcopy(cr_dict), cr_kind)
+
+
 def apply_cluster_description(fpath=None, file=None):
     """Apply MLSysOpsCluster CR only if it does not already exist.
     """
@@ -307,33 +391,29 @@ def apply_cluster_description(fpath=None, file=None):
     return updated_dict['metadata']['name']
 
 
-def create_mls_namespace(mls_namespace):
-    """Create MLSysOps namespace if it does not exist.
-    """
-    # Define the namespace metadata
-    namespace = client.V1Namespace(
-        metadata=client.V1ObjectMeta(name=mls_namespace)
-    )
-
-    # Create the namespace using CoreV1Api
-    v1 = client.CoreV1Api()
+async def ensure_namespace(name):
+    """Create the MLSysOps namespace if it does not exist."""
+    core_api = kubernetes_asyncio.client.CoreV1Api()
 
     try:
-        response = v1.create_namespace(body=namespace)
-    except ApiException as exc:
-        logger.error('Failed to create namespace: %s', exc)
-
-    logger.info(f"Namespace created: {response.metadata.name}")
-
-def namespace_exists(name):
-    v1 = client.CoreV1Api()
+        await core_api.read_namespace(name)
+        logger.info('Namespace already exists.')
+        return True
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        if exc.status != 404:
+            logger.error('Failed to read namespace: %s', exc)
+            return False
 
     try:
-        namespaces = v1.list_namespace().items
-    except ApiException as exc:
-        logger.error('Failed to create namespace: %s', exc)
+        await core_api.create_namespace(body={'metadata': {'name': name}})
+        logger.info(f"Namespace created: {name}")
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        # Created meanwhile by another agent
+        if exc.status != 409:
+            logger.error('Failed to create namespace: %s', exc)
+            return False
 
-    return any(ns.metadata.name == name for ns in namespaces)
+    return True
 
 def update_comp_type(app, comp_spec, type):
     logger.info('update_comp_type')
@@ -442,34 +522,76 @@ def create_node_type_dict():
     return nodes, enums[0]
 
 
-def ensure_crds():
-    """Ensure all MLSysOps CRDs are registered.
+def load_crd(crd_file):
+    """Load a CRD manifest and annotate it with the hash of its content."""
+    yaml = YAML(typ='safe')
+    with open(crd_file, 'r') as data:
+        body = yaml.load(data)
+
+    digest = hashlib.sha256(json.dumps(body, sort_keys=True, default=str).encode()).hexdigest()
+    body.setdefault('metadata', {}).setdefault('annotations', {})[CRD_HASH_ANNOTATION] = digest
+    return body, digest
 
-    Checks if the MLSysOps-related resource definitions are registered and
-    registers any missing.
+async def apply_crd(ext_api, crd_info, current_crds):
+    """Create or update an MLSysOps CRD, unless its manifest hash did not change.
+
+    Args:
+        ext_api (ApiextensionsV1Api): The API client.
+        crd_info (dict): The CRD entry of CRDS_INFO_LIST.
+        current_crds (dict): Key CRD name, value the registered CRD.
+
+    Returns:
+        str: 'unchanged', 'created', 'updated' or 'failed'.
     """
-    ext_api = client.ApiextensionsV1Api()
-    # Get the list of registered CRD names
-    current_crds = ext_api.list_custom_resource_definition().to_dict()['items']
-    current_crds_names = [x['spec']['names']['singular'] for x in current_crds]
-
-    for crd_info in CRDS_INFO_LIST:
-        if crd_info['singular'] in current_crds_names:
-            logger.info('Fluidity CRD: %s already exists', crd_info['kind'])
-        else:
-            logger.info('Creating Fluidity CRD: %s', crd_info['kind'])
-            try:
-                yaml = YAML(typ='safe')
-                with open(crd_info['crd_file'], 'r') as data:
-                    body = yaml.load(data)
-            except IOError:
-                logger.error('Resource definition not in dir %s.',
-                             crd_info['crd_file'])
-            try:
-                ext_api.create_custom_resource_definition(body)
-            except ApiException as exc:
-                logger.exception('%s update failed: %s', crd_info['kind'], exc)
-                # raise FluidityCrdsApiException from exc
+    try:
+        body, digest = await asyncio.to_thread(load_crd, crd_info['crd_file'])
+    except IOError:
+        logger.error('Resource definition not in dir %s.', crd_info['crd_file'])
+        return 'failed'
+
+    name = body['metadata']['name']
+    current = current_crds.get(name)
+    try:
+        if current is None:
+            await ext_api.create_custom_resource_definition(body)
+            return 'created'
+
+        if (current.metadata.annotations or {}).get(CRD_HASH_ANNOTATION) == digest:
+            return 'unchanged'
+
+        body['metadata']['resourceVersion'] = current.metadata.resource_version
+        await ext_api.replace_custom_resource_definition(name, body)
+        return 'updated'
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        if exc.status == 409:
+            # Written meanwhile by another agent
+            return 'unchanged'
+        logger.error('%s update failed: %s', crd_info['kind'], exc)
+        return 'failed'
+
+async def ensure_crds():
+    """Ensure all MLSysOps CRDs are registered and up to date.
+
+    The registered CRDs are listed once and the MLSysOps ones are applied
+    concurrently. A CRD is only written if it is missing or its hash annotation
+    differs from the hash of its manifest.
+
+    Returns:
+        bool: False if a CRD could not be applied.
+    """
+    ext_api = kubernetes_asyncio.client.ApiextensionsV1Api()
+    try:
+        resp = await ext_api.list_custom_resource_definition()
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        logger.error('Failed to list CRDs: %s', exc)
+        return False
+
+    current_crds = {crd.metadata.name: crd for crd in resp.items}
+    results = await asyncio.gather(*(apply_crd(ext_api, crd_info, current_crds) for crd_info in CRDS_INFO_LIST))
+    for crd_info, result in zip(CRDS_INFO_LIST, results):
+        logger.info('Fluidity CRD %s: %s', crd_info['kind'], result)
+
+    return 'failed' not in results
 
 def has_egress_relation(app_spec, comp_name):
     """
@@ -485,6 +607,33 @@ def has_egress_relation(app_spec, comp_name):
     
     return False
 
+class AppShard():
+    """Request queue of one shard of the FluidityApp handler and its statistics."""
+
+    def __init__(self, key):
+        self.key = key
+        self.queue = asyncio.Queue()
+        self.task = None
+        self.processed = 0
+        self.total_wait = 0.0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, wait, latency):
+        self.processed += 1
+        self.total_wait += wait
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def stats(self):
+        return {
+            'depth': self.queue.qsize(),
+            'processed': self.processed,
+            'avg_wait': round(self.total_wait / self.processed, 3) if self.processed else 0.0,
+            'avg_latency': round(self.total_latency / self.processed, 3) if self.processed else 0.0,
+            'max_latency': round(self.max_latency, 3),
+        }
+
 class FluidityAppController():
     """Controller of FluidityApp objects."""
 
@@ -501,6 +650,8 @@ class FluidityAppController():
         self.__app_handler_task = None #: FluidityApp request handler task
         self._system_monitor_task = None #: FluidityMonitor request handler task
         self._app_monitor_thr_dict = {}
+        self._shards = {} #: Key shard key - value AppShard of the active request workers
+        self._handler_slots = None #: Bounds the requests handled concurrently
 
     async def _mls_inbound_monitor(self):
         """Monitor MLSysOps inbound queue for messages."""
@@ -521,6 +672,11 @@ class FluidityAppController():
                         create_cr(data[cr_entry], cr_entry)
                     continue
 
+                if event == MessageEvents.NODE_SYSTEM_DESCRIPTION_DELTA.value:
+                    logger.debug(f"Received node system CR delta")
+                    apply_description_delta(data['delta'], data['description'])
+                    continue
+
                 name = data.get("name")
 
                 if event is None or data is None or name is None:
@@ -569,10 +725,25 @@ class FluidityAppController():
         NOTE: The lists keep cached data and should be retrieved/updated
         whenever a action to the respective objects is required.
         """
-        
-        # Clean-up old pods
-        cleanup_pods()
+        phases = {}
+        started = time.perf_counter()
+        if cluster_config.RECONCILE_ON_START:
+            # Start the shared cache of nodes, pods and MLSysOps CRs
+            await CACHE.start()
+            # Keep the Pods of existing apps, they are adopted when the app is added
+            app_names = await get_app_names()
+            if app_names is not None:
+                await cleanup_pods(keep_apps=app_names)
+        else:
+            # Clean-up old pods
+            await cleanup_pods()
+            # Start the shared cache of nodes, pods and MLSysOps CRs
+            await CACHE.start()
+        await cleanup_prepull_pods()
+        phases['pods_and_cache'] = time.perf_counter() - started
+
         # Initialize infrastructure-related dicts
+        started = time.perf_counter()
         self.nodes, self.type_list = create_node_type_dict()
         self.constraints = get_description_constraints()
 
@@ -585,6 +756,9 @@ class FluidityAppController():
         for type in self.nodes['mlsysops']:
             self.nodes['mlsysops'][type] = get_mls_nodes('mlsysopsnodes', type)
         
+        phases['nodes'] = time.perf_counter() - started
+        logger.info('Setup phase latency (s): %s', {phase: round(duration, 3) for phase, duration in phases.items()})
+
         # Create fluidity monitor task and insert it to the list
         self._system_monitor_task = FluidityMonitor(self.notification_queue)
         asyncio.create_task(self._system_monitor_task.run())
@@ -592,7 +766,10 @@ class FluidityAppController():
         self.mls_inbound_monitor_task = asyncio.create_task(self._mls_inbound_monitor())
         # Start application description watcher
         control_task = asyncio.create_task(self.watch_app())
-        await control_task
+        try:
+            await control_task
+        finally:
+            await close_api_client()
 
     async def watch_app(self):
         """MLSysOpsApp controller.
@@ -629,203 +806,267 @@ class FluidityAppController():
         except asyncio.CancelledError:
             logger.info("Watcher task cancelled cleanly.")
 
-    async def _app_handler(self):
-        """FluidityApp handler thread.
+    @staticmethod
+    def _shard_key(req):
+        """Key of the shard serving a request: the application name for app
+        descriptions and plans, the resource kind for the rest of the events."""
+        payload = req.get('payload') or {}
+        name = payload.get('name')
+        if not name:
+            return None
+        if req.get('origin') == 'spade' or payload.get('resource') == 'mlsysopsapps':
+            return f'app:{name}'
+        return f"resource:{payload.get('resource')}"
 
-        Receives application deployment requests through the
-        :py:attr:`~notification_queue` and serves them one at a time by invoking
-        the respective handling method. It exits in case the abort event is set.
+    async def _app_handler(self):
+        """FluidityApp request dispatcher.
+
+        Receives requests through the :py:attr:`~notification_queue` and routes
+        them to one worker per shard (see :py:meth:`_shard_key`). Requests of the
+        same application are served in order, requests of different applications
+        concurrently, with at most ``cluster_config.APP_HANDLER_CONCURRENCY``
+        app requests handled at a time. Resource shards (node and CR events) do
+        not take a slot, so they are not held up by plans waiting for Pods to
+        become ready or for images to be pulled. Idle shard workers exit.
         """
         logger.info('AppHandler thread started')
+        self._handler_slots = asyncio.Semaphore(cluster_config.APP_HANDLER_CONCURRENCY)
         while True:
             try:
                 req = await self.notification_queue.get()
-                # logger.debug('App handler received %s', req['operation'])
-                plan_uid = None
-                agent_msg = {}
-                status = None
-                comp_dict = None
-                uid = None
-                spec = None
-                origin = req.get("origin")
-                payload = req.get("payload", None)
-                if not payload:
+                key = self._shard_key(req)
+                if key is None:
                     continue
 
-                name = payload.get("name", None)
-                if not name:
-                    continue
-                
-                # logger.debug(f'origin is {origin}')
-                
-                # From internal Fluidity watchers
-                if origin == 'internal':
-                    uid = payload.get("uid", None)
-                    spec = payload.get("spec", None)
-                    resource = payload.get("resource", None)
-                # From spade agent
-                elif origin == 'spade':
-                    plan = payload.get("deployment_plan", None)
-                    plan_uid = payload.get("plan_uid")
-
-                    if not plan or list(plan.keys()) == ['initial_plan']:
-                        logger.info('Plan does not have the correct format.')
-                        continue
-
-                    initial_plan = plan.get("initial_plan", None)
-                    if initial_plan == None:
-                        logger.info('initial_plan is None. Going to continue')
-                        continue
+                shard = self._shards.get(key)
+                if shard is None:
+                    shard = AppShard(key)
+                    self._shards[key] = shard
+                    shard.task = asyncio.create_task(self._shard_worker(shard))
+                shard.queue.put_nowait((time.perf_counter(), req))
+            except Exception as e:
+                logger.exception("Error dispatching app request: %s", e)
 
-                    if name in self.apps_dict:
-                        uid = self.apps_dict[name]['uid']
-                        spec = self.apps_dict[name]['spec']
-
-                match req['operation']:
-                    case 'ADDED':
-                        match resource:
-                            case 'mlsysopsapps':
-                                await self._handle_add_app(name, spec, uid)
-                                event = MessageEvents.APP_CREATED.value
-                            case 'mlsysopsnodes' | 'Node':
-                                # Add the respective entry
-                                update_resource(name, spec, resource, self.nodes)
-                            case 'Pod' | 'mlsysopsclusters':
-                                pass
-                            case _:
-                                logger.error(f"Caught unknown event (ignored)")
-                                continue
-                    case 'MODIFIED':
-                        match resource:
-                            case 'mlsysopsapps':
-                                res, comp_dict = await self._handle_upd_app(name, spec)
-                                if res:
-                                    status = Status.COMPLETED.value
-                                else:
-                                    status = Status.FAILED.value
+    async def _shard_worker(self, shard):
+        """Serve the requests of a shard one at a time."""
+        while True:
+            try:
+                enqueued_at, req = await asyncio.wait_for(shard.queue.get(),
+                                                          cluster_config.APP_SHARD_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                if shard.queue.empty():
+                    self._shards.pop(shard.key, None)
+                    return
+                continue
+
+            slot = self._handler_slots if shard.key.startswith('app:') else contextlib.nullcontext()
+            async with slot:
+                started = time.perf_counter()
+                try:
+                    await self._handle_request(req)
+                except Exception as e:
+                    logger.exception("Error handling app request: %s", e)
+                shard.record(started - enqueued_at, time.perf_counter() - started)
+            logger.debug('Shard %s: %s', shard.key, shard.stats())
+
+    def shard_stats(self):
+        """Queue depth and latency statistics of the active shards."""
+        return {key: shard.stats() for key, shard in self._shards.items()}
+
+    async def _handle_request(self, req):
+        """Handle one request by invoking the respective handling method and
+        forward the reply (or the event itself) to the MLSysOps agent."""
+        # logger.debug('App handler received %s', req['operation'])
+        plan_uid = None
+        agent_msg = {}
+        status = None
+        comp_dict = None
+        uid = None
+        spec = None
+        resource = None
+        origin = req.get("origin")
+        payload = req.get("payload", None)
+        if not payload:
+            return
+
+        name = payload.get("name", None)
+        if not name:
+            return
+
+        # logger.debug(f'origin is {origin}')
+
+        # From internal Fluidity watchers
+        if origin == 'internal':
+            uid = payload.get("uid", None)
+            spec = payload.get("spec", None)
+            resource = payload.get("resource", None)
+        # From spade agent
+        elif origin == 'spade':
+            plan = payload.get("deployment_plan", None)
+            plan_uid = payload.get("plan_uid")
+
+            if not plan or list(plan.keys()) == ['initial_plan']:
+                logger.info('Plan does not have the correct format.')
+                return
+
+            initial_plan = plan.get("initial_plan", None)
+            if initial_plan == None:
+                logger.info('initial_plan is None. Going to continue')
+                return
+
+            if name in self.apps_dict:
+                uid = self.apps_dict[name]['uid']
+                spec = self.apps_dict[name]['spec']
+
+        match req['operation']:
+            case 'ADDED':
+                match resource:
+                    case 'mlsysopsapps':
+                        await self._handle_add_app(name, spec, uid)
+                        event = MessageEvents.APP_CREATED.value
+                    case 'mlsysopsnodes' | 'Node':
+                        # Add the respective entry
+                        update_resource(name, spec, resource, self.nodes)
+                    case 'Pod' | 'mlsysopsclusters':
+                        pass
+                    case _:
+                        logger.error(f"Caught unknown event (ignored)")
+                        return
+            case 'MODIFIED':
+                match resource:
+                    case 'mlsysopsapps':
+                        res, comp_dict = await self._handle_upd_app(name, spec)
+                        if res:
+                            status = Status.COMPLETED.value
+                        else:
+                            status = Status.FAILED.value
+
+                        event = MessageEvents.APP_UPDATED.value
+                    case 'mlsysopsnodes' | 'Node':
+                        # Add the respective entry
+                        update_resource(name, spec, resource, self.nodes)
+                    case 'Pod' | 'mlsysopsclusters':
+                        pass
+                    case _:
+                        logger.error(f"Caught unknown event (ignored)")
+                        return
+            case 'DELETED':
+                match resource:
+                    case 'mlsysopsapps':
+                        res = await self._handle_rm_app(name, spec)
+                        if res:
+                            status = Status.COMPLETED.value
+                        else:
+                            status = Status.FAILED.value
+
+                        event = MessageEvents.APP_DELETED.value
+                    case 'mlsysopsnodes' | 'Node':
+                        # Add the respective entry
+                        delete_resource(name, spec, resource, self.nodes)
+                    case 'Pod' | 'mlsysopsclusters':
+                        pass
+                    case _:
+                        logger.error(f"Caught unknown event (ignored)")
+                        return
+            case MessageEvents.PLAN_SUBMITTED.value:
 
-                                event = MessageEvents.APP_UPDATED.value
-                            case 'mlsysopsnodes' | 'Node':
-                                # Add the respective entry
-                                update_resource(name, spec, resource, self.nodes)
-                            case 'Pod' | 'mlsysopsclusters':
-                                pass
-                            case _:
-                                logger.error(f"Caught unknown event (ignored)")
-                                continue
-                    case 'DELETED':
-                        match resource:
-                            case 'mlsysopsapps':
-                                res = await self._handle_rm_app(name, spec)
-                                if res:
-                                    status = Status.COMPLETED.value
-                                else:
-                                    status = Status.FAILED.value
+                if not plan_uid:
+                    logger.error(f"Plan submitted without a plan uid, ignoring.")
+                    return
 
-                                event = MessageEvents.APP_DELETED.value
-                            case 'mlsysopsnodes' | 'Node':
-                                # Add the respective entry
-                                delete_resource(name, spec, resource, self.nodes)
-                            case 'Pod' | 'mlsysopsclusters':
-                                pass
-                            case _:
-                                logger.error(f"Caught unknown event (ignored)")
-                                continue
-                    case MessageEvents.PLAN_SUBMITTED.value:
+                if initial_plan:
+                    plan.pop('initial_plan')
 
-                        if not plan_uid:
-                            logger.error(f"Plan submitted without a plan uid, ignoring.")
+                    for comp_name in plan:
+                        if comp_name not in self.apps_dict[name]['components']:
+                            logger.error(f"Component {comp_name} not in internal app structure. Ignoring")
                             continue
 
-                        if initial_plan:
-                            plan.pop('initial_plan')
-
-                            for comp_name in plan:
-                                if comp_name not in self.apps_dict[name]['components']:
-                                    logger.error(f"Component {comp_name} not in internal app structure. Ignoring")
-                                    continue
-
-                                comp_spec = self.apps_dict[name]['components'][comp_name]
-                                for action_entry in plan[comp_name]:
-                                    if action_entry['action'] != 'deploy':
-                                        logger.error('Received action != deploy, ignoring.')
-                                        continue
-
-                                    # Validate new host
-                                    if not validate_host(comp_spec['pod_template'], comp_spec, action_entry['host'], self.nodes):
-                                        logger.error(f"Host {action_entry['host']} did not pass eligibility check")
-                                        status = Status.FAILED.value
-                                        break
-                                        
-                                    action_entry['status'] = 'PENDING'
-                            
-                            # if status is set to failed
-                            if status:
-                                comp_dict = {}
-                            else:
-                                logger.info('Created plan %s', plan)
-                                self.apps_dict[name]['curr_plan']['curr_deployment'] = plan
-
-                                deployment, comp_dict = deploy_app_pods_and_configs(self.apps_dict[name], self.nodes, plan_uid)
-                                
-                                if deployment:
-                                    status = Status.COMPLETED.value                                
-                                    await self.update_internal_structures(name)
-
-                                    if not self.apps_dict[name]['monitor_started']:
-                                        start_monitor = await self.start_monitor(name)
-
-                                        if start_monitor:
-                                            self.apps_dict[name]['monitor_started'] = True
-                                        else:
-                                            status = Status.FAILED.value
-                                else:
-                                    logger.error('Initial deployment failed.')
-                                    status = Status.FAILED.value
-                        else:
-                            # logger.debug('Received new plan request %s', plan)
-                            # logger.debug('curr plan %s', self.apps_dict[name]['curr_plan']['curr_deployment'])
-                            # Extra check so that no adaptation is made if the initial plan is not executed
-                            # for all app components 
-                            initial_deployment_pending = False
-
-                            for comp_name in self.apps_dict[name]['components']:
-                                comp_spec = self.apps_dict[name]['components'][comp_name]
-
-                                if 'hosts' not in comp_spec or comp_spec['hosts'] == []:
-                                    initial_deployment_pending = True
-                                    break
-                            
-                            if initial_deployment_pending:
-                                logger.info('Initial deployment not executed for all components - ignoring')
+                        comp_spec = self.apps_dict[name]['components'][comp_name]
+                        for action_entry in plan[comp_name]:
+                            if action_entry['action'] != 'deploy':
+                                logger.error('Received action != deploy, ignoring.')
+                                continue
+
+                            # Validate new host
+                            if not validate_host(comp_spec['pod_template'], comp_spec, action_entry['host'], self.nodes):
+                                logger.error(f"Host {action_entry['host']} did not pass eligibility check")
                                 status = Status.FAILED.value
-                            else:
-                                plan.pop('initial_plan')
-                                self.apps_dict[name]['curr_plan']['curr_deployment'] = plan
+                                break
+
+                            action_entry['status'] = 'PENDING'
+
+                        # Keep the adopted instances the plan still wants, remove the rest
+                        if self.apps_dict[name].get('adopted') and not status:
+                            for pod_name in mark_adopted_instances(comp_spec, plan[comp_name]):
+                                await remove_pod_instance(self.apps_dict[name], comp_spec, pod_name)
+
+                    # if status is set to failed
+                    if status:
+                        comp_dict = {}
+                    else:
+                        logger.info('Created plan %s', plan)
+                        self.apps_dict[name]['curr_plan']['curr_deployment'] = plan
 
-                                res, comp_dict = await self._handle_upd_app(name, spec, plan_uid)
-                                if res:
-                                    status = Status.COMPLETED.value  
+                        deployment, comp_dict = await deploy_app_pods_and_configs(self.apps_dict[name], self.nodes, plan_uid)
+
+                        if deployment:
+                            status = Status.COMPLETED.value                                
+                            self.apps_dict[name]['adopted'] = False
+                            await self.update_internal_structures(name)
+
+                            if not self.apps_dict[name]['monitor_started']:
+                                start_monitor = await self.start_monitor(name)
+
+                                if start_monitor:
+                                    self.apps_dict[name]['monitor_started'] = True
                                 else:
                                     status = Status.FAILED.value
-
-                        # This event will include one or more entries that specify individual events
-                        # for each aspect of the produced plan
-                        event = MessageEvents.PLAN_EXECUTED.value
-                        logger.test(f"|2| Fluidity executed planuid:{plan_uid} with status:{status}")
-                    case _:
-                        logger.info('AppHandler: No event in notification_queue (ignored).')
-                        continue
-                # If app desc event or spade plan request, update the reply to be sent
-                if resource == 'mlsysopsapps' or origin == 'spade':
-                    agent_msg = create_msg(name, event, app_spec=spec, status=status,
-                                           plan_uid=plan_uid, app_uid=uid, comp_dict=comp_dict)  
-                # Else if a normal event for the rest CRs or node/pods received, forward message to spade.
+                        else:
+                            logger.error('Initial deployment failed.')
+                            status = Status.FAILED.value
                 else:
-                    agent_msg = req
-                await self.mls_outbound_queue.put(agent_msg)
-            except Exception as e:
-                logger.exception("Error handling app request: %s", e)
+                    # logger.debug('Received new plan request %s', plan)
+                    # logger.debug('curr plan %s', self.apps_dict[name]['curr_plan']['curr_deployment'])
+                    # Extra check so that no adaptation is made if the initial plan is not executed
+                    # for all app components 
+                    initial_deployment_pending = False
+
+                    for comp_name in self.apps_dict[name]['components']:
+                        comp_spec = self.apps_dict[name]['components'][comp_name]
+
+                        if 'hosts' not in comp_spec or comp_spec['hosts'] == []:
+                            initial_deployment_pending = True
+                            break
+
+                    if initial_deployment_pending:
+                        logger.info('Initial deployment not executed for all components - ignoring')
+                        status = Status.FAILED.value
+                    else:
+                        plan.pop('initial_plan')
+                        self.apps_dict[name]['curr_plan']['curr_deployment'] = plan
+
+                        res, comp_dict = await self._handle_upd_app(name, spec, plan_uid)
+                        if res:
+                            status = Status.COMPLETED.value  
+                        else:
+                            status = Status.FAILED.value
+
+                # This event will include one or more entries that specify individual events
+                # for each aspect of the produced plan
+                event = MessageEvents.PLAN_EXECUTED.value
+                logger.test(f"|2| Fluidity executed planuid:{plan_uid} with status:{status}")
+            case _:
+                logger.info('AppHandler: No event in notification_queue (ignored).')
+                return
+        # If app desc event or spade plan request, update the reply to be sent
+        if resource == 'mlsysopsapps' or origin == 'spade':
+            agent_msg = create_msg(name, event, app_spec=spec, status=status,
+                                   plan_uid=plan_uid, app_uid=uid, comp_dict=comp_dict)  
+        # Else if a normal event for the rest CRs or node/pods received, forward message to spade.
+        else:
+            agent_msg = req
+        await self.mls_outbound_queue.put(agent_msg)
 
     async def _handle_add_app(self, app_name, app_spec, app_uid):
         """Handle the deployment request of a new application.
@@ -890,6 +1131,17 @@ class FluidityAppController():
             if 'qos_metrics' in component:
                 comp_spec['qos_metrics'] = component['qos_metrics']
 
+            # Warm standby replica, placed on the backup node chosen by the policy
+            standby = component.get('standby') or {}
+            if standby.get('enabled'):
+                comp_spec['standby'] = {
+                    'enabled': True,
+                    'cpu': standby.get('cpu', cluster_config.STANDBY_CPU),
+                    'memory': standby.get('memory'),
+                    'host': None,
+                    'pod_name': None
+                }
+
             # Retrieve computing resource requests/limits for Pod containers
             pod_spec = comp_spec['spec']
             for container in pod_spec['containers']:
@@ -959,7 +1211,7 @@ class FluidityAppController():
                 comp_spec['svc_object'] = obj
                 comp_spec['svc_port'] = svc_port
 
-                svc_obj = create_svc(comp_spec['svc_manifest'])
+                svc_obj = await create_svc(comp_spec['svc_manifest'])
                 if svc_obj is None:
                     logger.error('Failed to create svc with manifest %s', comp_spec['svc_manifest'])
                     return
@@ -993,10 +1245,20 @@ class FluidityAppController():
             comp_spec = app_dict['components'][comp_name]
             extend_pod_label_template(comp_spec['pod_template'], app_name,
                                     app_uid, comp_name)
+            annotate_template_hash(comp_spec['pod_template'])
+            comp_spec['template_version'] = TEMPLATES.new_version(app_spec)
             comp_spec['pod_object'] = create_pod_object(comp_spec['pod_template'])
 
         # Add new app to apps dictionary
         self.apps_dict[app_name] = app_dict
+        TEMPLATES.invalidate(app_name)
+
+        # Adopt the Pods of the app left running by a previous run
+        app_dict['adopted'] = False
+        if cluster_config.RECONCILE_ON_START and await adopt_app_pods(app_dict):
+            app_dict['adopted'] = True
+            await self.update_internal_structures(app_name)
+            app_dict['monitor_started'] = await self.start_monitor(app_name)
         
         for type in self.nodes['mlsysops']:
             nodelist = self.nodes['mlsysops'][type]
@@ -1055,6 +1317,7 @@ class FluidityAppController():
                 return False, None
             # Update the app_spec and the deployment plan
             self.apps_dict[app_name]['spec'] = new_app_spec 
+            TEMPLATES.invalidate(app_name)
             logger.debug(f'change spec from description') # new_deployment_plan {new_deployment_plan}')
         else:
             logger.info('App not modified.')
@@ -1069,6 +1332,11 @@ class FluidityAppController():
             # We must do the same translation of the change spec plan
 
         plan_dict = {}
+        phases = {}
+        # (node, Pod template) of the instances to create, their images are pulled first
+        prepull_targets = []
+        # Name of the standbys promoted by the plan, value their spec in app_copy
+        promoted = {}
 
         for comp_name in new_deployment_plan['curr_deployment']:
             comp_spec = self.apps_dict[app_name]['components'][comp_name]
@@ -1106,7 +1374,15 @@ class FluidityAppController():
                         logger.error(f"Host {move_src_host} for removal of comp {comp_name} not found.")
                         return False, {}
 
-                    append_host_to_list({'host': move_target_host, 'status': 'PENDING'}, comp_spec['hosts'])
+                    # A ready standby on the target only needs to be promoted
+                    standby_pod = (comp_spec.get('standby') or {}).get('pod_name')
+                    if await promote_standby(self.apps_dict[app_name], comp_spec, move_target_host,
+                                             plan_dict[comp_name], plan_uid):
+                        promoted[standby_pod] = app_copy['components'][comp_name]
+                        append_host_to_list({'host': move_target_host, 'status': 'ACTIVE'}, comp_spec['hosts'])
+                    else:
+                        append_host_to_list({'host': move_target_host, 'status': 'PENDING'}, comp_spec['hosts'])
+                        prepull_targets.append((move_target_host, comp_spec['pod_template']))
                     updated_hosts = True                    
                 elif action == 'deploy' or action == 'remove':
                     host = entry['host']
@@ -1119,6 +1395,7 @@ class FluidityAppController():
                         if not validate_host(comp_spec['pod_template'], comp_spec, host, self.nodes):
                             logger.error(f"Host {host} did not pass eligibility check")
                             return False, {}
+                        prepull_targets.append((host, comp_spec['pod_template']))
 
                     res = append_host_to_list({'host': host, 'status': status}, comp_spec['hosts'], remove=remove)
                     if not res:
@@ -1137,8 +1414,14 @@ class FluidityAppController():
                         logger.error(f"Host {entry['host']} did not pass eligibility check")
                         return False, {}
 
-                    result, updated_spec = change_comp_spec(self.apps_dict[app_name], entry, comp_spec,
-                                                            self.constraints, self.nodes, plan_uid)
+                    if cluster_config.PREPULL_ON_RELOCATION:
+                        started = time.perf_counter()
+                        if not await prepull_images([(entry['host'], entry['new_spec'])]):
+                            logger.error('Pre-pull failed, the new Pod pulls its images at start')
+                        phases['prepull'] = phases.get('prepull', 0) + time.perf_counter() - started
+
+                    result, updated_spec = await change_comp_spec(self.apps_dict[app_name], entry, comp_spec,
+                                                                  self.constraints, self.nodes, plan_uid)
                     
                     if not result:
                         logger.error('Pod spec modification failed')
@@ -1146,6 +1429,11 @@ class FluidityAppController():
                         return False, None
 
                     logger.info('Modified Pod specs accordingly.')
+
+                    # The standby runs the previous spec, replace it
+                    if comp_spec.get('standby') and comp_spec['standby']['pod_name']:
+                        await place_standby(self.apps_dict[app_name], comp_spec, comp_spec['standby']['host'],
+                                            replace=True)
                     # logger.debug(f'Updated spec: {updated_spec}')
 
                     plan_dict[comp_name]['specs'][updated_spec['metadata']['name']] = create_pod_dict(
@@ -1155,12 +1443,30 @@ class FluidityAppController():
                                                                                       'pod_spec': updated_spec}
                                                                                     ) 
                     # logger.debug(plan_dict[comp_name])
+                elif action == 'standby':
+                    # Place (or move, or with no host remove) the warm standby replica
+                    host = entry.get('host')
+                    if host and not validate_host(comp_spec['pod_template'], comp_spec, host, self.nodes):
+                        logger.error(f"Host {host} did not pass eligibility check")
+                        return False, {}
+
+                    if not await place_standby(self.apps_dict[app_name], comp_spec, host):
+                        logger.error(f'Standby placement of {comp_name} on {host} failed')
+                        return False, {}
+                elif action == 'prepull':
+                    # Candidate nodes of a future move, warm them without waiting
+                    hosts = entry.get('hosts') or [entry['host']]
+                    logger.info(f'Pre-pulling images of {comp_name} on candidate hosts {hosts}')
+                    prewarm_images([(candidate, comp_spec['pod_template']) for candidate in hosts])
                 else:
                     logger.error('Policy provided invalid action. Going to return.')
                     return
             
             if updated_hosts:
                 self.apps_dict[app_name]['curr_plan']['curr_deployment'][comp_name] = comp_spec['hosts']
+
+            if comp_spec.get('standby'):
+                plan_dict[comp_name]['standby'] = standby_info(comp_spec)
         
         # Create adjusted pod manifests
         new_pods = create_adjusted_pods_and_configs(self.apps_dict[app_name], self.nodes, plan_uid)
@@ -1169,18 +1475,37 @@ class FluidityAppController():
             self.apps_dict[app_name] = app_copy
             return False, None
 
+        # Pull the images on the target nodes, so the new Pods only need to start
+        if prepull_targets and cluster_config.PREPULL_ON_RELOCATION:
+            started = time.perf_counter()
+            if not await prepull_images(prepull_targets):
+                logger.error('Pre-pull failed on some targets, their Pods pull their images at start')
+            phases['prepull'] = phases.get('prepull', 0) + time.perf_counter() - started
+
         # Deploy new Pods
-        deploy_status = deploy_new_pods(self.apps_dict[app_name], plan_dict)
+        started = time.perf_counter()
+        deploy_status = await deploy_new_pods(self.apps_dict[app_name], plan_dict)
         if not deploy_status:
             logger.error('deploy_new_pods failed.')
             self.apps_dict[app_name] = app_copy
             return False, None
+        phases['create'] = time.perf_counter() - started
+
+        # Make-before-break: wait for the new Pods to be ready and drain the old ones
+        if not await gate_relocation(self.apps_dict[app_name], plan_dict, phases, promoted):
+            self.apps_dict[app_name] = app_copy
+            return False, None
+
         # Remove old Pods
-        delete_status = check_for_hosts_to_delete(self.apps_dict[app_name], plan_dict)
+        started = time.perf_counter()
+        delete_status = await check_for_hosts_to_delete(self.apps_dict[app_name], plan_dict)
         if not delete_status:
             logger.error('check_for_hosts_to_delete failed.')
             self.apps_dict[app_name] = app_copy
             return False, None
+        phases['delete'] = time.perf_counter() - started
+        logger.test(f"|2| Fluidity relocation planuid:{plan_uid} phase latency:"
+                    f"{ {phase: round(duration, 3) for phase, duration in phases.items()} }")
 
         # logger.debug(f'final dict is {plan_dict}')
 
@@ -1199,7 +1524,7 @@ class FluidityAppController():
         
         try:
             app_dict = self.apps_dict[app_name]
-            ret = delete_running_pods(self.apps_dict[app_name])
+            ret = await delete_running_pods(self.apps_dict[app_name])
 
             if not ret:
                 logger.error('Pod removal failed.')
@@ -1211,6 +1536,8 @@ class FluidityAppController():
                 
             self.apps_dict[app_name].clear()
             del self.apps_dict[app_name]
+            TEMPLATES.invalidate(app_name)
+            forget_applied(app_name)
         except Exception as e:
             logger.error(f"Error removing app: {e}")
 
@@ -1219,7 +1546,8 @@ class FluidityAppController():
 
 async def main(inbound_queue=None, outbound_queue=None, cluster_description=None):
     """Main Controller loop."""
-    
+    phases = {}
+    started = time.perf_counter()
     await kubernetes_asyncio.config.load_config()
 
     # Detect if controller is run within a Pod or outside
@@ -1229,17 +1557,17 @@ async def main(inbound_queue=None, outbound_queue=None, cluster_description=None
         config.load_kube_config()
 
     if 'MLSYSOPS_NAMESPACE' in os.environ:
-        cluster_config.NAMESPACE = os.getenv['MLSYSOPS_NAMESPACE']
+        cluster_config.NAMESPACE = os.getenv('MLSYSOPS_NAMESPACE')
     else:
         cluster_config.NAMESPACE = 'mlsysops'
+    phases['config'] = time.perf_counter() - started
 
-    if namespace_exists(cluster_config.NAMESPACE):
-        logger.info('Namespace already exists.')
-    else:
-        logger.info('Namespace does not exist.')
-        create_mls_namespace(cluster_config.NAMESPACE)    
+    # The namespace and the CRDs do not depend on each other
+    started = time.perf_counter()
+    await asyncio.gather(ensure_namespace(cluster_config.NAMESPACE), ensure_crds())
+    phases['namespace_and_crds'] = time.perf_counter() - started
 
-    ensure_crds()
+    started = time.perf_counter()
     hostname = os.getenv("NODE_NAME",socket.gethostname())
     working_dir = os.getcwd()
 
@@ -1251,6 +1579,8 @@ async def main(inbound_queue=None, outbound_queue=None, cluster_description=None
     if not cluster_config.CLUSTER_ID:
         logger.error("Error on applying cluster description")
         sys.exit(0)
+    phases['cluster_description'] = time.perf_counter() - started
+    logger.info('Startup phase latency (s): %s', {phase: round(duration, 3) for phase, duration in phases.items()})
     
     logger.info(f'Current namespace {cluster_config.NAMESPACE}')
     logger.info('Current cluster id: %s', cluster_config.CLUSTER_ID)
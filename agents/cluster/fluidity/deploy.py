@@ -17,6 +17,8 @@
 
 from __future__ import print_function
 import copy
+import hashlib
+import itertools
 import json
 import socket
 import sys
@@ -26,11 +28,15 @@ import os
 import random
 import string
 import time
-import multiprocessing
+import asyncio
+import kubernetes_asyncio
 from kubernetes import client, utils
 from kubernetes.utils.create_from_yaml import FailToCreateError
 from kubernetes.client.rest import ApiException
-from nodes import get_k8s_nodes, get_node_availability, node_provides_resources
+from nodes import get_node_availability, node_provides_resources
+from informer import CACHE
+from ledger import LEDGER, STANDBY_LABEL, pod_requests
+from images import IMAGES, image_digest, normalize_image
 from mlsysops.utilities import node_matches_requirements
 from mlsysops import MessageEvents
 from spade_msg import PodDict, CompDict, EventDict, create_pod_dict 
@@ -38,6 +44,35 @@ import cluster_config
 
 from mlsysops.logger_util import logger
 
+#: Pod annotation holding the hash of the component template the Pod was created from
+TEMPLATE_HASH_ANNOTATION = 'mlsysops.eu/templateHash'
+#: Label of the short-lived Pods that pull an image on a node, holding the node name
+PREPULL_LABEL = 'mlsysops.eu/prepull'
+#: Waiting reasons of a container whose image cannot be pulled
+PULL_FAILURE_REASONS = ('ImagePullBackOff', 'InvalidImageName', 'ErrImageNeverPull')
+#: Waiting reasons of a container whose image is (possibly) still being pulled
+PULL_PENDING_REASONS = ('ContainerCreating', 'PodInitializing', 'ErrImagePull')
+#: Background pre-pull tasks, referenced until they finish
+_PREWARM_TASKS = set()
+#: ApiClient shared by the asynchronous helpers, created on first use
+_API_CLIENT = None
+
+
+def core_api():
+    """CoreV1Api over the ApiClient (and connection pool) shared by the helpers."""
+    global _API_CLIENT
+    if _API_CLIENT is None:
+        _API_CLIENT = kubernetes_asyncio.client.ApiClient()
+    return kubernetes_asyncio.client.CoreV1Api(_API_CLIENT)
+
+
+async def close_api_client():
+    """Close the shared ApiClient and its HTTP session, on controller shutdown."""
+    global _API_CLIENT
+    if _API_CLIENT is not None:
+        api_client, _API_CLIENT = _API_CLIENT, None
+        await api_client.close()
+
 def update_host_status(comp_spec, hostname, status):
     for host in comp_spec['hosts']:
         if host['host'] == hostname:
@@ -46,15 +81,19 @@ def update_host_status(comp_spec, hostname, status):
 
 def validate_host(pod_spec, comp_spec, hostname, nodes_list):
     node_desc = None
-    for type in nodes_list['mlsysops']:
-        # logger.info(f'type {type}')
+    informer = CACHE.cr('mlsysopsnodes')
+    if informer is not None:
+        node_desc = informer.get(hostname)
+    else:
+        for type in nodes_list['mlsysops']:
+            # logger.info(f'type {type}')
 
-        for node in nodes_list['mlsysops'][type]:
-            # logger.info(f" node {node['metadata']['name']}")
+            for node in nodes_list['mlsysops'][type]:
+                # logger.info(f" node {node['metadata']['name']}")
 
-            if node['metadata']['name'] == hostname:
-                node_desc = node
-                break
+                if node['metadata']['name'] == hostname:
+                    node_desc = node
+                    break
             
     if not node_desc or not node_matches_requirements(node_desc, comp_spec['spec']):
         logger.error(f"Node desc for {hostname} does not exist or does not match comp requirements")
@@ -175,49 +214,95 @@ def create_svc_object(app_name, app_uid, component, port, proto, external_access
     return svc
 
 
-def create_svc(svc_manifest):
-    """Create a Kubernetes service.
+#: Annotation holding the hash of the manifest an object was last applied from
+APPLY_HASH_ANNOTATION = 'mlsysops.eu/applyHash'
+
+#: Key (kind, name) of the objects applied by this agent, value (hash, object)
+APPLIED = {}
+
+
+def _apply_api(kind):
+    """The read and patch coroutine functions of a managed non-Pod kind."""
+    api = core_api()
+    if kind == 'Service':
+        return api.read_namespaced_service, api.patch_namespaced_service
+    if kind == 'ConfigMap':
+        return api.read_namespaced_config_map, api.patch_namespaced_config_map
+    return None, None
 
-    Note: For testing it deletes the service if already exists.
+async def apply_object(manifest):
+    """Reconcile a Service or ConfigMap with server-side apply.
+
+    The manifest is annotated with the hash of its content. The apply is skipped
+    if the object was already applied from the same manifest, as remembered
+    locally or, after a restart, as read from the live object's annotation. The
+    object is never deleted, so an updated Service keeps its cluster IP.
 
     Args:
-        svc_manifest (dict): The Service manifest.
+        manifest (dict): The object manifest.
 
     Returns:
-        svc (obj): The instantiated V1Service object.
+        obj: The live object, None on failure.
     """
-    core_api = client.CoreV1Api()
-    resp = None
+    kind = manifest['kind']
+    name = manifest['metadata']['name']
+    read_func, patch_func = _apply_api(kind)
+    if patch_func is None:
+        logger.error('Server-side apply of %s is not supported', kind)
+        return None
 
-    try:
-        logger.info('Trying to read service if already exists')
-        resp = core_api.read_namespaced_service(
-            name=svc_manifest['metadata']['name'],
-            namespace=cluster_config.NAMESPACE)
-        #print(resp)
-    except ApiException as exc:
-        if exc.status != 404:
-            logger.error('Unknown error reading service: %s', exc)
-            return None
+    annotations = manifest['metadata'].setdefault('annotations', {})
+    annotations.pop(APPLY_HASH_ANNOTATION, None)
+    digest = hashlib.sha256(json.dumps(manifest, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    annotations[APPLY_HASH_ANNOTATION] = digest
+
+    cached = APPLIED.get((kind, name))
+    if cached is not None and cached[0] == digest:
+        logger.debug('%s %s unchanged, skipping apply', kind, name)
+        return cached[1]
 
-    if resp:
+    if cached is None:
         try:
-            logger.info('Trying to delete service if already exists')
-            resp = core_api.delete_namespaced_service(
-                name=svc_manifest['metadata']['name'],
-                namespace=cluster_config.NAMESPACE)
-        except ApiException as exc:
-            logger.error('Failed to delete service: %s', exc)
-    
+            obj = await read_func(name=name, namespace=cluster_config.NAMESPACE)
+            if (obj.metadata.annotations or {}).get(APPLY_HASH_ANNOTATION) == digest:
+                logger.info('%s %s unchanged, skipping apply', kind, name)
+                APPLIED[(kind, name)] = (digest, obj)
+                return obj
+        except kubernetes_asyncio.client.exceptions.ApiException as exc:
+            if exc.status != 404:
+                logger.error('Unknown error reading %s %s: %s', kind, name, exc)
+                return None
+
     try:
-        svc_obj = core_api.create_namespaced_service(body=svc_manifest,
-                                                     namespace=cluster_config.NAMESPACE)
-        #print(svc_obj)
-        return svc_obj
-    except ApiException as exc:
-        logger.error('Failed to create service: %s', exc)
+        obj = await patch_func(name=name, namespace=cluster_config.NAMESPACE, body=manifest,
+                               field_manager=cluster_config.FIELD_MANAGER, force=True,
+                               _content_type='application/apply-patch+yaml')
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        logger.error('Failed to apply %s %s: %s', kind, name, exc)
+        APPLIED.pop((kind, name), None)
         return None
 
+    logger.info('Applied %s %s', kind, name)
+    APPLIED[(kind, name)] = (digest, obj)
+    return obj
+
+def forget_applied(app_name):
+    """Drop the locally remembered objects of an application."""
+    for key in [key for key, (_, obj) in APPLIED.items()
+                if (obj.metadata.labels or {}).get('mlsysops.eu/app') == app_name]:
+        del APPLIED[key]
+
+async def create_svc(svc_manifest):
+    """Create or update a Kubernetes service with server-side apply.
+
+    Args:
+        svc_manifest (dict): The Service manifest.
+
+    Returns:
+        svc (obj): The V1Service object.
+    """
+    return await apply_object(svc_manifest)
+
 def transform_key(key):
     """Remove underscores and capitalize the next letter."""
     parts = key.split('_')
@@ -368,6 +453,21 @@ def extend_pod_label_template(manifest, app_name, app_uid, comp_name):
     # Get the spec field
     pod_spec = manifest['spec']
 
+def annotate_template_hash(manifest):
+    """Annotate a component's Pod manifest template with the hash of its content.
+
+    Every instance is created from a copy of the template, so the annotation tells
+    whether a running Pod still matches the desired template (see adopt_app_pods).
+
+    Returns:
+        str: The template hash.
+    """
+    annotations = manifest['metadata'].setdefault('annotations', {})
+    annotations.pop(TEMPLATE_HASH_ANNOTATION, None)
+    digest = hashlib.sha256(json.dumps(manifest, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    annotations[TEMPLATE_HASH_ANNOTATION] = digest
+    return digest
+
 def extend_pod_env_template(manifest, svc_addr):
     """Extend a component's Pod manifest template with svc-related info.
     In case the component invokes another one, it can also set the environment
@@ -468,6 +568,82 @@ def extend_pod_instance(manifest, pod_name, constraints=None, plan_uid=None):
     
     return True
 
+class PodTemplateCache:
+    """Compiled Pod templates per (app, component, spec version).
+
+    A component template is compiled once per spec version: it is copied, so that
+    later changes of the component dict do not leak into it, and its container
+    resources are validated. Rendering the Pod of a placement only builds new
+    metadata and a shallow copy of the spec with the node name, the containers,
+    volumes etc. are shared with the compiled template. Rendered manifests are
+    thus read-only, replace a field instead of modifying it in place.
+
+    The spec version of a component (comp_spec['template_version']) is set with
+    new_version() whenever its template is (re)built, and the entries of an app
+    are invalidated when its CR changes or the app is removed.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._revisions = itertools.count(1)
+
+    def new_version(self, app_spec=None):
+        """A spec version that is never reused: the CR generation and a revision."""
+        metadata = (app_spec or {}).get('metadata') or {}
+        return (metadata.get('generation') or metadata.get('resourceVersion'), next(self._revisions))
+
+    def invalidate(self, app_name, comp_name=None):
+        for key in [key for key in self.entries
+                    if key[0] == app_name and (comp_name is None or key[1] == comp_name)]:
+            del self.entries[key]
+
+    def compile(self, app_name, comp_spec):
+        key = (app_name, comp_spec['name'], comp_spec.get('template_version'))
+        template = self.entries.get(key)
+        if template is not None:
+            self.hits += 1
+            return template
+
+        self.misses += 1
+        template = copy.deepcopy(comp_spec['pod_template'])
+        for container in template['spec']['containers']:
+            if 'resources' in container and not is_valid_resources_dict(container['resources']):
+                logger.error(f"resources are not valid {container['resources']}")
+        if key[2] is not None:
+            self.entries[key] = template
+        return template
+
+    def render(self, app_name, comp_spec, pod_name, host_name, plan_uid=None):
+        """The Pod manifest of a component instance pinned to host_name.
+
+        Equivalent to extend_pod_instance and pin_pod_instance on a copy of the
+        component template.
+        """
+        template = self.compile(app_name, comp_spec)
+
+        metadata = dict(template['metadata'])
+        metadata['name'] = pod_name
+        labels = metadata['labels'] = dict(template['metadata'].get('labels') or {})
+        labels['mlsysops.eu/componentUID'] = pod_name
+        if plan_uid:
+            labels['mlsysops.eu/planUID'] = plan_uid
+        if 'annotations' in metadata:
+            metadata['annotations'] = dict(metadata['annotations'])
+
+        spec = dict(template['spec'])
+        spec['nodeName'] = host_name
+
+        manifest = dict(template)
+        manifest['metadata'] = metadata
+        manifest['spec'] = spec
+        return manifest
+
+
+#: The Pod template cache shared by the deployment functions
+TEMPLATES = PodTemplateCache()
+
 def pin_pod_instance(manifest, node_name):
     """Pin a component's instance Pod to a specific node."""
     manifest['spec']['nodeName'] = node_name
@@ -490,44 +666,58 @@ def create_adjusted_pods_and_configs(app, nodes_list, plan_uid):
             #     logger.error(f"Host {host['host']} did not pass eligibility check")
             #     return False
 
-            pod_dict = copy.deepcopy(pod_template)
             uid = get_random_key(8)
             pod_name = '{}-m-{}'.format(comp_name, uid)
-            extend_pod_instance(pod_dict, pod_name, plan_uid=plan_uid)
-            pin_pod_instance(pod_dict, host['host'])
+            pod_dict = TEMPLATES.render(app['name'], comp_spec, pod_name, host['host'], plan_uid=plan_uid)
             comp_spec['pod_manifests'].append({'file':pod_dict,'status':'PENDING'})
             host['status'] = 'ACTIVE'
     
     return True
 
-def create_pod(app, pod_dict, comp_spec):
-    api = client.CoreV1Api()
-    
+async def create_pod(app, pod_dict, comp_spec):
+    api = core_api()
+
+    # Book the node resources, so that concurrent plans cannot overcommit it
+    reservation = None
+    node_name = pod_dict['spec'].get('nodeName')
+    if node_name and CACHE.ledger_fresh():
+        reservation = LEDGER.reserve(node_name, pod_requests(pod_dict))
+        if reservation is None:
+            logger.error(f"Node {node_name} does not have the free resources requested by Pod "
+                         f"{pod_dict['metadata']['name']} (free {LEDGER.free(node_name)})")
+            return False
+
     try:
-        api.create_namespaced_pod(body=pod_dict, namespace=cluster_config.NAMESPACE)
+        await api.create_namespaced_pod(body=pod_dict, namespace=cluster_config.NAMESPACE)
+        if reservation is not None:
+            LEDGER.commit(reservation, pod_dict)
         app['total_pods'] +=1
         app['pod_names'].append(pod_dict['metadata']['name'])
 
         for entry in comp_spec['pod_manifests']:
             if entry['file'] == pod_dict:
                 entry['status'] = 'ACTIVE'
-    except ApiException as exc:
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
         logger.error(f"Failed to create Pod {pod_dict['metadata']['name']} with exc: {exc}")
-        app['total_pods'] = 0
-        app['pod_names'] = []
+        if reservation is not None:
+            LEDGER.release(reservation)
+        # Forget only this Pod, the other instances of the app keep running
+        if pod_dict['metadata']['name'] in app['pod_names']:
+            app['pod_names'].remove(pod_dict['metadata']['name'])
+            app['total_pods'] -= 1
         return False
 
     logger.info(f"Current pod list {app['pod_names']}")
     return True
 
-def delete_pod(pod_name, app=None):
-    api = client.CoreV1Api()
+async def delete_pod(pod_name, app=None):
+    api = core_api()
 
     try:
         # NOTE: If grace period is not zero and the host is offline, 
         # the pod will continue having Running status after deletion.
-        api.delete_namespaced_pod(name=pod_name, namespace=cluster_config.NAMESPACE, 
-                                  body=client.V1DeleteOptions(grace_period_seconds=0))
+        await api.delete_namespaced_pod(name=pod_name, namespace=cluster_config.NAMESPACE,
+                                        body=kubernetes_asyncio.client.V1DeleteOptions(grace_period_seconds=0))
         if app:
             app['total_pods'] -= 1
 
@@ -536,95 +726,804 @@ def delete_pod(pod_name, app=None):
             else:
                 logger.error(f"Pod {pod_name} is not in pod_names list {app['pod_names']}")
 
-    except ApiException as exc:
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
         logger.error('Failed to delete Pod: %s', exc)
         return False
     
     return True
 
-def read_pod(pod_name):
-    api = client.CoreV1Api()
+async def read_pod(pod_name):
+    # A cache miss may be a Pod we just created, so fall back to the API
+    if CACHE.fresh(CACHE.pods) and CACHE.pods.get(pod_name) is not None:
+        return CACHE.pods.get(pod_name)
+
+    api = core_api()
     resp = None
     
     try:
-        resp = api.read_namespaced_pod(name=pod_name, namespace=cluster_config.NAMESPACE)
-    except ApiException as exc:
+        resp = await api.read_namespaced_pod(name=pod_name, namespace=cluster_config.NAMESPACE)
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
         logger.info('Pod does not exist or has been removed')
     
     return resp
 
-def delete_running_pods(app):
+async def node_is_ready(node_name):
+    """Check the Ready condition of a single k8s node."""
+    if CACHE.fresh(CACHE.nodes):
+        node = CACHE.nodes.get(node_name)
+        return node is not None and get_node_availability(node_name, [node])
+
+    api = core_api()
+
+    try:
+        node = await api.read_node(name=node_name)
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        logger.error('Read node %s failed: %s', node_name, exc)
+        return False
+
+    return get_node_availability(node_name, [node])
+
+async def wait_for_pod(pod_name, condition, timeout, cached=True):
+    """Wait until condition(pod) holds, driven by watch events.
+
+    The shared Pod informer is used when it is fresh. Otherwise the Pod is listed
+    once with a field selector and then watched from the returned resourceVersion.
+    Either way no polling GETs are issued while it changes.
+
+    Args:
+        pod_name (str): The name of the Pod.
+        condition (callable): Called with the Pod object, or None once the Pod
+            is deleted. Returns True when the wait is over.
+        timeout (float): Deadline in seconds.
+        cached (bool): Use the shared Pod informer, False for Pods without the
+            mlsysops.eu/app label.
+
+    Returns:
+        bool: True if the condition was met, False on timeout or when the API
+            server could not be listed or watched.
+    """
+    if cached and CACHE.fresh(CACHE.pods):
+        if await CACHE.pods.wait_for(pod_name, condition, timeout):
+            return True
+        logger.error('Timed out after %ss waiting for Pod %s', timeout, pod_name)
+        return False
+
+    api = core_api()
+    query_kwargs = {
+        'namespace': cluster_config.NAMESPACE,
+        'field_selector': 'metadata.name={}'.format(pod_name)
+    }
+
+    async def _wait():
+        resource_version = None
+        while True:
+            if resource_version is None:
+                pods = await api.list_namespaced_pod(**query_kwargs)
+                if condition(pods.items[0] if pods.items else None):
+                    return True
+                resource_version = pods.metadata.resource_version
+
+            w = kubernetes_asyncio.watch.Watch()
+            try:
+                async with w.stream(api.list_namespaced_pod, resource_version=resource_version,
+                                    timeout_seconds=max(1, int(timeout)), **query_kwargs) as stream:
+                    async for event in stream:
+                        pod = event['object']
+                        resource_version = pod.metadata.resource_version
+                        if condition(None if event['type'] == 'DELETED' else pod):
+                            return True
+            except kubernetes_asyncio.client.exceptions.ApiException as exc:
+                if exc.status != 410:
+                    raise
+                # Resource version too old, list again
+                resource_version = None
+            finally:
+                w.stop()
+
+    try:
+        return await asyncio.wait_for(_wait(), timeout)
+    except asyncio.TimeoutError:
+        logger.error('Timed out after %ss waiting for Pod %s', timeout, pod_name)
+        return False
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        logger.error('API error while waiting for Pod %s: %s', pod_name, exc)
+        return False
+    except Exception as exc:
+        logger.error('Failed to watch Pod %s: %s', pod_name, exc)
+        return False
+
+def template_images(pod_template):
+    """The images of the (init) containers of a Pod manifest."""
+    spec = pod_template['spec']
+    return [container['image'] for container in spec.get('initContainers', []) + spec.get('containers', [])
+            if container.get('image')]
+
+def create_prepull_manifest(pod_name, node_name, image, pull_secrets=None):
+    """Create the manifest of a Pod that only pulls an image on a node.
+
+    The container runs `true`, or fails to start if the image has no such binary.
+    Either way the image is on the node once the container leaves the pull.
+    """
+    return {
+        'apiVersion': 'v1',
+        'kind': 'Pod',
+        'metadata': {
+            'name': pod_name,
+            'labels': {PREPULL_LABEL: node_name}
+        },
+        'spec': {
+            'nodeName': node_name,
+            'restartPolicy': 'Never',
+            'activeDeadlineSeconds': int(cluster_config.PREPULL_TIMEOUT),
+            'terminationGracePeriodSeconds': 0,
+            'tolerations': [{'operator': 'Exists'}],
+            'imagePullSecrets': pull_secrets or [],
+            'containers': [{
+                'name': 'prepull',
+                'image': image,
+                'imagePullPolicy': 'IfNotPresent',
+                'command': ['true'],
+                'resources': {
+                    'requests': {'cpu': '10m', 'memory': '16Mi'},
+                    'limits': {'cpu': '10m', 'memory': '16Mi'}
+                }
+            }]
+        }
+    }
+
+def pull_state(pod):
+    """'pulled' or 'failed' once the image of a pre-pull Pod is settled, None while pulling."""
+    if pod is None:
+        return 'failed'
+    if pod.status is None:
+        return None
+
+    for status in pod.status.container_statuses or []:
+        if status.image_id:
+            return 'pulled'
+        if status.state is None:
+            continue
+        if status.state.running or status.state.terminated:
+            return 'pulled'
+        waiting = status.state.waiting
+        if waiting and waiting.reason in PULL_FAILURE_REASONS:
+            return 'failed'
+        if waiting and waiting.reason not in PULL_PENDING_REASONS:
+            # e.g. RunContainerError, the image is there but cannot run `true`
+            return 'pulled'
+
+    if pod.status.phase == 'Failed':
+        return 'failed'
+    return None
+
+async def _prepull(node_name, image, pull_secrets):
+    api = core_api()
+    pod_name = 'prepull-{}'.format(get_random_key(10))
+    manifest = create_prepull_manifest(pod_name, node_name, image, pull_secrets)
+
+    try:
+        await api.create_namespaced_pod(body=manifest, namespace=cluster_config.NAMESPACE)
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        logger.error('Failed to create pre-pull Pod for %s on %s: %s', image, node_name, exc)
+        return False
+
+    result = {}
+
+    def settled(pod):
+        result['state'] = pull_state(pod)
+        if result['state'] == 'pulled':
+            result['digest'] = next((image_digest(status.image_id)
+                                     for status in pod.status.container_statuses or [] if status.image_id), None)
+        return result['state'] is not None
+
+    started = time.perf_counter()
+    settled_in_time = await wait_for_pod(pod_name, settled, cluster_config.PREPULL_TIMEOUT, cached=False)
+    await delete_pod(pod_name)
+
+    if not settled_in_time:
+        logger.error('Pre-pull of %s on %s timed out after %ss', image, node_name, cluster_config.PREPULL_TIMEOUT)
+        return False
+    if result.get('state') != 'pulled':
+        logger.error('Pre-pull of %s on %s failed', image, node_name)
+        return False
+
+    IMAGES.record_pull(node_name, image, result.get('digest'))
+    logger.info('Pre-pulled %s on %s in %.3fs', image, node_name, time.perf_counter() - started)
+    return True
+
+async def prepull_image(node_name, image, pull_secrets=None):
+    """Make sure an image is present on a node before a Pod using it is placed there.
+
+    Images the node reports, or that were pre-pulled before, are not pulled again.
+    Concurrent requests for the same image and node share one pre-pull.
+
+    Returns:
+        bool: True if the image is present on the node.
+    """
+    if IMAGES.has_image(node_name, image):
+        return True
+
+    key = (node_name, normalize_image(image))
+    task = IMAGES.inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_prepull(node_name, image, pull_secrets))
+        IMAGES.inflight[key] = task
+        task.add_done_callback(lambda _: IMAGES.inflight.pop(key, None))
+    # A cancelled caller must not cancel a pull other plans wait for
+    return await asyncio.shield(task)
+
+async def prepull_images(targets):
+    """Pre-pull the images of Pod templates on their target nodes, concurrently.
+
+    Args:
+        targets (list): (node name, Pod manifest template) tuples.
+
+    Returns:
+        bool: True if every image is present on its node.
+    """
+    pulls = {}
+    for node_name, pod_template in targets:
+        pull_secrets = pod_template['spec'].get('imagePullSecrets')
+        for image in template_images(pod_template):
+            pulls.setdefault((node_name, normalize_image(image)), (node_name, image, pull_secrets))
+
+    if not pulls:
+        return True
+
+    results = await asyncio.gather(*(prepull_image(*args) for args in pulls.values()))
+    return all(results)
+
+def prewarm_images(targets):
+    """Pre-pull the images of Pod templates on candidate nodes in the background."""
+    task = asyncio.ensure_future(prepull_images(targets))
+    _PREWARM_TASKS.add(task)
+    task.add_done_callback(_PREWARM_TASKS.discard)
+    return task
+
+async def cleanup_prepull_pods():
+    """Delete the pre-pull Pods left from a previous run."""
+    api = core_api()
+    try:
+        await api.delete_collection_namespaced_pod(namespace=cluster_config.NAMESPACE, label_selector=PREPULL_LABEL,
+                                                   grace_period_seconds=0)
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        logger.error('Failed to delete pre-pull Pods: %s', exc)
+
+async def delete_running_pods(app):
     logger.info('Deleting all running pods for app: %s', app['name'])
 
     for pod_name in app['pod_names']:
-        resp = delete_pod(pod_name)
+        resp = await delete_pod(pod_name)
         
         if not resp:
             return False
         
     return True
 
-def sync_remove_pod(pod_name, host_name):
+async def cleanup_pods(keep_apps=None):
+    """Delete all Fluidity Pods (label mlsysops.eu/app) left from a previous run.
+
+    Pods of the applications in keep_apps are left running, to be adopted.
+
+    The Pods are deleted with a single deletecollection call, or with concurrent
+    deletes bounded by cluster_config.CLEANUP_CONCURRENCY if that is not allowed.
+    One watch then confirms their removal, up to POD_TERMINATION_TIMEOUT. Pods on
+    hosts that are not ready are not waited for, as they stay listed until their
+    host returns.
+
+    Returns:
+        bool: True if every Pod is gone or on a host that is not ready, False if
+            a delete failed or a removal was not confirmed.
+    """
+    api = core_api()
+    label_selector = 'mlsysops.eu/app'
+    if keep_apps:
+        label_selector += ',mlsysops.eu/app notin ({})'.format(','.join(sorted(keep_apps)))
+
+    try:
+        pods = await api.list_namespaced_pod(namespace=cluster_config.NAMESPACE, label_selector=label_selector)
+        nodes = await api.list_node()
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        logger.error('Failed to list Pods for cleanup: %s', exc)
+        return False
+
+    if not pods.items:
+        logger.info('No Pods to clean up.')
+        return True
+
+    ready_hosts = {node.metadata.name for node in nodes.items
+                   if get_node_availability(node.metadata.name, [node])}
+    pod_names = [pod.metadata.name for pod in pods.items]
+    waited = {pod.metadata.name for pod in pods.items if pod.spec.node_name in ready_hosts}
+    remaining = set(waited)
+    failed = set()
+    logger.info('Cleaning up %d Pods: %s', len(pod_names), pod_names)
+
+    try:
+        await api.delete_collection_namespaced_pod(namespace=cluster_config.NAMESPACE,
+                                                   label_selector=label_selector,
+                                                   grace_period_seconds=0)
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        logger.info('deletecollection failed (%s), deleting Pods one by one', exc.status)
+        semaphore = asyncio.Semaphore(cluster_config.CLEANUP_CONCURRENCY)
+
+        async def bounded_delete(pod_name):
+            async with semaphore:
+                return await delete_pod(pod_name)
+
+        results = await asyncio.gather(*(bounded_delete(pod_name) for pod_name in pod_names))
+        failed = {pod_name for pod_name, result in zip(pod_names, results) if not result}
+        if failed:
+            logger.error('Failed to delete Pods %s', sorted(failed))
+            # No DELETED event will come for them, they stay unconfirmed
+            remaining.difference_update(failed)
+
+    async def wait_removed():
+        w = kubernetes_asyncio.watch.Watch()
+        try:
+            async with w.stream(api.list_namespaced_pod, namespace=cluster_config.NAMESPACE,
+                                label_selector=label_selector, resource_version=pods.metadata.resource_version,
+                                timeout_seconds=cluster_config.POD_TERMINATION_TIMEOUT) as stream:
+                async for event in stream:
+                    if event['type'] == 'DELETED':
+                        remaining.discard(event['object'].metadata.name)
+                        if not remaining:
+                            return
+        finally:
+            w.stop()
+
+    if remaining:
+        try:
+            await asyncio.wait_for(wait_removed(), cluster_config.POD_TERMINATION_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        except kubernetes_asyncio.client.exceptions.ApiException as exc:
+            logger.error('Cleanup watch failed: %s', exc)
+
+    unconfirmed = remaining | failed
+    skipped = len(set(pod_names) - waited - failed)
+    logger.info('Cleanup finished: %d Pods deleted, %d on hosts not ready, %d not confirmed removed %s',
+                len(pod_names) - skipped - len(unconfirmed), skipped, len(unconfirmed), sorted(unconfirmed))
+    return not unconfirmed
+
+async def list_app_pods(app_name):
+    if CACHE.fresh(CACHE.pods):
+        return CACHE.pods.by_index('app', app_name)
+
+    api = core_api()
+    try:
+        resp = await api.list_namespaced_pod(namespace=cluster_config.NAMESPACE,
+                                             label_selector=f'mlsysops.eu/app={app_name}')
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        logger.error('Failed to list Pods of app %s: %s', app_name, exc)
+        return []
+    return resp.items
+
+def record_pod_instance(app, comp_spec, pod_name, host_name, plan_uid=None):
+    """Register an existing Pod of a component as an active instance on host_name."""
+    pod_dict = TEMPLATES.render(app['name'], comp_spec, pod_name, host_name, plan_uid=plan_uid)
+    comp_spec['pod_manifests'].append({'file': pod_dict, 'status': 'ACTIVE'})
+
+    instance = {'action': 'deploy', 'host': host_name, 'status': 'ACTIVE'}
+    comp_spec['hosts'].append(copy.deepcopy(instance))
+    app['curr_plan']['curr_deployment'].setdefault(comp_spec['name'], []).append(instance)
+    app['pod_names'].append(pod_name)
+    app['total_pods'] += 1
+
+async def replace_pod_instance(app, comp_spec, old_pod_name, host_name):
+    """Replace a Pod created from an outdated template with one created from the
+    current template on the same host. The old Pod is kept if the new one fails.
+
+    Returns:
+        bool: True if the Pod was replaced.
     """
-    The difference with the delete_and_wait_term is that the current function waits until the pod does not exist
-    anymore (reading the pod fails). If the node is disconnected, it aborts.
+    pod_name = '{}-{}'.format(comp_spec['name'], get_random_key(8))
+    pod_dict = TEMPLATES.render(app['name'], comp_spec, pod_name, host_name)
+    manifest_entry = {'file': pod_dict, 'status': 'PENDING'}
+    comp_spec['pod_manifests'].append(manifest_entry)
+
+    created = await create_pod(app, pod_dict, comp_spec)
+    ready = created and (cluster_config.RELOCATION_MODE != 'make_before_break' or
+                         await wait_pods_ready([pod_name], cluster_config.POD_READY_TIMEOUT))
+    if not ready:
+        logger.error('Replacement of Pod %s failed. Keeping it.', old_pod_name)
+        comp_spec['pod_manifests'].remove(manifest_entry)
+        if created:
+            await delete_pod(pod_name, app)
+        record_pod_instance(app, comp_spec, old_pod_name, host_name)
+        return False
+
+    instance = {'action': 'deploy', 'host': host_name, 'status': 'ACTIVE'}
+    comp_spec['hosts'].append(copy.deepcopy(instance))
+    app['curr_plan']['curr_deployment'].setdefault(comp_spec['name'], []).append(instance)
+
+    if cluster_config.RELOCATION_MODE == 'make_before_break':
+        await drain_pods([old_pod_name])
+    return await delete_and_wait_term(old_pod_name, None)
+
+async def adopt_app_pods(app):
+    """Rebuild the placement of an app from the Pods left by a previous run.
+
+    Running Pods whose template hash annotation matches the current component
+    template are adopted as they are. Pods of a component whose template changed
+    are replaced on the same host, Pods of unknown components, drained or
+    finished Pods are deleted.
+
+    Args:
+        app (dict): The FluidityApp info dictionary, with its component templates.
+
+    Returns:
+        int: The number of component instances running after the adoption.
     """
-    api = client.CoreV1Api()
-    
+    replacements = []
+    deletions = []
+    adopted = 0
 
-    resp = delete_pod(pod_name)
-    if not resp:
+    for pod in await list_app_pods(app['name']):
+        pod_name = pod.metadata.name
+        labels = pod.metadata.labels or {}
+        annotations = pod.metadata.annotations or {}
+        comp_spec = app['components'].get(labels.get('mlsysops.eu/component'))
+
+        if pod.metadata.deletion_timestamp is not None:
+            continue
+        if comp_spec is None or not pod.spec.node_name or pod.status.phase in ('Succeeded', 'Failed'):
+            deletions.append(pod_name)
+            continue
+
+        desired_hash = comp_spec['pod_template']['metadata'].get('annotations', {}).get(TEMPLATE_HASH_ANNOTATION)
+        if annotations.get(TEMPLATE_HASH_ANNOTATION) == desired_hash:
+            record_pod_instance(app, comp_spec, pod_name, pod.spec.node_name,
+                                plan_uid=labels.get('mlsysops.eu/planUID'))
+            adopted += 1
+        else:
+            replacements.append((comp_spec, pod_name, pod.spec.node_name))
+
+    if deletions:
+        logger.info('Deleting stale Pods of app %s: %s', app['name'], deletions)
+        await asyncio.gather(*(delete_pod(pod_name) for pod_name in deletions))
+
+    replaced = 0
+    if replacements:
+        logger.info('Replacing divergent Pods of app %s: %s', app['name'],
+                    [pod_name for _, pod_name, _ in replacements])
+        results = await asyncio.gather(*(replace_pod_instance(app, comp_spec, pod_name, host_name)
+                                         for comp_spec, pod_name, host_name in replacements))
+        replaced = sum(1 for result in results if result)
+
+    logger.info('App %s: adopted %d Pods, replaced %d of %d divergent, deleted %d stale', app['name'],
+                adopted, replaced, len(replacements), len(deletions))
+    return adopted + len(replacements)
+
+def mark_adopted_instances(comp_spec, plan_entries):
+    """Match the initial plan of a component with its adopted Pods.
+
+    Plan entries for hosts that already run an instance are marked ACTIVE, so they
+    are not deployed again.
+
+    Returns:
+        list: Names of the adopted Pods on hosts the plan does not use.
+    """
+    planned_hosts = {entry['host'] for entry in plan_entries}
+    running_hosts = {pod['file']['spec']['nodeName'] for pod in comp_spec['pod_manifests']
+                     if pod['status'] == 'ACTIVE'}
+
+    for entry in plan_entries:
+        if entry['host'] in running_hosts:
+            entry['status'] = 'ACTIVE'
+
+    return [pod['file']['metadata']['name'] for pod in comp_spec['pod_manifests']
+            if pod['status'] == 'ACTIVE' and pod['file']['spec']['nodeName'] not in planned_hosts]
+
+async def remove_pod_instance(app, comp_spec, pod_name):
+    """Delete an instance Pod of a component and drop it from the app structures.
+
+    Returns:
+        bool: True if the Pod was deleted.
+    """
+    entry = next((pod for pod in comp_spec['pod_manifests'] if pod['file']['metadata']['name'] == pod_name), None)
+    if not await delete_pod(pod_name, app):
+        logger.error('Failed to remove instance %s of %s', pod_name, comp_spec['name'])
         return False
 
-    while True:
-        time.sleep(1)
-        nodes = get_k8s_nodes()
+    if entry is None:
+        return True
+    comp_spec['pod_manifests'].remove(entry)
+
+    host_name = entry['file']['spec']['nodeName']
+    if any(pod['file']['spec']['nodeName'] == host_name for pod in comp_spec['pod_manifests']):
+        # Another instance still runs on the host
+        return True
+    comp_spec['hosts'] = [host for host in comp_spec['hosts'] if host['host'] != host_name]
+    instances = app['curr_plan']['curr_deployment'].get(comp_spec['name'])
+    if instances is not None:
+        instances[:] = [instance for instance in instances
+                        if not (instance['host'] == host_name and instance['status'] == 'ACTIVE')]
+    return True
 
-        if nodes == [] or get_node_availability(host_name, nodes) == False:
-            break
+def pod_is_ready(pod):
+    """True once the Pod reports the Ready condition (its readiness probes pass)."""
+    if pod is None or pod.status is None:
+        return False
+    return any(condition.type == 'Ready' and condition.status == 'True'
+               for condition in pod.status.conditions or [])
 
-        if not read_pod(pod_name):
-            break
+async def wait_pods_ready(pod_names, timeout):
+    results = await asyncio.gather(*(wait_for_pod(pod_name, pod_is_ready, timeout) for pod_name in pod_names))
+    return all(results)
 
-def cleanup_pods():
-    remove_process_list = []
-    api = client.CoreV1Api()
+async def drain_pod(pod_name):
+    """Take a Pod out of its Service endpoints by removing its component label."""
+    api = core_api()
 
     try:
-        pods = api.list_namespaced_pod(namespace=cluster_config.NAMESPACE)
-    except ApiException as exc:
-        logger.error('Failed to delete Pod: %s', exc)
+        await api.patch_namespaced_pod(name=pod_name, namespace=cluster_config.NAMESPACE,
+                                       body={'metadata': {'labels': {'mlsysops.eu/component': None}}})
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        logger.error('Failed to drain Pod %s: %s', pod_name, exc)
         return False
-    
-    pod_list = pods.items
 
-    for pod in pod_list:
-        #logger.info('Pod', pod)
-        pod_name = pod.metadata.name
-        labels = pod.metadata.labels
+    return True
+
+async def drain_pods(pod_names):
+    await asyncio.gather(*(drain_pod(pod_name) for pod_name in pod_names))
+    if pod_names:
+        await asyncio.sleep(cluster_config.RELOCATION_DRAIN_SECONDS)
+
+def get_pods_to_delete(app):
+    """Names of the Pods placed on the INACTIVE hosts of the app components."""
+    pod_names = []
+    for comp_spec in app['components'].values():
+        inactive_hosts = {host['host'] for host in comp_spec['hosts'] if host['status'] == 'INACTIVE'}
+        for pod in comp_spec['pod_manifests']:
+            if pod['file']['spec']['nodeName'] in inactive_hosts:
+                pod_names.append(pod['file']['metadata']['name'])
+    return pod_names
+
+async def gate_relocation(app, plan_dict, phases, promoted=None):
+    """Make-before-break step between deploy_new_pods and check_for_hosts_to_delete.
+
+    Waits for the Pods placed by the plan to be Ready, then drains the Pods that
+    are going to be removed. If a new Pod does not become Ready in time, the new
+    Pods are deleted and the old ones are left untouched. Promoted standbys are
+    turned back into standbys instead.
+
+    Args:
+        app (dict): The FluidityApp info dictionary.
+        plan_dict (dict): The plan dict filled by deploy_new_pods.
+        phases (dict): Filled with the duration of the 'ready' and 'drain' phases.
+        promoted (dict): Key name of a standby promoted by the plan, value its
+            component spec in the app state restored on rollback. If it cannot
+            be demoted, it is deleted and the standby of that spec is cleared, so
+            place_standby creates a new one.
+
+    Returns:
+        bool: True if the old Pods can be removed, False if the relocation was rolled back.
+    """
+    new_pod_names = [pod_name for comp in plan_dict.values() for pod_name, pod in comp['specs'].items()
+                     if pod['event'] == MessageEvents.COMPONENT_PLACED.value]
+    if cluster_config.RELOCATION_MODE != 'make_before_break' or not new_pod_names:
+        return True
+
+    started = time.perf_counter()
+    if not await wait_pods_ready(new_pod_names, cluster_config.POD_READY_TIMEOUT):
+        logger.error('Replacement Pods %s did not become ready. Rolling back.', new_pod_names)
+        promoted = promoted or {}
+        for pod_name in new_pod_names:
+            comp_spec = promoted.get(pod_name)
+            if comp_spec is not None and await demote_standby(app, comp_spec, pod_name):
+                continue
+            await delete_pod(pod_name, app)
+            if comp_spec is not None:
+                comp_spec['standby']['host'] = None
+                comp_spec['standby']['pod_name'] = None
+        return False
+    phases['ready'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await drain_pods(get_pods_to_delete(app))
+    phases['drain'] = time.perf_counter() - started
+
+    return True
+
+def _standby_resources(resources, standby):
+    """Container resources of a standby replica.
 
-        if labels == None:
+    The requests are lowered to the standby amounts. A limit equal to its request
+    is lowered too and other limits are kept, so that the Pod keeps its QoS class
+    and can be resized in place on promotion. Resources without a request are
+    left as they are.
+    """
+    requests = dict(resources.get('requests') or {})
+    limits = dict(resources.get('limits') or {})
+    for resource in ('cpu', 'memory'):
+        amount = standby.get(resource)
+        if amount is None or requests.get(resource) is None:
             continue
-        
-        host_name = pod.spec.node_name
-        if 'mlsysops.eu/app' in labels:
-            logger.info('Deleting pod with name %s', pod_name)
-            logger.info('labels %s', pod.metadata.labels)
-            logger.info('Pod has mlsysops.eu/app label.')
-            temp_process = multiprocessing.Process(target=sync_remove_pod, args=(pod_name, host_name))
-            remove_process_list.append(temp_process)
-    
-    for process in remove_process_list:
-        logger.info('Starting removal process %s', process)
-        process.start()
-    
-    for process in remove_process_list:
-        logger.info('Waiting for removal process to terminate %s', process)
-        process.join()
+        if limits.get(resource) == requests[resource]:
+            limits[resource] = amount
+        requests[resource] = amount
+    return {'requests': requests, 'limits': limits}
+
+def create_standby_manifest(app, comp_spec, pod_name, host_name):
+    """The Pod manifest of a component's warm standby replica on host_name.
 
+    It is a component instance without the component label, so it is not part of
+    the Service endpoints, with the standby resources.
+    """
+    manifest = TEMPLATES.render(app['name'], comp_spec, pod_name, host_name)
+    labels = manifest['metadata']['labels']
+    labels.pop('mlsysops.eu/component', None)
+    labels[STANDBY_LABEL] = comp_spec['name']
+
+    spec = manifest['spec']
+    spec['containers'] = [dict(container, resources=_standby_resources(container['resources'], comp_spec['standby']))
+                          if 'resources' in container else container
+                          for container in spec['containers']]
+    return manifest
+
+def standby_info(comp_spec):
+    """The standby replica of a component as reported in the plan result."""
+    standby = comp_spec.get('standby') or {}
+    if not standby.get('pod_name'):
+        return None
+    return {
+        'host': standby['host'],
+        'pod_name': standby['pod_name'],
+        'requests': LEDGER.standby_overhead(standby['host'])
+    }
+
+async def place_standby(app, comp_spec, host_name, replace=False):
+    """Keep the warm standby replica of a component on host_name.
+
+    A replica on another host, or any replica if replace is set (e.g. after a
+    spec change), is replaced once the new one is created. With host_name None
+    the replica is removed.
+
+    Returns:
+        bool: True if the standby is on host_name (or removed).
+    """
+    standby = comp_spec.get('standby')
+    if not standby or not standby.get('enabled'):
+        logger.error('Component %s has no standby mode enabled', comp_spec['name'])
+        return False
+
+    old_pod_name = standby.get('pod_name')
+    if not replace and host_name is not None and host_name == standby.get('host') and old_pod_name:
+        return True
+
+    if host_name is not None:
+        pod_name = '{}-s-{}'.format(comp_spec['name'], get_random_key(8))
+        manifest = create_standby_manifest(app, comp_spec, pod_name, host_name)
+        if not await create_pod(app, manifest, comp_spec):
+            logger.error('Failed to create standby of %s on %s', comp_spec['name'], host_name)
+            return False
+        standby['host'] = host_name
+        standby['pod_name'] = pod_name
+        logger.info('Standby of %s placed on %s as %s', comp_spec['name'], host_name, pod_name)
+    else:
+        standby['host'] = None
+        standby['pod_name'] = None
+
+    if old_pod_name:
+        await delete_pod(old_pod_name, app)
     return True
 
-def check_for_hosts_to_delete(app, plan_dict):
+async def resize_pod(pod_name, containers):
+    """Resize the containers of a running Pod in place.
+
+    Uses the resize subresource, or a Pod patch on API servers that do not serve it.
+    """
+    api = core_api()
+    body = {'spec': {'containers': [
+        {'name': container['name'],
+         'resources': {kind: {resource: amount for resource, amount in (amounts or {}).items() if amount is not None}
+                       for kind, amounts in container.get('resources', {}).items()}}
+        for container in containers
+    ]}}
+
+    resize = getattr(api, 'patch_namespaced_pod_resize', None)
+    try:
+        if resize is not None:
+            try:
+                await resize(name=pod_name, namespace=cluster_config.NAMESPACE, body=body)
+                return True
+            except kubernetes_asyncio.client.exceptions.ApiException as exc:
+                if exc.status != 404:
+                    raise
+        await api.patch_namespaced_pod(name=pod_name, namespace=cluster_config.NAMESPACE, body=body)
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        logger.error('Failed to resize Pod %s: %s', pod_name, exc)
+        return False
+
+    return True
+
+async def promote_standby(app, comp_spec, host_name, comp_plan, plan_uid=None):
+    """Turn the warm standby replica on host_name into an active instance.
+
+    The replica is resized to the component resources and joins the Service
+    endpoints. It is registered as an ACTIVE instance and reported as placed in
+    comp_plan, so gate_relocation drains and removes the instances it replaces.
+    If the resize is not possible (e.g. in-place resize disabled), the replica is
+    promoted with its standby resources.
+
+    Returns:
+        bool: True if the standby was promoted, False if there is no ready
+        standby on host_name.
+    """
+    standby = comp_spec.get('standby') or {}
+    pod_name = standby.get('pod_name')
+    if not pod_name or standby.get('host') != host_name:
+        return False
+
+    pod = await read_pod(pod_name)
+    if not pod or not pod_is_ready(pod):
+        logger.info('Standby %s of %s is not ready, relocating instead', pod_name, comp_spec['name'])
+        return False
+
+    started = time.perf_counter()
+    manifest = TEMPLATES.render(app['name'], comp_spec, pod_name, host_name, plan_uid=plan_uid)
+    if CACHE.ledger_fresh():
+        delta = pod_requests(manifest)
+        for resource, amount in pod_requests(pod).items():
+            delta[resource] = delta.get(resource, 0.0) - amount
+        if not LEDGER.fits(host_name, {resource: amount for resource, amount in delta.items() if amount > 0}):
+            logger.error('Node %s may not have the free resources to resize standby %s', host_name, pod_name)
+
+    resized = await resize_pod(pod_name, manifest['spec']['containers'])
+    if not resized:
+        logger.error('Promoting standby %s with its standby resources', pod_name)
+
+    labels = {'mlsysops.eu/component': comp_spec['name'], STANDBY_LABEL: None}
+    if plan_uid:
+        labels['mlsysops.eu/planUID'] = plan_uid
+    try:
+        await core_api().patch_namespaced_pod(
+            name=pod_name, namespace=cluster_config.NAMESPACE, body={'metadata': {'labels': labels}})
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        logger.error('Failed to promote standby %s: %s', pod_name, exc)
+        if resized:
+            # Back to the standby resources, the Pod stays the standby
+            containers = [{'name': container.name,
+                           'resources': {'requests': container.resources.requests,
+                                         'limits': container.resources.limits} if container.resources else {}}
+                          for container in pod.spec.containers]
+            await resize_pod(pod_name, containers)
+        return False
+
+    comp_spec['pod_manifests'].append({'file': manifest, 'status': 'ACTIVE'})
+    comp_plan['specs'][pod_name] = create_pod_dict(host_name, MessageEvents.COMPONENT_PLACED.value,
+                                                   {'comp_spec': comp_spec, 'pod_spec': manifest})
+    standby['host'] = None
+    standby['pod_name'] = None
+    logger.test(f"|2| Fluidity standby promotion planuid:{plan_uid} pod:{pod_name} "
+                f"latency:{round(time.perf_counter() - started, 3)}")
+    return True
+
+async def demote_standby(app, comp_spec, pod_name):
+    """Turn a promoted standby back into the warm standby of a component, on rollback.
+
+    The Pod is resized to the standby resources and leaves the Service endpoints.
+
+    Returns:
+        bool: True if the Pod is the standby replica again.
+    """
+    manifest = create_standby_manifest(app, comp_spec, pod_name, comp_spec['standby']['host'])
+    if not await resize_pod(pod_name, manifest['spec']['containers']):
+        logger.error('Standby %s keeps the component resources', pod_name)
+
+    labels = {'mlsysops.eu/component': None, 'mlsysops.eu/planUID': None, STANDBY_LABEL: comp_spec['name']}
+    try:
+        await core_api().patch_namespaced_pod(
+            name=pod_name, namespace=cluster_config.NAMESPACE, body={'metadata': {'labels': labels}})
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
+        logger.error('Failed to demote %s back to standby: %s', pod_name, exc)
+        return False
+
+    logger.info('Promoted standby %s of %s demoted back to standby', pod_name, comp_spec['name'])
+    return True
+
+async def check_for_hosts_to_delete(app, plan_dict):
     """Checks for unused pods and deletes them."""
 
     for comp_name in app['components']:
@@ -643,7 +1542,7 @@ def check_for_hosts_to_delete(app, plan_dict):
                 logger.info(f'CHECK FOR HOSTS TO DELETE: pod_dict {pod_dict}')
                 if pod_dict['spec']['nodeName'] == host['host']:
                     pod_name = pod_dict['metadata']['name']
-                    resp = delete_and_wait_term(pod_name, app)
+                    resp = await delete_and_wait_term(pod_name, app)
                     if resp == False:
                         return False
 
@@ -663,29 +1562,30 @@ def check_for_hosts_to_delete(app, plan_dict):
     return True
 
 
-def delete_and_wait_term(pod_name, app):
+async def delete_and_wait_term(pod_name, app):
     logger.info('Deleting pod with name:%s', pod_name)
-    nodes = get_k8s_nodes()    
+    pod = await read_pod(pod_name)
 
-    resp = delete_pod(pod_name, app)
+    resp = await delete_pod(pod_name, app)
     if not resp:
         return False
 
-    # Check until status is Terminating with sleep(0.1)
-    # Also handle exception
-    while True:
-        resp = read_pod(pod_name)
-        
-        if not resp or resp.status.phase != "Running" or get_node_availability(resp.spec.node_name, nodes) == False:
-            break
-        
-        time.sleep(0.1)
+    # A pod on an offline host keeps its Running status after deletion.
+    if pod and pod.spec.node_name and not await node_is_ready(pod.spec.node_name):
+        logger.info('Host %s of pod %s is not ready. Not waiting.', pod.spec.node_name, pod_name)
+        return True
+
+    # Wait until the pod is no longer Running (terminating or removed)
+    if not await wait_for_pod(pod_name, lambda pod: not pod or pod.status.phase != "Running",
+                              cluster_config.POD_TERMINATION_TIMEOUT):
+        logger.error('Pod %s is still running after deletion', pod_name)
+        return False
 
     logger.info('Deleted pod with name:%s',pod_name)
 
     return True
 
-def deploy_new_pods(app, plan_dict):
+async def deploy_new_pods(app, plan_dict):
     """Deployment of new pods."""
 
     for comp_name in app['components']:
@@ -695,7 +1595,7 @@ def deploy_new_pods(app, plan_dict):
             if pod_dict['status'] != 'PENDING':
                 continue
 
-            if not create_pod(app, pod_dict['file'], comp_spec):
+            if not await create_pod(app, pod_dict['file'], comp_spec):
                 logger.error('Create pod failed. Returning False')
                 return False
             
@@ -708,20 +1608,41 @@ def deploy_new_pods(app, plan_dict):
 
     return True
 
-def check_violated_priority(high, low, priority_list):
-    # Assuming single dependency per app 
-    high_idx = priority_list.index(high)
-    low_idx = priority_list.index(low)
+def get_component_dependencies(comp_spec):
+    """Names of the components the given component must wait for (depends_on)."""
+    return list(comp_spec.get('depends_on') or comp_spec.get('DependsOn') or [])
+
+def plan_rollout(dependencies):
+    """Order components in rollout waves from their dependencies.
+
+    Args:
+        dependencies (dict): Key component name, value the names it depends on.
+            Dependencies outside the dict are ignored.
+
+    Returns:
+        list: Lists of component names; each wave only depends on earlier ones.
+        None if the dependencies contain a cycle.
+    """
+    remaining = {comp: set(deps) & set(dependencies) - {comp} for comp, deps in dependencies.items()}
+    waves = []
+
+    while remaining:
+        wave = sorted(comp for comp, deps in remaining.items() if not deps)
+        if not wave:
+            logger.error('Dependency cycle between components %s', sorted(remaining))
+            return None
+        waves.append(wave)
+        for comp in wave:
+            del remaining[comp]
+        for deps in remaining.values():
+            deps.difference_update(wave)
 
-    if low_idx < high_idx:
-        temp = priority_list[low_idx]
-        priority_list[low_idx] = priority_list[high_idx]
-        priority_list[high_idx] = temp
+    return waves
 
-def update_pod_image(api, pod_name, new_img):
+async def update_pod_image(api, pod_name, new_img):
 
     # Get the Pod
-    pod = read_pod(pod_name)
+    pod = await read_pod(pod_name)
     if not pod:
         return False
 
@@ -743,14 +1664,14 @@ def update_pod_image(api, pod_name, new_img):
     }
 
     try:
-        api.patch_namespaced_pod(name=pod_name, namespace=cluster_config.NAMESPACE, body=patch)
-    except ApiException as exc:
+        await api.patch_namespaced_pod(name=pod_name, namespace=cluster_config.NAMESPACE, body=patch)
+    except kubernetes_asyncio.client.exceptions.ApiException as exc:
         logger.error('Failed to patch Pod: %s', exc)
         return False
 
     return True
 
-def change_comp_spec(app, comp_plan, comp_spec, constraints, nodes_list, plan_uid=None):
+async def change_comp_spec(app, comp_plan, comp_spec, constraints, nodes_list, plan_uid=None):
     """Update component's Pod spec.
     'change_spec' action modifies the Pod's runtimeClass and resources.
     Args:
@@ -764,7 +1685,6 @@ def change_comp_spec(app, comp_plan, comp_spec, constraints, nodes_list, plan_ui
     # (3) Remove the old Pod.
     # (4) Update the pod name in the list of pod names.
     
-    api = client.CoreV1Api()
     updated_spec = None
     pod_to_update = None
     comp_name = comp_spec['name']
@@ -785,8 +1705,17 @@ def change_comp_spec(app, comp_plan, comp_spec, constraints, nodes_list, plan_ui
         logger.error(f"Did not find {comp_name} in pod list {app['pod_names']}")
    
     if comp_plan['action'] == 'change_spec':
-        new_spec = comp_plan['new_spec']
-        new_spec['metadata'] = pod_dict['metadata']
+        # The new template keeps the component metadata without the instance fields,
+        # and is hashed again so adopt_app_pods keeps the Pods created from it
+        template = comp_plan['new_spec']
+        template['metadata'] = copy.deepcopy(pod_dict['metadata'])
+        template['metadata']['name'] = comp_name
+        labels = template['metadata'].setdefault('labels', {})
+        labels['mlsysops.eu/componentUID'] = None
+        labels.pop('mlsysops.eu/planUID', None)
+        template['spec'].pop('nodeName', None)
+        annotate_template_hash(template)
+        new_spec = copy.deepcopy(template)
 
         # if not validate_host(new_spec, comp_spec, comp_plan['host'], nodes_list):
         #     logger.error(f"Host {comp_plan['host']} did not pass eligibility check")
@@ -809,14 +1738,34 @@ def change_comp_spec(app, comp_plan, comp_spec, constraints, nodes_list, plan_ui
             return False, {}
 
         #logger.info(f"new spec {new_spec}")
-        resp = create_pod(app, new_spec, comp_spec)
+        phases = {}
+        started = time.perf_counter()
+        resp = await create_pod(app, new_spec, comp_spec)
         if not resp:
             return False, {}
+        phases['create'] = time.perf_counter() - started
+
+        if cluster_config.RELOCATION_MODE == 'make_before_break':
+            # Keep the old Pod serving until the new one is ready
+            started = time.perf_counter()
+            if not await wait_pods_ready([new_pod_name], cluster_config.POD_READY_TIMEOUT):
+                logger.error('Pod %s did not become ready. Keeping %s.', new_pod_name, old_pod_name)
+                await delete_pod(new_pod_name, app)
+                return False, {}
+            phases['ready'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            await drain_pods([old_pod_name])
+            phases['drain'] = time.perf_counter() - started
 
         # Delete the old Pod.
-        resp = delete_and_wait_term(old_pod_name, app)
+        started = time.perf_counter()
+        resp = await delete_and_wait_term(old_pod_name, app)
         if resp == False:
             return False, {}
+        phases['delete'] = time.perf_counter() - started
+        logger.info('Replaced Pod %s with %s, phase latency (s): %s', old_pod_name, new_pod_name,
+                    {phase: round(duration, 3) for phase, duration in phases.items()})
 
         for manifest_entry in comp_spec['pod_manifests']:
             if manifest_entry['file']['metadata']['name'] == old_pod_name:
@@ -824,13 +1773,107 @@ def change_comp_spec(app, comp_plan, comp_spec, constraints, nodes_list, plan_ui
 
         # Replace old pod name with a new one.
         app['pod_names'] = list(map(lambda x: new_pod_name if x == old_pod_name else x, app['pod_names']))
-        comp_spec['pod_template'] = new_spec
+        comp_spec['pod_template'] = template
+        comp_spec['template_version'] = TEMPLATES.new_version(app['spec'])
+        TEMPLATES.invalidate(app['name'], comp_name)
+        return True, new_spec
 
     return True, comp_spec['pod_template']
 
-def deploy_app_pods_and_configs(app, nodes_list, plan_uid=None):
+async def deploy_component(app, comp_name, initial_deployment, plan_dict, plan_uid=None):
+    """Create the Pods of all pending instances of a component.
+
+    Returns:
+        list: The names of the created Pods, None on failure.
+    """
+    comp_spec = app['components'][comp_name]
+    pod_names = []
+
+    logger.info('GOING TO DEPLOY: %s', comp_name)
+
+    plan_dict[comp_name] = copy.deepcopy(CompDict)
+    if 'qos_metrics' in comp_spec:
+        plan_dict[comp_name]['qos_metrics'] = comp_spec['qos_metrics']
+
+    for instance in initial_deployment[comp_name]:
+        if instance['status'] != 'PENDING':
+            continue
+        
+        logger.info('Valid cluster_id for comp %s. Deploying ...', comp_name)
+        logger.info('Comp status: %s',instance['status'])
+        
+        uid = get_random_key(8)
+        pod_name = '{}-{}'.format(comp_name, uid)
+
+        # Retrieve the policy developer's desired host from the initial_deployment structure
+        host_name = instance['host']
+        instance['status'] = 'ACTIVE'
+        comp_spec['hosts'] = copy.deepcopy(initial_deployment[comp_name])
+        
+        # if not validate_host(pod_template, comp_spec, host_name, nodes_list):
+        #     logger.error(f"Host {host_name} did not pass eligibility check")
+        #     return None
+        
+        pod_dict = TEMPLATES.render(app['name'], comp_spec, pod_name, host_name, plan_uid=plan_uid)
+        comp_spec['pod_manifests'].append({'file':pod_dict,'status':'PENDING'})
+
+        resp = await create_pod(app, pod_dict, comp_spec)
+        if not resp:
+            logger.error(f'Pod {pod_name} not created.')
+            return None
+        
+        pod_names.append(pod_name)
+        plan_dict[comp_name]['specs'][pod_dict['metadata']['name']] = create_pod_dict(
+                                                                        pod_dict['spec']['nodeName'],
+                                                                        MessageEvents.POD_ADDED.value,
+                                                                        {'comp_spec':comp_spec['spec'],
+                                                                        'pod_spec': pod_dict}
+                                                                    ) 
+
+    return pod_names
+
+async def wait_component_running(pod_names):
+    """Wait for the Pods of a component to start running.
+
+    Pods on hosts that are not ready are not waited for.
+
+    Returns:
+        bool: False if a Pod was removed or did not start in time.
+    """
+    async def wait_pod(pod_name):
+        pod = await read_pod(pod_name)
+        if not pod:
+            return False
+
+        logger.info('Waiting for comp %s to start running on %s', pod_name, pod.spec.node_name)
+        if not await node_is_ready(pod.spec.node_name):
+            logger.error('Failed to get node availability. %s', pod.spec.node_name)
+            return True
+
+        removed = False
+        seen = False
+        def pod_started(pod):
+            # The cache may not have seen a Pod we just created, only a Pod
+            # that disappears after it was seen is removed.
+            nonlocal removed, seen
+            if pod is None:
+                removed = seen
+                return removed
+            seen = True
+            return pod.status.phase == "Running"
+
+        return await wait_for_pod(pod_name, pod_started, cluster_config.POD_READY_TIMEOUT) and not removed
+
+    results = await asyncio.gather(*(wait_pod(pod_name) for pod_name in pod_names))
+    return all(results)
+
+async def deploy_app_pods_and_configs(app, nodes_list, plan_uid=None):
     """Deploy Pods and policy configs for all selected component instances.
 
+    Components are rolled out in parallel, up to cluster_config.ROLLOUT_CONCURRENCY
+    at a time. A component listed in the depends_on of another one must be running
+    before the dependent component is deployed.
+
     Args:
         app (dict): The FluidityApp info dictionary.
         nodes_list (dict): The Fluidity-related node dictionary.
@@ -841,100 +1884,61 @@ def deploy_app_pods_and_configs(app, nodes_list, plan_uid=None):
         component with the respective PodDicts.
     """
     logger.info('Deploy Pods for components of app: %s', app['name'])
-    api = client.CoreV1Api()
     initial_deployment = app['curr_plan']['curr_deployment']
 
     if 'pod_names' not in app:
         app['pod_names'] = []
         app['total_pods'] = 0
 
-    app_spec = app['spec']
-    priority_list = [key for key in app['components']]
-    deployment_dependency = False
+    dependencies = {}
+    for comp_name in initial_deployment:
+        if comp_name not in app['components']:
+            continue
 
-    for comp_name in app['components']:
-        comp_spec = app['components'][comp_name]['spec']
+        comp_spec = app['components'][comp_name]
+        if  comp_spec['cluster_id'] != cluster_config.CLUSTER_ID:
+            logger.info('Found wrong cluster_id %s for comp %s (correct: %s). Ignoring ...', 
+                         comp_spec['cluster_id'], comp_name, cluster_config.CLUSTER_ID)
+            continue
 
-        if 'DependsOn' in comp_spec:
-            deployment_dependency = True
-            low = comp_name
-            high = comp_spec['DependsOn'][0]
-            check_violated_priority(high, low, priority_list)
+        dependencies[comp_name] = get_component_dependencies(comp_spec['spec'])
 
-    plan_dict = {}
+    waves = plan_rollout(dependencies)
+    if waves is None:
+        return False, {}
+    logger.info('Rollout waves for app %s: %s', app['name'], waves)
 
-    for priority_entry in priority_list:
-        for comp_name in initial_deployment:
-            if comp_name != priority_entry or comp_name not in app['components']:
-                continue
-                
-            pod_name = None
-            comp_spec = app['components'][comp_name]
-            
+    dependents = {dep for deps in dependencies.values() for dep in deps if dep in dependencies}
+    plan_dict = {}
+    running = {comp_name: asyncio.get_running_loop().create_future() for comp_name in dependencies}
+    semaphore = asyncio.Semaphore(cluster_config.ROLLOUT_CONCURRENCY)
+
+    async def rollout(comp_name):
+        # Gate on the components this one depends on
+        for dep in dependencies[comp_name]:
+            if dep in running and not await running[dep]:
+                logger.error('Not deploying %s, dependency %s failed.', comp_name, dep)
+                return False
 
-            logger.info('GOING TO DEPLOY: %s', comp_name)
+        async with semaphore:
+            pod_names = await deploy_component(app, comp_name, initial_deployment, plan_dict, plan_uid)
+            if pod_names is None:
+                return False
+            if comp_name in dependents:
+                return await wait_component_running(pod_names)
+        return True
 
-            if  comp_spec['cluster_id'] != cluster_config.CLUSTER_ID:
-                logger.info('Found wrong cluster_id %s for comp %s (correct: %s). Ignoring ...', 
-                             comp_spec['cluster_id'], comp_name, cluster_config.CLUSTER_ID)
-                continue
-            
-            plan_dict[comp_name] = copy.deepcopy(CompDict)
-            if 'qos_metrics' in comp_spec:
-                plan_dict[comp_name]['qos_metrics'] = comp_spec['qos_metrics']
+    async def rollout_and_signal(comp_name):
+        try:
+            result = await rollout(comp_name)
+        except Exception as e:
+            logger.error('Rollout of %s failed: %s', comp_name, e)
+            result = False
+        running[comp_name].set_result(result)
+        return result
+
+    results = await asyncio.gather(*(rollout_and_signal(comp_name) for comp_name in dependencies))
+    if not all(results):
+        return False, {}
 
-            for instance in initial_deployment[comp_name]:
-                if instance['status'] != 'PENDING':
-                    continue
-                
-                logger.info('Valid cluster_id for comp %s. Deploying ...', comp_name)
-                logger.info('Comp status: %s',instance['status'])
-                
-                pod_template = comp_spec['pod_template']
-                pod_dict = copy.deepcopy(pod_template)
-                uid = get_random_key(8)
-                pod_name = '{}-{}'.format(comp_name, uid)
-                extend_pod_instance(pod_dict, pod_name, plan_uid=plan_uid)
-
-                # Retrieve the policy developer's desired host from the initial_deployment structure
-                host_name = instance['host']
-                instance['status'] = 'ACTIVE'
-                comp_spec['hosts'] = copy.deepcopy(initial_deployment[comp_name])
-                
-                # if not validate_host(pod_template, comp_spec, host_name, nodes_list):
-                #     logger.error(f"Host {host_name} did not pass eligibility check")
-                #     return False, {}
-                
-                pin_pod_instance(pod_dict, host_name)
-                comp_spec['pod_manifests'].append({'file':pod_dict,'status':'PENDING'})
-
-                resp = create_pod(app, pod_dict, comp_spec)
-                if not resp:
-                    logger.error(f'Pod {pod_name} not created.')
-                    return False, {}
-                
-                plan_dict[comp_name]['specs'][pod_dict['metadata']['name']] = create_pod_dict(
-                                                                                pod_dict['spec']['nodeName'],
-                                                                                MessageEvents.POD_ADDED.value,
-                                                                                {'comp_spec':comp_spec['spec'],
-                                                                                'pod_spec': pod_dict}
-                                                                            ) 
-
-            if deployment_dependency == True:
-                while True:
-                    nodes = get_k8s_nodes()
-                    resp = read_pod(pod_name)
-                    if not resp:
-                        return False, {}
-
-                    logger.info('Waiting for comp %s to start running on %s', pod_name, resp.spec.node_name)
-
-                    if resp.status.phase == "Running" and get_node_availability(resp.spec.node_name, nodes):
-                        break
-                    elif get_node_availability(resp.spec.node_name, nodes) == False:
-                        logger.error('Failed to get node availability. %s', resp.spec.node_name)
-                        break
-
-                    time.sleep(0.5)
-
-    return True, plan_dict
\ No newline at end of file
+    return True, plan_dict
@@ -110,6 +110,8 @@ class FluidityMonitor():
                 list_func = self.v1_api.list_node
                 crd_plural = None
 
+            # Not persisted: the mechanism rebuilds its node state from the
+            # ADDED events the watch replays on every start
             watcher_obj = watcher.ResourceWatcher(
                 list_func=list_func,
                 resource_description=resource_description,
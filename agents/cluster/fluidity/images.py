@@ -0,0 +1,121 @@
+#   Copyright (c) 2025. MLSysOps Consortium
+#   #
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#   #
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   #
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  #
+#  #
+"""Per-node cache of the container images present on the nodes.
+
+The cache is fed by the Node informer of the cluster cache (see informer.py)
+with the images each kubelet reports in the Node status, and by the pre-pulls
+Fluidity confirms (see deploy.prepull_image). The kubelet only reports the
+largest images of a node, so the confirmed pre-pulls are kept separately and
+survive Node status updates until the node is deleted.
+
+Image references are compared in their normalized form, e.g. ``nginx`` and
+``docker.io/library/nginx:latest`` are the same image. A reference pinned by
+digest only matches an image with that digest.
+"""
+from mlsysops.logger_util import logger
+
+#: Registry of image references without a registry host
+DEFAULT_REGISTRY = 'docker.io'
+
+
+def normalize_image(image):
+    """The fully qualified form of an image reference (registry, repository and tag or digest)."""
+    name, sep, digest = image.partition('@')
+    parts = name.split('/')
+    if len(parts) == 1 or ('.' not in parts[0] and ':' not in parts[0] and parts[0] != 'localhost'):
+        if len(parts) == 1:
+            parts.insert(0, 'library')
+        parts.insert(0, DEFAULT_REGISTRY)
+    name = '/'.join(parts)
+    if not sep and ':' not in parts[-1]:
+        name += ':latest'
+    return name + sep + digest
+
+
+def _repository(name):
+    """The registry and repository of a normalized reference (without digest), dropping the tag."""
+    head, _, last = name.rpartition('/')
+    return head + '/' + last.partition(':')[0]
+
+
+def image_digest(image_id):
+    """The digest of a container status imageID, e.g. docker.io/library/nginx@sha256:..."""
+    if not image_id:
+        return None
+    return image_id.rpartition('@')[2] or None
+
+
+class ImageCache:
+    """Images known to be present on every node.
+
+    Attributes:
+        reported (dict): Key node name, value the set of normalized image
+            references the kubelet reports in the Node status.
+        pulled (dict): Key node name, value a dict from the normalized image
+            reference to its digest, for the images pre-pulled by Fluidity.
+        inflight (dict): Key (node name, normalized image), value the task of
+            the pre-pull in progress.
+    """
+
+    def __init__(self):
+        self.reported = {}
+        self.pulled = {}
+        self.inflight = {}
+
+    # Informer listener
+
+    def on_node_event(self, event_type, name, node):
+        if event_type == 'SYNC':
+            self.reported = {}
+            for obj in node:
+                self._set_node(obj.metadata.name, obj)
+        elif event_type == 'DELETED':
+            self.reported.pop(name, None)
+            self.pulled.pop(name, None)
+        else:
+            self._set_node(name, node)
+
+    def _set_node(self, name, node):
+        images = set()
+        for image in (node.status.images or []) if node.status else []:
+            images.update(normalize_image(ref) for ref in image.names or [])
+        self.reported[name] = images
+
+    # Queries
+
+    def has_image(self, node_name, image):
+        """Whether an image is on a node, by digest if the reference pins one."""
+        image = normalize_image(image)
+        reported = self.reported.get(node_name, ())
+        pulled = self.pulled.get(node_name, {})
+        name, _, digest = image.partition('@')
+        if not digest:
+            return image in reported or image in pulled
+
+        # The kubelet reports pinned images as repository@digest
+        repository = _repository(name)
+        if '{}@{}'.format(repository, digest) in reported:
+            return True
+        return any(pulled_digest == digest and _repository(ref.partition('@')[0]) == repository
+                   for ref, pulled_digest in pulled.items())
+
+    def record_pull(self, node_name, image, digest=None):
+        self.pulled.setdefault(node_name, {})[normalize_image(image)] = digest
+        logger.debug('Image %s present on %s (digest %s)', image, node_name, digest)
+
+
+#: The image cache shared by the Fluidity modules, fed by the cluster cache
+IMAGES = ImageCache()
@@ -0,0 +1,307 @@
+#   Copyright (c) 2025. MLSysOps Consortium
+#   #
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#   #
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   #
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  #
+#  #
+"""Watch-fed local cache of Nodes, Pods and MLSysOps custom resources.
+
+Consistency contract:
+
+* An informer lists its objects once, then follows a watch from the listed
+  resourceVersion. Reads return the state of the last applied watch event, so
+  they lag the API server by the watch delivery delay (typically sub-second).
+* Every ``RESYNC_PERIOD`` seconds, and after a 410 (resourceVersion too old),
+  the informer lists again and replaces its content.
+* Before an informer is synced (its first list finished), or if it has not
+  heard from the API server for ``RESYNC_PERIOD``, it is not fresh and readers
+  fall back to direct API calls.
+* Writes done by Fluidity only become visible once their watch event arrives.
+  Readers that need an object they just created (e.g. a new Pod) fall back to
+  the API on a cache miss.
+"""
+import asyncio
+import time
+
+import kubernetes_asyncio
+
+import cluster_config
+from cluster_config import API_GROUP, VERSION, CRDS_INFO_LIST
+from images import IMAGES
+from ledger import LEDGER, pod_key
+from mlsysops.logger_util import logger
+
+#: Seconds between full relists of an informer
+RESYNC_PERIOD = 300
+#: Label of the Pods deployed by Fluidity, holding the owner application name
+APP_LABEL = 'mlsysops.eu/app'
+
+
+def _metadata(obj):
+    """Name, labels and resourceVersion of an API model object or CR dict."""
+    if isinstance(obj, dict):
+        metadata = obj.get('metadata', {})
+        return metadata.get('name'), metadata.get('labels') or {}, metadata.get('resourceVersion')
+    return obj.metadata.name, obj.metadata.labels or {}, obj.metadata.resource_version
+
+
+def _list_version(resp):
+    if isinstance(resp, dict):
+        return resp['metadata']['resourceVersion'], resp['items']
+    return resp.metadata.resource_version, resp.items
+
+
+class Informer:
+    """List-then-watch cache of one kind of object, indexed by name.
+
+    Args:
+        kind (str): Description used in logs.
+        list_func (callable): The async list function of the kind.
+        query_kwargs (dict): Extra list/watch arguments (namespace, selectors).
+        indexers (dict): Key index name, value a function returning the index
+            values of an object.
+        key_func (callable): Returns the cache key of an object, its name by default.
+        listeners (list): Called with (event type, key, object) on every change,
+            and with ('SYNC', None, objects) after every list.
+    """
+
+    def __init__(self, kind, list_func, query_kwargs=None, indexers=None, key_func=None, listeners=None):
+        self.kind = kind
+        self.list_func = list_func
+        self.query_kwargs = query_kwargs or {}
+        self.indexers = indexers or {}
+        self.key_func = key_func or (lambda obj: _metadata(obj)[0])
+        self.listeners = listeners or []
+        self.items = {}
+        self.indexes = {index: {} for index in self.indexers}
+        self.synced = asyncio.Event()
+        self.last_update = 0.0
+        self._resource_version = None
+        self._waiters = {}
+
+    def get(self, name):
+        return self.items.get(name)
+
+    def list(self):
+        return list(self.items.values())
+
+    def by_index(self, index, value):
+        return [self.items[name] for name in self.indexes[index].get(value, ())]
+
+    def is_fresh(self):
+        return self.synced.is_set() and time.time() - self.last_update < RESYNC_PERIOD
+
+    async def wait_for(self, name, condition, timeout):
+        """Wait until condition(object) holds for the named object.
+
+        The condition is called with the cached object, or None if it is not
+        in the cache, every time the object changes.
+
+        Returns:
+            bool: True if the condition was met, False on timeout.
+        """
+        if condition(self.items.get(name)):
+            return True
+
+        waiter = (condition, asyncio.get_running_loop().create_future())
+        self._waiters.setdefault(name, []).append(waiter)
+        try:
+            return await asyncio.wait_for(waiter[1], timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            waiters = self._waiters.get(name, [])
+            if waiter in waiters:
+                waiters.remove(waiter)
+            if not waiters:
+                self._waiters.pop(name, None)
+
+    def _notify(self, name):
+        for condition, future in list(self._waiters.get(name, ())):
+            if not future.done() and condition(self.items.get(name)):
+                future.set_result(True)
+
+    def _index(self, name, obj, add):
+        for index, indexer in self.indexers.items():
+            for value in indexer(obj) or ():
+                names = self.indexes[index].setdefault(value, set())
+                if add:
+                    names.add(name)
+                else:
+                    names.discard(name)
+                    if not names:
+                        del self.indexes[index][value]
+
+    def _store(self, name, obj):
+        old = self.items.get(name)
+        if old is not None:
+            self._index(name, old, add=False)
+        self.items[name] = obj
+        self._index(name, obj, add=True)
+
+    def _remove(self, name):
+        old = self.items.pop(name, None)
+        if old is not None:
+            self._index(name, old, add=False)
+
+    async def _relist(self):
+        resp = await self.list_func(**self.query_kwargs)
+        self._resource_version, items = _list_version(resp)
+        self.items = {}
+        self.indexes = {index: {} for index in self.indexers}
+        for obj in items:
+            self._store(self.key_func(obj), obj)
+        self.last_update = time.time()
+        self.synced.set()
+        for listener in self.listeners:
+            listener('SYNC', None, items)
+        for name in list(self._waiters):
+            self._notify(name)
+        logger.debug(f'Informer {self.kind} synced with {len(self.items)} objects')
+
+    async def run(self):
+        next_relist = 0
+        while True:
+            try:
+                if self._resource_version is None or time.time() >= next_relist:
+                    await self._relist()
+                    next_relist = time.time() + RESYNC_PERIOD
+
+                w = kubernetes_asyncio.watch.Watch()
+                try:
+                    async with w.stream(self.list_func, resource_version=self._resource_version,
+                                        timeout_seconds=int(RESYNC_PERIOD), **self.query_kwargs) as stream:
+                        async for event in stream:
+                            obj = event['object']
+                            if event['type'] == 'ERROR':
+                                # Expired resourceVersion reported inside the stream
+                                self._resource_version = None
+                                break
+                            _, _, resource_version = _metadata(obj)
+                            name = self.key_func(obj)
+                            if event['type'] == 'DELETED':
+                                self._remove(name)
+                            else:
+                                self._store(name, obj)
+                            for listener in self.listeners:
+                                listener(event['type'], name, obj)
+                            self._notify(name)
+                            self._resource_version = resource_version
+                            self.last_update = time.time()
+                finally:
+                    w.stop()
+                # The watch timed out without news, the cache is still current
+                self.last_update = time.time()
+            except asyncio.CancelledError:
+                break
+            except kubernetes_asyncio.client.exceptions.ApiException as exc:
+                if exc.status == 410:
+                    logger.debug(f'Informer {self.kind}: resource version too old, relisting')
+                elif exc.status == 403:
+                    logger.error(f'Informer {self.kind} is not allowed to list/watch: {exc.reason}')
+                    await asyncio.sleep(RESYNC_PERIOD)
+                else:
+                    logger.error(f'Informer {self.kind} watch failed: {exc}')
+                    await asyncio.sleep(1)
+                self._resource_version = None
+            except Exception as e:
+                logger.error(f'Informer {self.kind} unexpected error: {e}')
+                self._resource_version = None
+                await asyncio.sleep(1)
+
+
+def _pod_app(pod):
+    app = (pod.metadata.labels or {}).get(APP_LABEL)
+    return [app] if app else []
+
+
+def _pod_node(pod):
+    return [pod.spec.node_name] if pod.spec and pod.spec.node_name else []
+
+
+def _mls_node_layer(node):
+    return [node.get('continuum_layer') or 'generic']
+
+
+class ClusterCache:
+    """Informers of the objects Fluidity reads while handling plans.
+
+    Attributes:
+        nodes (Informer): Kubernetes Nodes, feeding the resource ledger and the
+            image cache.
+        pods (Informer): Fluidity Pods, indexed by owner app and by node.
+        bound_pods (Informer): Pending and running Pods of all namespaces, keyed
+            by namespace/name, that feed the resource ledger.
+        crs (dict): Key CR plural, value the Informer of the MLSysOps CRs,
+            MLSysOpsNodes are indexed by continuum layer.
+    """
+
+    def __init__(self):
+        self.nodes = None
+        self.pods = None
+        self.bound_pods = None
+        self.crs = {}
+        self._tasks = []
+
+    async def start(self, sync_timeout=30):
+        """Start the informers and wait for their first list.
+
+        Must be called after cluster_config.NAMESPACE is set.
+        """
+        core_api = kubernetes_asyncio.client.CoreV1Api()
+        crd_api = kubernetes_asyncio.client.CustomObjectsApi()
+
+        self.nodes = Informer('Node', core_api.list_node, listeners=[LEDGER.on_node_event, IMAGES.on_node_event])
+        self.pods = Informer('Pod', core_api.list_namespaced_pod,
+                             query_kwargs={'namespace': cluster_config.NAMESPACE, 'label_selector': APP_LABEL},
+                             indexers={'app': _pod_app, 'node': _pod_node})
+        self.bound_pods = Informer('Pod (all namespaces)', core_api.list_pod_for_all_namespaces,
+                                   query_kwargs={'field_selector': 'status.phase!=Succeeded,status.phase!=Failed'},
+                                   key_func=pod_key, listeners=[LEDGER.on_pod_event])
+
+        def list_crs(plural):
+            return lambda **kwargs: crd_api.list_namespaced_custom_object(
+                group=API_GROUP, version=VERSION, namespace=cluster_config.NAMESPACE, plural=plural, **kwargs)
+
+        for crd_info in CRDS_INFO_LIST:
+            plural = crd_info['plural']
+            indexers = {'layer': _mls_node_layer} if plural == 'mlsysopsnodes' else None
+            self.crs[plural] = Informer(crd_info['kind'], list_crs(plural), indexers=indexers)
+
+        informers = [self.nodes, self.pods, self.bound_pods, *self.crs.values()]
+        self._tasks = [asyncio.create_task(informer.run()) for informer in informers]
+        try:
+            await asyncio.wait_for(asyncio.gather(*(informer.synced.wait() for informer in informers)),
+                                   sync_timeout)
+        except asyncio.TimeoutError:
+            logger.error('Cluster cache did not sync in %ss, reads fall back to the API', sync_timeout)
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def fresh(self, informer):
+        return informer is not None and informer.is_fresh()
+
+    def ledger_fresh(self):
+        """Whether the resource ledger can answer feasibility queries."""
+        return LEDGER.synced and self.fresh(self.nodes) and self.fresh(self.bound_pods)
+
+    def cr(self, plural):
+        """The informer of a CR plural if it is fresh, None otherwise."""
+        informer = self.crs.get(plural)
+        return informer if self.fresh(informer) else None
+
+
+#: The cache shared by the Fluidity modules
+CACHE = ClusterCache()
@@ -0,0 +1,321 @@
+#   Copyright (c) 2025. MLSysOps Consortium
+#   #
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#   #
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   #
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  #
+#  #
+"""Per-node ledger of allocatable and requested resources.
+
+The ledger is fed by the Node and Pod informers of the cluster cache (see
+informer.py) and keeps, per node, the allocatable resources, the sum of the
+requests of the Pods bound to it and the sum of the reservations of in-flight
+plans. Feasibility queries only compare these running totals.
+
+Warm standby replicas (Pods with the mlsysops.eu/standbyFor label) are booked
+in a separate per-node total, so their overhead can be reported on its own. A
+promoted standby loses the label and its requests move to the bound Pods.
+
+A plan reserves the resources of a Pod before creating it. The reservation is
+turned into a Pod entry once the Pod is created, which the Pod watch event then
+replaces, and it expires if the plan never commits or releases it. Reserving
+checks and books the resources without yielding to the event loop, so two
+concurrent plans cannot overcommit a node.
+"""
+import itertools
+import time
+
+from kubernetes.utils.quantity import parse_quantity
+
+import cluster_config
+from mlsysops.logger_util import logger
+
+#: Prefixes of the node labels that describe its GPU class
+GPU_LABEL_PREFIXES = ('nvidia.com/', 'amd.com/', 'gpu.intel.com/', 'mlsysops.eu/gpu')
+#: Label of the warm standby replicas, holding the component name
+STANDBY_LABEL = 'mlsysops.eu/standbyFor'
+
+
+def _quantity(value):
+    try:
+        return float(parse_quantity(str(value)))
+    except ValueError:
+        logger.error('Invalid resource quantity %s', value)
+        return 0.0
+
+
+def _add(totals, requests, sign=1):
+    for resource, amount in requests.items():
+        totals[resource] = totals.get(resource, 0.0) + sign * amount
+
+
+def _get(obj, field):
+    return obj.get(field) if isinstance(obj, dict) else getattr(obj, field, None)
+
+
+def _container_requests(container):
+    resources = _get(container, 'resources')
+    requests = _get(resources, 'requests') if resources else None
+    return {resource: _quantity(value) for resource, value in (requests or {}).items()}
+
+
+def pod_requests(pod):
+    """Resource requests of a Pod object or manifest.
+
+    As in the Kubernetes scheduler, a Pod requests the sum over its containers or
+    the largest init container request, whichever is higher.
+    """
+    spec = _get(pod, 'spec')
+    if spec is None:
+        return {}
+
+    requests = {}
+    for container in _get(spec, 'containers') or []:
+        _add(requests, _container_requests(container))
+
+    for container in _get(spec, 'init_containers' if not isinstance(spec, dict) else 'initContainers') or []:
+        for resource, amount in _container_requests(container).items():
+            requests[resource] = max(requests.get(resource, 0.0), amount)
+
+    return requests
+
+
+def pod_key(pod):
+    metadata = _get(pod, 'metadata')
+    return '{}/{}'.format(_get(metadata, 'namespace') or cluster_config.NAMESPACE, _get(metadata, 'name'))
+
+
+def _is_standby(pod):
+    labels = _get(_get(pod, 'metadata'), 'labels') or {}
+    return STANDBY_LABEL in labels
+
+
+def _pod_node(pod):
+    spec = _get(pod, 'spec')
+    return _get(spec, 'node_name' if not isinstance(spec, dict) else 'nodeName') if spec is not None else None
+
+
+class NodeAccount:
+    """Resources of one node.
+
+    Attributes:
+        allocatable (dict): Key resource name, value the allocatable amount
+            (cpu in cores, memory in bytes, extended resources in units).
+        requested (dict): Sum of the requests of the Pods bound to the node.
+        standby (dict): Sum of the requests of the standby replicas on the node.
+        reserved (dict): Sum of the reservations of in-flight plans.
+        labels (dict): The GPU class labels of the node.
+    """
+
+    def __init__(self):
+        self.allocatable = {}
+        self.requested = {}
+        self.standby = {}
+        self.reserved = {}
+        self.labels = {}
+
+    def free(self, resource):
+        return (self.allocatable.get(resource, 0.0) - self.requested.get(resource, 0.0)
+                - self.standby.get(resource, 0.0) - self.reserved.get(resource, 0.0))
+
+
+class ResourceLedger:
+    """Running view of allocatable minus requested resources per node.
+
+    Attributes:
+        nodes (dict): Key node name, value its NodeAccount.
+        pods (dict): Key namespace/name, value (node name, requests) of the
+            Pods bound to a node.
+        standby_pods (dict): As pods, for the standby replicas.
+        reservations (dict): Key reservation id, value (node name, requests,
+            expiry time).
+        synced (bool): True once both the Nodes and the Pods were listed.
+    """
+
+    def __init__(self, reservation_ttl=None):
+        self.reservation_ttl = reservation_ttl
+        self.nodes = {}
+        self.pods = {}
+        self.standby_pods = {}
+        self.reservations = {}
+        self._nodes_synced = False
+        self._pods_synced = False
+        self._ids = itertools.count(1)
+
+    @property
+    def synced(self):
+        return self._nodes_synced and self._pods_synced
+
+    def _account(self, node_name):
+        account = self.nodes.get(node_name)
+        if account is None:
+            account = self.nodes[node_name] = NodeAccount()
+        return account
+
+    # Informer listeners
+
+    def on_node_event(self, event_type, name, node):
+        if event_type == 'SYNC':
+            for account in self.nodes.values():
+                account.allocatable = {}
+                account.labels = {}
+            for obj in node:
+                self._set_node(obj.metadata.name, obj)
+            self._nodes_synced = True
+        elif event_type == 'DELETED':
+            account = self.nodes.get(name)
+            if account is not None:
+                account.allocatable = {}
+                account.labels = {}
+        else:
+            self._set_node(name, node)
+
+    def on_pod_event(self, event_type, key, pod):
+        if event_type == 'SYNC':
+            for node_name, requests in self.pods.values():
+                _add(self._account(node_name).requested, requests, -1)
+            for node_name, requests in self.standby_pods.values():
+                _add(self._account(node_name).standby, requests, -1)
+            self.pods = {}
+            self.standby_pods = {}
+            for obj in pod:
+                self._set_pod(pod_key(obj), obj)
+            self._pods_synced = True
+        elif event_type == 'DELETED':
+            self._remove_pod(key)
+        else:
+            self._set_pod(key, pod)
+
+    def _set_node(self, name, node):
+        account = self._account(name)
+        account.allocatable = {resource: _quantity(value)
+                               for resource, value in (node.status.allocatable or {}).items()}
+        account.labels = {label: value for label, value in (node.metadata.labels or {}).items()
+                          if label.startswith(GPU_LABEL_PREFIXES)}
+
+    def _set_pod(self, key, pod):
+        node_name = _pod_node(pod)
+        self._remove_pod(key)
+        if not node_name:
+            # Not bound yet, Fluidity Pods are always pinned
+            return
+        self._book(key, node_name, pod_requests(pod), _is_standby(pod))
+
+    def _book(self, key, node_name, requests, standby=False):
+        if standby:
+            self.standby_pods[key] = (node_name, requests)
+            _add(self._account(node_name).standby, requests)
+        else:
+            self.pods[key] = (node_name, requests)
+            _add(self._account(node_name).requested, requests)
+
+    def _remove_pod(self, key):
+        entry = self.pods.pop(key, None)
+        if entry is not None:
+            _add(self._account(entry[0]).requested, entry[1], -1)
+        entry = self.standby_pods.pop(key, None)
+        if entry is not None:
+            _add(self._account(entry[0]).standby, entry[1], -1)
+
+    # Queries
+
+    def free(self, node_name):
+        """Free amount of every resource of a node."""
+        account = self.nodes.get(node_name)
+        if account is None:
+            return {}
+        return {resource: account.free(resource) for resource in account.allocatable}
+
+    def standby_overhead(self, node_name=None):
+        """Requests held by the standby replicas, of one node or of all nodes."""
+        if node_name is None:
+            accounts = self.nodes.values()
+        else:
+            accounts = [self.nodes[node_name]] if node_name in self.nodes else []
+        overhead = {}
+        for account in accounts:
+            _add(overhead, account.standby)
+        return {resource: amount for resource, amount in overhead.items() if amount}
+
+    def fits(self, node_name, requests, labels=None):
+        """Whether a node has the free resources (and GPU class labels) requested.
+
+        Args:
+            node_name (str): The node name.
+            requests (dict): Key resource name, value the requested amount, either
+                a Kubernetes quantity string or a parsed number.
+            labels (dict): Node labels that must match, e.g. the GPU product.
+
+        Returns:
+            bool: True if the requests fit in the free resources of the node.
+        """
+        account = self.nodes.get(node_name)
+        if account is None or not account.allocatable:
+            return False
+
+        for resource, amount in requests.items():
+            if isinstance(amount, str):
+                amount = _quantity(amount)
+            if amount and account.free(resource) < amount:
+                return False
+
+        for label, value in (labels or {}).items():
+            if account.labels.get(label) != value:
+                return False
+
+        return True
+
+    # Reservations
+
+    def reserve(self, node_name, requests, ttl=None):
+        """Book resources of a node for a Pod that is about to be created.
+
+        Returns:
+            int: The reservation id, None if the requests do not fit.
+        """
+        self.expire()
+        requests = {resource: _quantity(amount) if isinstance(amount, str) else amount
+                    for resource, amount in requests.items()}
+        if not self.fits(node_name, requests):
+            return None
+
+        ttl = ttl if ttl is not None else self.reservation_ttl or cluster_config.RESERVATION_TTL
+        reservation_id = next(self._ids)
+        self.reservations[reservation_id] = (node_name, requests, time.monotonic() + ttl)
+        _add(self._account(node_name).reserved, requests)
+        return reservation_id
+
+    def release(self, reservation_id):
+        entry = self.reservations.pop(reservation_id, None)
+        if entry is not None:
+            _add(self._account(entry[0]).reserved, entry[1], -1)
+        return entry
+
+    def commit(self, reservation_id, pod):
+        """Turn a reservation into the requests of the created Pod.
+
+        The Pod watch event later replaces the entry with the same values.
+        """
+        entry = self.release(reservation_id)
+        key = pod_key(pod)
+        if entry is not None and key not in self.pods and key not in self.standby_pods:
+            self._book(key, entry[0], entry[1], _is_standby(pod))
+
+    def expire(self, now=None):
+        now = now if now is not None else time.monotonic()
+        for reservation_id in [rid for rid, entry in self.reservations.items() if entry[2] <= now]:
+            node_name = self.reservations[reservation_id][0]
+            self.release(reservation_id)
+            logger.info('Reservation %s on %s expired', reservation_id, node_name)
+
+
+#: The ledger shared by the Fluidity modules, fed by the cluster cache
+LEDGER = ResourceLedger()
@@ -30,6 +30,8 @@ from objects_api import FluidityObjectsApi, FluidityApiException
 from util import human_to_byte, cpu_human_to_cores
 from uuid import UUID
 import cluster_config
+from informer import CACHE
+from ledger import LEDGER
 from cluster_config import API_GROUP, VERSION
 
 from mlsysops.logger_util import logger
@@ -101,8 +103,10 @@ def get_node_internal_ip(node_name):
         str: The IPv6 address.
     """
     node_address = None
-    v1 = client.CoreV1Api()
-    node = v1.read_node(node_name)
+    node = CACHE.nodes.get(node_name) if CACHE.fresh(CACHE.nodes) else None
+    if node is None:
+        v1 = client.CoreV1Api()
+        node = v1.read_node(node_name)
     for addr in node.status.addresses:
         if addr.type == 'InternalIP':
             node_address = addr.address
@@ -119,19 +123,27 @@ def node_provides_resources(node_name, target, nodes_list):
         bool: True, if the node can provide these resources, False otherwise
     """
 
-    node_exists = False
+    # Free resources of the node: allocatable minus requested and reserved
+    if CACHE.ledger_fresh():
+        if not LEDGER.fits(node_name, target):
+            logger.info('Check resources - node does not have free resources: %s (free %s)',
+                        node_name, LEDGER.free(node_name))
+            return False
+        return True
 
-    for node in nodes_list:
-        if node.metadata.name == node_name:
-            node_exists = True
-            logger.debug('Check resources - node exists: %s', node_name)
-    
-    if not node_exists:
+    if CACHE.fresh(CACHE.nodes):
+        node = CACHE.nodes.get(node_name)
+    else:
+        node = None
+        if any(node.metadata.name == node_name for node in nodes_list):
+            core_api = client.CoreV1Api()
+            node = core_api.read_node(node_name)
+
+    if node is None:
         logger.error('Node does not exist.')
         return False
 
-    core_api = client.CoreV1Api()
-    node = core_api.read_node(node_name)
+    logger.debug('Check resources - node exists: %s', node_name)
     # status = node.status
     allocatable = node.status.allocatable
     
@@ -178,6 +190,10 @@ def get_mls_nodes(node_plural, type):
     Returns:
         list: The list of node dictionaries based on the given node_plural
     """
+    informer = CACHE.cr(node_plural)
+    if informer is not None and 'layer' in informer.indexes:
+        return informer.by_index('layer', type)
+
     # Create dynamic client for CRDs
     api = client.CustomObjectsApi()
     node_list = []
@@ -218,6 +234,9 @@ def get_k8s_nodes():
     Returns:
         list: The nodes dictionaries.
     """
+    if CACHE.fresh(CACHE.nodes):
+        return CACHE.nodes.list()
+
     if 'KUBERNETES_PORT' in os.environ:
         config.load_incluster_config()
     else:
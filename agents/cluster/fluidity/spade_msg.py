@@ -30,7 +30,8 @@ PodDict = {
 
 CompDict = {
     'specs': {},  #: dict: keys are the pod names (including uids)), value is the respective of PodDict.
-    'qos_metrics': [] #: list of dict: the app metrics related to the component.
+    'qos_metrics': [], #: list of dict: the app metrics related to the component.
+    'standby': None #: dict: the warm standby replica (host, pod name, requests), if any.
 }
 
 EventDict = {
@@ -103,6 +103,7 @@ FluidityCompInfoDict = {
         'svc_fpath': None, #: str: Filepath to the service manifest file
         'svc_vip': None, #: str: The Virtual IP of the exposed service
         'svc_port': None, #: str: The port of the exposed service
+        'standby': None, #: dict: Warm standby settings (cpu, memory) and replica (host, pod_name), if enabled
         #: dict: Requested node resources
         'resources_requests': {
             'cpu': 0.0,
@@ -23,24 +23,48 @@ from kubernetes import client
 import kubernetes_asyncio
 from mlsysops.events import MessageEvents
 import copy
+import cluster_config
 
 from mlsysops.logger_util import logger
 
+def coalesce_operations(first, latest):
+    """Operation delivered for two events of the same object, None to drop both."""
+    if first == 'ADDED':
+        return None if latest == 'DELETED' else 'ADDED'
+    return latest
+
+
 class ResourceWatcher:
-    def __init__(self, list_func, resource_description, notification_queue, query_kwargs=None, crd_plural=None):
+    """Watches a resource and pushes its events to the notification queue.
+
+    Watches request bookmarks, so the resume point stays current even when the
+    watched objects do not change and a reconnect rarely hits 410 Gone. Events of
+    the same object that arrive within coalesce_window seconds are merged, only
+    the latest state is delivered.
+
+    Args:
+        coalesce_window (float): Seconds events are held for coalescing, 0 to
+            deliver each event immediately.
+    """
+    def __init__(self, list_func, resource_description, notification_queue, query_kwargs=None, crd_plural=None,
+                 coalesce_window=None):
         self.list_func = list_func
         self.resource_description = resource_description
         self.notification_queue = notification_queue
         self.query_kwargs = query_kwargs or {}
         self.crd_plural = crd_plural
+        self.coalesce_window = cluster_config.WATCH_COALESCE_WINDOW if coalesce_window is None else coalesce_window
         self._stop_event = asyncio.Event()        
         self._watch_stream = None
+        self._pending = {}
+        self._flush_task = None
     
     async def get_resource_version(self):
         resp = None
         
         try:
-            resp = await self.list_func(**self.query_kwargs)
+            # A single item page is enough to get a consistent resourceVersion
+            resp = await self.list_func(limit=1, **self.query_kwargs)
         
         except kubernetes_asyncio.client.exceptions.ApiException as e:
             logger.debug(f"Unhandled ApiException: {e}")
@@ -68,6 +92,7 @@ class ResourceWatcher:
                 stream_kwargs = dict(
                     resource_version=resource_version or '',
                     timeout_seconds=60,
+                    allow_watch_bookmarks=True,
                     **self.query_kwargs
                 )
                 
@@ -75,89 +100,21 @@ class ResourceWatcher:
                     async for event in stream:
                         operation = event['type']
                         obj = event['object']
+                        if operation == 'BOOKMARK':
+                            # Only carries the current resourceVersion
+                            resource_version = self._extract_resource_version(obj)
+                            continue
+                        if operation == 'ERROR':
+                            raise kubernetes_asyncio.client.exceptions.ApiException(
+                                status=obj.get('code') if isinstance(obj, dict) else None,
+                                reason=obj.get('message') if isinstance(obj, dict) else None)
+
                         metadata = self._extract_metadata(obj)
                         resource_version = metadata['resourceVersion']
                         name = metadata.get('name')
-                        uid = metadata.get('uid')
                         
                         logger.info(f"Event: {operation} - {self.resource_description}: {name}, plural {self.crd_plural}")
-
-                        msg = {
-                            'operation': operation,
-                            'origin': 'internal',
-                            'payload': {
-                                'name': name,
-                                'uid': uid,
-                                'resource': self.resource_description if self.resource_description != 'CRD' else self.crd_plural,
-                                'spec': obj if isinstance(obj, dict) else obj.to_dict()
-                            }
-                        }
-
-                        match self.resource_description:
-                            case 'Pod':
-                                # logger.info('Pod resource event')
-                                match operation:
-                                    case 'ADDED':
-                                        msg['event'] = MessageEvents.POD_ADDED.value
-                                    case 'MODIFIED':
-                                        msg['event'] = MessageEvents.POD_MODIFIED.value
-                                    case 'DELETED':
-                                        msg['event'] = MessageEvents.POD_DELETED.value
-                                    case _:
-                                        logger.info('kubernetes nodes unknown event.')
-                            case 'Node':
-                                logger.info('Node resource event')
-                                match operation:
-                                    case 'ADDED':
-                                        msg['event'] = MessageEvents.KUBERNETES_NODE_ADDED.value
-                                    case 'MODIFIED':
-                                        msg['event'] = MessageEvents.KUBERNETES_NODE_MODIFIED.value
-                                    case 'DELETED':
-                                        msg['event'] = MessageEvents.KUBERNETES_NODE_REMOVED.value
-                                    case _:
-                                        logger.info('kubernetes nodes unknown event.')
-                            case 'CRD':
-                                logger.info(f'CRD resource event {self.crd_plural}')
-                                msg['payload']['crd_plural'] = self.crd_plural
-                                match self.crd_plural:
-                                    case 'mlsysopsapps':
-                                        logger.info('MLSysOpsApp resource event')
-                                        match operation:
-                                            case 'ADDED':
-                                                msg['event'] = MessageEvents.APP_CREATED.value
-                                            case 'MODIFIED':
-                                                msg['event'] = MessageEvents.APP_UPDATED.value
-                                            case 'DELETED':
-                                                msg['event'] = MessageEvents.APP_DELETED.value
-                                            case _:
-                                                logger.info('mlsysopsnodes unknown event.')
-                                    case 'mlsysopsnodes':
-                                        logger.info('MLSysOpsNode resource event')
-                                        match operation:
-                                            case 'ADDED':
-                                                msg['event'] = MessageEvents.NODE_SYSTEM_DESCRIPTION_SUBMITTED.value
-                                            case 'MODIFIED':
-                                                msg['event'] = MessageEvents.NODE_SYSTEM_DESCRIPTION_UPDATED.value
-                                            case 'DELETED':
-                                                msg['event'] = MessageEvents.NODE_SYSTEM_DESCRIPTION_REMOVED.value
-                                            case _:
-                                                logger.info('mlsysopsnodes unknown event.')
-                                    case 'mlsysopsclusters':
-                                        logger.info('MLSysOpsNode resource event')
-                                        match operation:
-                                            case 'ADDED':
-                                                msg['event'] = MessageEvents.CLUSTER_SYSTEM_DESCRIPTION_SUBMITTED.value
-                                            case 'MODIFIED':
-                                                msg['event'] = MessageEvents.CLUSTER_SYSTEM_DESCRIPTION_UPDATED.value
-                                            case 'DELETED':
-                                                msg['event'] = MessageEvents.CLUSTER_SYSTEM_DESCRIPTION_REMOVED.value
-                                            case _:
-                                                logger.info('mlsysopsclusters unknown event.')
-                                    case _:
-                                        logger.info(f"Unknown CRD type: {event}")
-                            case _:
-                                logger.info(f"Unknown resource type: {event}")
-                        await self.notification_queue.put(msg)
+                        await self._deliver(operation, obj, metadata)
             except KeyboardInterrupt:
                 logger.info("Received keyboard interrupt, shutting down watcher.")
                 break
@@ -175,22 +132,139 @@ class ResourceWatcher:
             finally:
                 await self.close_watch()
 
+        await self._flush()
         logger.debug("Watcher shutting down...")
 
+    async def _deliver(self, operation, obj, metadata):
+        if self.coalesce_window <= 0:
+            msg = self._build_msg(operation, obj, metadata)
+            await self.notification_queue.put(msg)
+            return
+
+        key = metadata.get('uid') or metadata.get('name')
+        if key in self._pending:
+            first_operation = self._pending[key][0]
+            merged = coalesce_operations(first_operation, operation)
+            if merged is None:
+                del self._pending[key]
+                return
+            self._pending[key] = (merged, obj, metadata)
+        else:
+            self._pending[key] = (operation, obj, metadata)
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.coalesce_window)
+        await self._flush()
+
+    async def _flush(self):
+        pending, self._pending = self._pending, {}
+        for operation, obj, metadata in pending.values():
+            await self.notification_queue.put(self._build_msg(operation, obj, metadata))
+
+    def _build_msg(self, operation, obj, metadata):
+        name = metadata.get('name')
+        uid = metadata.get('uid')
+        msg = {
+            'operation': operation,
+            'origin': 'internal',
+            'payload': {
+                'name': name,
+                'uid': uid,
+                'resource': self.resource_description if self.resource_description != 'CRD' else self.crd_plural,
+                'spec': obj if isinstance(obj, dict) else obj.to_dict()
+            }
+        }
+
+        match self.resource_description:
+            case 'Pod':
+                # logger.info('Pod resource event')
+                match operation:
+                    case 'ADDED':
+                        msg['event'] = MessageEvents.POD_ADDED.value
+                    case 'MODIFIED':
+                        msg['event'] = MessageEvents.POD_MODIFIED.value
+                    case 'DELETED':
+                        msg['event'] = MessageEvents.POD_DELETED.value
+                    case _:
+                        logger.info('kubernetes nodes unknown event.')
+            case 'Node':
+                logger.info('Node resource event')
+                match operation:
+                    case 'ADDED':
+                        msg['event'] = MessageEvents.KUBERNETES_NODE_ADDED.value
+                    case 'MODIFIED':
+                        msg['event'] = MessageEvents.KUBERNETES_NODE_MODIFIED.value
+                    case 'DELETED':
+                        msg['event'] = MessageEvents.KUBERNETES_NODE_REMOVED.value
+                    case _:
+                        logger.info('kubernetes nodes unknown event.')
+            case 'CRD':
+                logger.info(f'CRD resource event {self.crd_plural}')
+                msg['payload']['crd_plural'] = self.crd_plural
+                match self.crd_plural:
+                    case 'mlsysopsapps':
+                        logger.info('MLSysOpsApp resource event')
+                        match operation:
+                            case 'ADDED':
+                                msg['event'] = MessageEvents.APP_CREATED.value
+                            case 'MODIFIED':
+                                msg['event'] = MessageEvents.APP_UPDATED.value
+                            case 'DELETED':
+                                msg['event'] = MessageEvents.APP_DELETED.value
+                            case _:
+                                logger.info('mlsysopsnodes unknown event.')
+                    case 'mlsysopsnodes':
+                        logger.info('MLSysOpsNode resource event')
+                        match operation:
+                            case 'ADDED':
+                                msg['event'] = MessageEvents.NODE_SYSTEM_DESCRIPTION_SUBMITTED.value
+                            case 'MODIFIED':
+                                msg['event'] = MessageEvents.NODE_SYSTEM_DESCRIPTION_UPDATED.value
+                            case 'DELETED':
+                                msg['event'] = MessageEvents.NODE_SYSTEM_DESCRIPTION_REMOVED.value
+                            case _:
+                                logger.info('mlsysopsnodes unknown event.')
+                    case 'mlsysopsclusters':
+                        logger.info('MLSysOpsNode resource event')
+                        match operation:
+                            case 'ADDED':
+                                msg['event'] = MessageEvents.CLUSTER_SYSTEM_DESCRIPTION_SUBMITTED.value
+                            case 'MODIFIED':
+                                msg['event'] = MessageEvents.CLUSTER_SYSTEM_DESCRIPTION_UPDATED.value
+                            case 'DELETED':
+                                msg['event'] = MessageEvents.CLUSTER_SYSTEM_DESCRIPTION_REMOVED.value
+                            case _:
+                                logger.info('mlsysopsclusters unknown event.')
+                    case _:
+                        logger.info(f"Unknown CRD type: {self.crd_plural}")
+            case _:
+                logger.info(f"Unknown resource type: {self.resource_description}")
+        return msg
+
     def _extract_metadata(self, obj):
         if self.resource_description == 'CRD':
             metadata = obj['metadata']
             return {
                 'name': metadata['name'],
+                'uid': metadata.get('uid'),
                 'resourceVersion': metadata['resourceVersion']
             }
         else:
             metadata = obj.metadata
             return {
                 'name': metadata.name,
+                'uid': metadata.uid,
                 'resourceVersion': metadata.resource_version
             }
 
+    def _extract_resource_version(self, obj):
+        if isinstance(obj, dict):
+            return obj.get('metadata', {}).get('resourceVersion')
+        return obj.metadata.resource_version
+
     async def close_watch(self):
         if self._watch_stream:
             try:
@@ -15,7 +15,8 @@
 #  #
 
 import asyncio
-import json
+import os
+import time
 import traceback
 from asyncio import CancelledError
 from dataclasses import dataclass, field
@@ -30,10 +31,17 @@ from fluidity.internal_payload import FluidityEvent
 # from mlsysops.logger_util import logger
 from mlsysops import MessageEvents
 import mlsysops
+from mlsysops.data.trace import TraceRecorder
 from mlsysops.logger_util import logger
 
 queues = {"inbound": None, "outbound": None}
 
+#: Number of Fluidity messages kept in the trace ring buffer
+TRACE_CAPACITY = int(os.getenv('FLUIDITY_TRACE_CAPACITY', 1000))
+#: Seconds between trace snapshots written to TRACE_FILE, 0 writes them only on demand
+TRACE_SNAPSHOT_INTERVAL = float(os.getenv('FLUIDITY_TRACE_SNAPSHOT_INTERVAL', 30))
+TRACE_FILE = os.getenv('FLUIDITY_TRACE_FILE', 'fluidity_dump.json')
+
 
 class FluidityMechanism:
 
@@ -52,6 +60,7 @@ class FluidityMechanism:
 
         self.internal_queue_inbound = asyncio.Queue()
         self.internal_queue_outbound = asyncio.Queue()
+        self.trace = TraceRecorder(capacity=TRACE_CAPACITY, path=TRACE_FILE, interval=TRACE_SNAPSHOT_INTERVAL)
 
         # Reverse the in- and out-, to make it more clear.
         asyncio.create_task(fluidity_controller.main(outbound_queue=self.internal_queue_inbound,
@@ -60,6 +69,7 @@ class FluidityMechanism:
 
         asyncio.create_task(self.internal_message_listener())
         asyncio.create_task(self.mlsysops_message_listener())
+        asyncio.create_task(self.trace.run())
 
     async def mlsysops_message_listener(self):
 
@@ -81,7 +91,8 @@ class FluidityMechanism:
                             plan_uid = plan_payload.get("plan_uid", None)
                             if plan_uid:
                                 self.fluidity_proxy_plans[plan_uid] = {"node": origin_node,
-                                                                       "plan": fluidity_internal_event}
+                                                                       "plan": fluidity_internal_event,
+                                                                       "received_at": time.time()}
                                 logger.debug(f"Received plan submitted from fluidity proxy: {plan_uid}")
                                 await self.internal_queue_outbound.put(fluidity_internal_payload)
                         case _:
@@ -108,11 +119,8 @@ class FluidityMechanism:
                 # Listen to fluidity messages
                 message = await self.internal_queue_inbound.get()
 
-                # Log or save message for debugging
-                with open("fluidity_dump.json", "w") as file:
-                    file.write(json.dumps(message, skipkeys=True, indent=4, default=str, ensure_ascii=False, sort_keys=True,
-                                          separators=(',', ': ')))
-                    file.write(",\n")  # Ensure a newline is added after the content
+                # Keep the message for debugging, see query_trace/snapshot_trace
+                self.trace.record(message)
 
                 event = message.get("event")
                 if not event:
@@ -143,12 +151,17 @@ class FluidityMechanism:
                             await self.inbound_queue.put({
                                 "event": MessageEvents.MESSAGE_TO_FLUIDITY_PROXY.value,
                                 "node": self.fluidity_proxy_plans[plan_uid]["node"],
+                                "app": data.get("name"),
+                                "component": None,
+                                "operation": MessageEvents.FLUIDITY_INTERNAL_PLAN_UPDATE.value,
                                 "payload": {
                                     "event": MessageEvents.FLUIDITY_INTERNAL_PLAN_UPDATE.value,
                                     "payload": message
                                 }
                             })
                             logger.test(f"|2| Fluidity mechanism received planuid:{plan_uid} status:Node forward to MLSNodeAgent:{self.fluidity_proxy_plans[plan_uid]['node']}")
+                            cluster_latency = time.time() - self.fluidity_proxy_plans[plan_uid]["received_at"]
+                            logger.test(f"|2| Fluidity mechanism planuid:{plan_uid} cluster hop latency:{cluster_latency:.3f}s")
                             del self.fluidity_proxy_plans[plan_uid]
                         else:
                             # forward the message to MLS agent
@@ -304,6 +317,9 @@ class FluidityMechanism:
                             await self.inbound_queue.put({
                                 "event": MessageEvents.MESSAGE_TO_FLUIDITY_PROXY.value,
                                 "node": node_name,
+                                "app": app_name,
+                                "component": component_name,
+                                "operation": event,
                                 "payload": self.state["nodes"][node_name]
                             })
                             logger.debug(f"Updated node '{node_name}' with component '{component_name}'")
@@ -388,6 +404,23 @@ def get_state():
         return {}
 
 
+def query_trace(app=None, event=None, since=None, until=None, limit=None):
+    """Recorded Fluidity messages matching the filters, as dictionaries (oldest first)."""
+    global fluidity_mechanism_instance
+    if fluidity_mechanism_instance is None:
+        return []
+    return [entry.to_dict() for entry in
+            fluidity_mechanism_instance.trace.query(app=app, event=event, since=since, until=until, limit=limit)]
+
+
+async def snapshot_trace(path=None):
+    """Write the recorded Fluidity messages to path (default TRACE_FILE)."""
+    global fluidity_mechanism_instance
+    if fluidity_mechanism_instance is None:
+        return False
+    return await fluidity_mechanism_instance.trace.snapshot(path)
+
+
 def get_options():
     global fluidity_mechanism_instance
     return {}
\ No newline at end of file
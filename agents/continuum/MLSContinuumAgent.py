@@ -14,6 +14,8 @@
 #
 
 import asyncio
+import hashlib
+import json
 import os
 import time
 import traceback
@@ -41,6 +43,17 @@ from kubernetes import client, config
 from ruamel.yaml import YAML
 from mlsysops.logger_util import logger
 
+#: Annotation holding the hash of the manifest a bootstrap object was last applied from
+SPEC_HASH_ANNOTATION = 'mlsysops.eu/spec-hash'
+
+
+def annotate_spec_hash(body):
+    """Annotate a manifest with the hash of its content and return the hash."""
+    digest = hashlib.sha256(json.dumps(body, sort_keys=True, default=str).encode()).hexdigest()
+    body.setdefault('metadata', {}).setdefault('annotations', {})[SPEC_HASH_ANNOTATION] = digest
+    return digest
+
+
 class MLSContinuumAgent(MLSAgent):
 
     def __init__(self):
@@ -66,12 +79,17 @@ class MLSContinuumAgent(MLSAgent):
         await super().run()
 
         logger.info("Starting MLSAgent process...")
+        phases = {}
+        started = time.perf_counter()
         self.clusters = await self.get_karmada_clusters()
+        phases['clusters'] = time.perf_counter() - started
 
-        logger.info("Applying propagation policies...")
-        await self.apply_propagation_policies()
-        logger.info("Applying CRDs...")
-        await self.ensure_crds()
+        # The propagation policies and the CRDs do not depend on each other
+        logger.info("Applying propagation policies and CRDs...")
+        started = time.perf_counter()
+        await asyncio.gather(self.apply_propagation_policies(), self.ensure_crds())
+        phases['policies_and_crds'] = time.perf_counter() - started
+        logger.info('Startup phase latency (s): %s', {phase: round(duration, 3) for phase, duration in phases.items()})
 
         # Start the message queue listener task
         message_queue_task = asyncio.create_task(self.message_queue_listener())
@@ -101,6 +119,15 @@ class MLSContinuumAgent(MLSAgent):
                 # Extract event type and application details from the message
                 event = message.get("event")  # Expected event field
                 raw = message.get("payload")  # Additional application-specific data
+
+                if event == MessageEvents.LIVENESS_DIGEST.value:
+                    # The digest also tells that the cluster agent itself is alive
+                    self.state.liveness.heartbeat(raw['cluster'], raw.get('interval'))
+                    changes = self.state.liveness_view.apply_digest(raw['cluster'], raw)
+                    for node_jid, state in changes.items():
+                        logger.info(f"Node {node_jid} of cluster {raw['cluster']} is now {state or 'forgotten'}")
+                    continue
+
                 data = raw["MLSysOpsApp"]
 
                 # Act upon the event type
@@ -135,59 +162,40 @@ class MLSContinuumAgent(MLSAgent):
             logger.debug(f"Applying PropagationPolicy with cluster names: {cluster_names}")
 
             env = Environment(loader=FileSystemLoader(searchpath="./templates"))  # Load from "templates" dir
-
-            # Apply Cluster-Wide PropagationPolicy
-            try:
-                name = "mlsysops-applicationcrd-propagation-policy"
-                cluster_template = env.get_template("cluster-propagation-policy.yaml")
-                rendered_cluster_policy = cluster_template.render(name=name,cluster_names=cluster_names)
-
-                # Parse YAML to Python dictionary
-                yaml = YAML(typ='safe')
-                cluster_policy_body = yaml.load(rendered_cluster_policy)
-
-                # Apply the Cluster-Wide PropagationPolicy
-                await self._apply_policy(
-                    policy_name=name,
-                    policy_body=cluster_policy_body,
-                    plural="clusterpropagationpolicies",
-                    namespaced=False,
-                )
-
-            except Exception as e:
-                logger.error(f"Error applying Cluster-Wide PropagationPolicy: {e}")
-
-            # Apply Simple PropagationPolicy
-            try:
-                name = "mlsysops-propagate-policy"
-                simple_template = env.get_template("application-cr-propagation-policy.yaml")
-                rendered_simple_policy = simple_template.render(name=name,cluster_names=cluster_names)
-
-                # Parse YAML to Python dictionary
-                yaml = YAML(typ='safe')
-                simple_policy_body = yaml.load(rendered_simple_policy)
-
-                # Apply the Simple PropagationPolicy
-                await self._apply_policy(
-                    policy_name=name,
-                    policy_body=simple_policy_body,
-                    plural="propagationpolicies",
-                    namespaced=True,
-                    namespace="mlsysops"
+            yaml = YAML(typ='safe')
+
+            # Cluster-Wide PropagationPolicy
+            name = "mlsysops-applicationcrd-propagation-policy"
+            cluster_template = env.get_template("cluster-propagation-policy.yaml")
+            cluster_policy_body = yaml.load(cluster_template.render(name=name, cluster_names=cluster_names))
+
+            # Simple PropagationPolicy
+            simple_name = "mlsysops-propagate-policy"
+            simple_template = env.get_template("application-cr-propagation-policy.yaml")
+            simple_policy_body = yaml.load(simple_template.render(name=simple_name, cluster_names=cluster_names))
+
+            api_client = await kubernetes_asyncio.config.new_client_from_config(
+                config_file=self.karmada_api_kubeconfig, context='karmada-apiserver')
+            async with api_client:
+                await asyncio.gather(
+                    self._apply_policy(api_client, policy_name=name, policy_body=cluster_policy_body,
+                                       plural="clusterpropagationpolicies", namespaced=False),
+                    self._apply_policy(api_client, policy_name=simple_name, policy_body=simple_policy_body,
+                                       plural="propagationpolicies", namespaced=True, namespace="mlsysops"),
                 )
 
-            except Exception as e:
-                logger.error(f"Error applying Simple PropagationPolicy: {e}")
-
         except Exception as e:
             logger.error(f"Error applying PropagationPolicies: {e}")
 
-    async def _apply_policy(self, policy_name: str, policy_body: dict, plural: str, namespaced: bool = False, namespace: str = None):
+    async def _apply_policy(self, api_client, policy_name: str, policy_body: dict, plural: str,
+                            namespaced: bool = False, namespace: str = None):
         """
         Apply or update a resource in Karmada.
 
-        Handles both namespaced and cluster-scoped resources.
+        Handles both namespaced and cluster-scoped resources. The resource is not
+        written if it was applied from the same manifest before (same spec hash).
 
+        :param api_client: The Karmada API client.
         :param policy_name: The name of the resource (used for identification).
         :param policy_body: The body of the resource as a Python dictionary.
         :param plural: The plural name of the resource (e.g., "propagationpolicies" or "clusterpropagationpolicies").
@@ -195,92 +203,48 @@ class MLSContinuumAgent(MLSAgent):
         :param namespace: The namespace to target for namespaced resources (required if namespaced=True).
         """
         try:
-            # Load the Kubernetes configuration
-            await kubernetes_asyncio.config.load_kube_config(config_file=self.karmada_api_kubeconfig, context='karmada-apiserver')
-
-            async with kubernetes_asyncio.client.ApiClient() as api_client:
-                custom_api = kubernetes_asyncio.client.CustomObjectsApi(api_client)
+            custom_api = kubernetes_asyncio.client.CustomObjectsApi(api_client)
 
-                # Define API group and version (specific to Karmada policies)
-                group = "policy.karmada.io"
-                version = "v1alpha1"
+            # Define API group and version (specific to Karmada policies)
+            group = "policy.karmada.io"
+            version = "v1alpha1"
+            scope = {"namespace": namespace} if namespaced else {}
+            digest = annotate_spec_hash(policy_body)
 
-                logger.debug(
-                    f"Applying resource '{policy_name}' with group: {group}, version: {version}, plural: {plural}, namespaced: {namespaced}"
-                )
+            logger.debug(
+                f"Applying resource '{policy_name}' with group: {group}, version: {version}, plural: {plural}, namespaced: {namespaced}"
+            )
 
-                if namespaced and not namespace:
-                    raise ValueError("Namespace must be provided for namespaced resources.")
+            if namespaced and not namespace:
+                raise ValueError("Namespace must be provided for namespaced resources.")
 
-                try:
-                    if namespaced:
-                        # Fetch the current resource in the given namespace
-                        current_resource = await custom_api.get_namespaced_custom_object(
-                            group=group,
-                            version=version,
-                            namespace=namespace,
-                            plural=plural,
-                            name=policy_name
-                        )
-                    else:
-                        # Fetch the current cluster-scoped resource
-                        current_resource = await custom_api.get_cluster_custom_object(
-                            group=group,
-                            version=version,
-                            plural=plural,
-                            name=policy_name
-                        )
-
-                    # Add the required resourceVersion field to the policy body
-                    resource_version = current_resource["metadata"]["resourceVersion"]
-                    policy_body["metadata"]["resourceVersion"] = resource_version
-
-                    logger.info(f"Resource '{policy_name}' exists. Updating it...")
-
-                    # Perform an update using replace
-                    if namespaced:
-                        await custom_api.replace_namespaced_custom_object(
-                            group=group,
-                            version=version,
-                            namespace=namespace,
-                            plural=plural,
-                            name=policy_name,
-                            body=policy_body
-                        )
-                    else:
-                        await custom_api.replace_cluster_custom_object(
-                            group=group,
-                            version=version,
-                            plural=plural,
-                            name=policy_name,
-                            body=policy_body
-                        )
-                    logger.info(f"Resource '{policy_name}' updated successfully.")
-
-                except kubernetes_asyncio.client.exceptions.ApiException as e:
-                    if e.status == 404:
-                        # If the resource doesn't exist, create a new one
-                        logger.info(f"Resource '{policy_name}' not found. Creating a new one...")
-
-                        # Create the new resource
-                        if namespaced:
-                            await custom_api.create_namespaced_custom_object(
-                                group=group,
-                                version=version,
-                                namespace=namespace,
-                                plural=plural,
-                                body=policy_body
-                            )
-                        else:
-                            await custom_api.create_cluster_custom_object(
-                                group=group,
-                                version=version,
-                                plural=plural,
-                                body=policy_body
-                            )
-                        logger.info(f"New resource '{policy_name}' created successfully.")
-                else:
-                    raise  # Re-raise any non-404 exceptions
+            get = custom_api.get_namespaced_custom_object if namespaced else custom_api.get_cluster_custom_object
+            try:
+                current_resource = await get(group=group, version=version, plural=plural, name=policy_name, **scope)
+            except kubernetes_asyncio.client.exceptions.ApiException as e:
+                if e.status != 404:
+                    raise
+                # If the resource doesn't exist, create a new one
+                logger.info(f"Resource '{policy_name}' not found. Creating a new one...")
+                create = custom_api.create_namespaced_custom_object if namespaced \
+                    else custom_api.create_cluster_custom_object
+                await create(group=group, version=version, plural=plural, body=policy_body, **scope)
+                logger.info(f"New resource '{policy_name}' created successfully.")
+                return
+
+            annotations = current_resource["metadata"].get("annotations") or {}
+            if annotations.get(SPEC_HASH_ANNOTATION) == digest:
+                logger.info(f"Resource '{policy_name}' is up to date.")
+                return
+
+            # Add the required resourceVersion field to the policy body
+            policy_body["metadata"]["resourceVersion"] = current_resource["metadata"]["resourceVersion"]
+
+            logger.info(f"Resource '{policy_name}' exists. Updating it...")
+            replace = custom_api.replace_namespaced_custom_object if namespaced \
+                else custom_api.replace_cluster_custom_object
+            await replace(group=group, version=version, plural=plural, name=policy_name, body=policy_body, **scope)
+            logger.info(f"Resource '{policy_name}' updated successfully.")
 
         except Exception as e:
             logger.error(f"Error applying resource '{policy_name}': {e}")
@@ -337,30 +301,43 @@ class MLSContinuumAgent(MLSAgent):
         CRDS_INFO_LIST = [mlsysops_node_dict, mlsysops_app_dict, mlsysops_cont_dict, mlsysops_cluster_dict]
 
         # connect to karmada api
-        await kubernetes_asyncio.config.load_kube_config(config_file=self.karmada_api_kubeconfig)
-        async with kubernetes_asyncio.client.ApiClient() as api_client:
+        api_client = await kubernetes_asyncio.config.new_client_from_config(config_file=self.karmada_api_kubeconfig)
+        async with api_client:
             ext_api = kubernetes_asyncio.client.ApiextensionsV1Api(api_client)
-            # Get the list of registered CRD names
+            # Get the registered CRDs
             current_crds_response = await ext_api.list_custom_resource_definition()
-            current_crds = current_crds_response.to_dict()['items']
-            current_crds_names = [x['spec']['names']['singular'] for x in current_crds]
+            current_crds = {crd.metadata.name: crd for crd in current_crds_response.items}
 
-            for crd_info in CRDS_INFO_LIST:
-                if crd_info['singular'] in current_crds_names:
-                    logger.info('MLSysOps CRD: %s already exists', crd_info['kind'])
-                else:
-                    logger.info('Creating MLSysOps CRD: %s', crd_info['kind'])
-                    try:
-                        yaml = YAML(typ='safe')
-                        with open(crd_info['crd_file'], 'r') as data:
-                            body = yaml.load(data)
-                    except IOError:
-                        logger.error('Resource definition not in dir %s.',
-                                     crd_info['crd_file'])
-                    try:
+            async def apply_crd(crd_info):
+                try:
+                    yaml = YAML(typ='safe')
+                    with open(crd_info['crd_file'], 'r') as data:
+                        body = yaml.load(data)
+                except IOError:
+                    logger.error('Resource definition not in dir %s.', crd_info['crd_file'])
+                    return 'failed'
+
+                digest = annotate_spec_hash(body)
+                current = current_crds.get(crd_info['crd_name'])
+                try:
+                    if current is None:
                         await ext_api.create_custom_resource_definition(body)
-                    except ApiException as exc:
-                        logger.exception('%s update failed: %s', crd_info['kind'], exc)
+                        return 'created'
+                    if (current.metadata.annotations or {}).get(SPEC_HASH_ANNOTATION) == digest:
+                        return 'unchanged'
+                    body['metadata']['resourceVersion'] = current.metadata.resource_version
+                    await ext_api.replace_custom_resource_definition(crd_info['crd_name'], body)
+                    return 'updated'
+                except ApiException as exc:
+                    if exc.status == 409:
+                        # Written meanwhile by another agent
+                        return 'unchanged'
+                    logger.error('%s update failed: %s', crd_info['kind'], exc)
+                    return 'failed'
+
+            results = await asyncio.gather(*(apply_crd(crd_info) for crd_info in CRDS_INFO_LIST))
+            for crd_info, result in zip(CRDS_INFO_LIST, results):
+                logger.info('MLSysOps CRD %s: %s', crd_info['kind'], result)
 
     async def get_karmada_clusters(self):
         """
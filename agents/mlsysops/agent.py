@@ -16,6 +16,7 @@
 
 import asyncio
 import json
+import os
 import traceback
 
 from mlsysops.data.task_log import Status
@@ -26,8 +27,11 @@ from mlsysops.controllers.policy import PolicyController
 from mlsysops.controllers.telemetry import TelemetryController
 from mlsysops.controllers.mechanisms import MechanismsController
 from mlsysops.data.state import MLSState
+from mlsysops.data.dict_diff import VersionedDict
+from mlsysops.data.liveness import ALIVE
+from mlsysops.data.outbox import PlanOutbox
 from mlsysops.scheduler import PlanScheduler
-from mlsysops.spade.mls_spade import MLSSpade
+from mlsysops.transport import create_transport
 from mlsysops.tasks.monitor import MonitorTask
 from mlsysops.data.monitor import MonitorData
 
@@ -36,7 +40,12 @@ from mlsysops.logger_util import logger
 
 class MLSAgent:
 
-    def __init__(self):
+    def __init__(self, node_name=None):
+        """
+        Args:
+            node_name (str): Identity of the agent. Defaults to NODE_NAME or the
+            hostname; set it to host several agents in one process.
+        """
         logger.debug("Initializing agent...")
 
         self.current_loop = asyncio.get_running_loop()
@@ -45,13 +54,19 @@ class MLSAgent:
 
         # Agent Internal State
         self.state = MLSState()
+        self.state.agent = self
         self.state.start_period_log_dump()
 
 
         logger.debug("Initializing controllers...")
 
         # Configuration Controller
-        self.configuration_controller = ConfigurationController(self.state)
+        self.configuration_controller = ConfigurationController(self.state, node_name)
+        self.description_sync = VersionedDict()
+        self.outbox = PlanOutbox(
+            os.path.join(self.state.configuration.outbox_directory, self.state.configuration.node),
+            self.state.configuration.outbox_ttl)
+        self._replaying = set()
 
         # ## -------- SPADE ------------------#
         logger.debug("Initializing SPADE...")
@@ -59,7 +74,7 @@ class MLSAgent:
             logger.debug("in try...")
             self.message_queue = asyncio.Queue()
             logger.debug("after queue...")
-            self.spade_instance = MLSSpade(self.state, self.message_queue)
+            self.spade_instance = create_transport(self.state, self.message_queue)
         except Exception as e:
             logger.error(f"Error initializing SPADE: {e}")
 
@@ -106,6 +121,7 @@ class MLSAgent:
         logger.debug("Cleaning up MLSAgent resources...")
 
         # Clean up controllers
+        self.policy_controller.stop_policy_directory_monitor()
         del self.application_controller
         del self.policy_controller
         del self.configuration_controller
@@ -143,7 +159,7 @@ class MLSAgent:
             except Exception as e:
                 print(f"Error in message listener: {e}")
 
-    async def send_message_to_node(self, recipient, event, payload):
+    async def send_message_to_node(self, recipient, event, payload, outbox_key=None):
         """
         Sends a message to a specified recipient node with a designated event and payload.
 
@@ -157,8 +173,110 @@ class MLSAgent:
             payload (Any): The data or content being sent as part of the message
             communication. The type of the payload can be flexible, determined based
             on application-specific requirements.
+
+            outbox_key (str): If set, the message is stored in the outbox while the
+            recipient is unreachable, or if sending it fails, and replayed once it
+            reconnects. A newer message with the same key supersedes the stored one.
+        """
+        if outbox_key is not None and (self.outbox.has_pending(recipient) or self.is_unreachable(recipient)):
+            # Queue behind the messages already waiting, to keep their order
+            self.outbox.put(recipient, event, payload, key=outbox_key)
+            if self.is_unreachable(recipient):
+                logger.debug(f"Recipient {recipient} unreachable, stored {event} in outbox")
+            elif recipient not in self._replaying:
+                await self.replay_outbox(recipient)
+            return
+        try:
+            await self.spade_instance.send_message(recipient, event, payload)
+        except Exception as e:
+            if outbox_key is None:
+                raise
+            self.outbox.put(recipient, event, payload, key=outbox_key)
+            logger.error(f"Error sending {event} to {recipient}, stored in outbox: {e}")
+
+    def is_unreachable(self, recipient):
+        """
+        Whether the recipient stopped sending heartbeats. Agents that never sent one
+        are assumed reachable.
+        """
+        liveness = self.state.liveness
+        for agent in (recipient, f"{recipient}@{self.state.configuration.domain}"):
+            if agent in liveness.last_seen:
+                return liveness.status(agent) != ALIVE
+        return False
+
+    def agent_seen(self, sender):
+        """
+        Confirms the outbox messages sent to an agent that showed up (heartbeat,
+        subscription or message) since, and replays those not sent yet.
+
+        Args:
+            sender (str): The agent name or JID.
+        """
+        recipient = sender.split("@")[0]
+        if not self.outbox.has_pending(recipient):
+            return
+        confirmed = self.outbox.confirm(recipient)
+        if confirmed:
+            logger.debug(f"{recipient} confirmed {confirmed} outbox messages")
+        if self.outbox.unsent(recipient) and recipient not in self._replaying:
+            asyncio.create_task(self.replay_outbox(recipient))
+
+    async def retry_outbox(self):
+        """
+        Replays every outbox_retry_interval seconds the stored messages of the agents
+        not known to be down, the sent but unconfirmed ones included, so the outbox
+        drains without heartbeats too.
+        """
+        while True:
+            await asyncio.sleep(self.state.configuration.outbox_retry_interval)
+            for recipient in list(self.outbox.entries):
+                if (self.outbox.has_pending(recipient) and recipient not in self._replaying
+                        and not self.is_unreachable(recipient)):
+                    await self.replay_outbox(recipient, resend=True)
+
+    async def replay_outbox(self, recipient, resend=False):
         """
-        await self.spade_instance.send_message(recipient, event, payload)
+        Sends the stored messages of a recipient in the order they were stored. They
+        stay stored until the recipient is seen again (see agent_seen).
+
+        Args:
+            recipient (str): The agent name.
+            resend (bool): Also send again the messages sent but not confirmed yet.
+        """
+        self._replaying.add(recipient)
+        try:
+            entries = self.outbox.pending(recipient) if resend else self.outbox.unsent(recipient)
+            for entry in entries:
+                await self.spade_instance.send_message(recipient, entry["event"], entry["payload"])
+                self.outbox.mark_sent(recipient, entry["seq"])
+            if entries:
+                logger.info(f"Replayed {len(entries)} outbox messages to {recipient}")
+        except Exception as e:
+            logger.error(f"Error replaying outbox of {recipient}: {e}")
+        finally:
+            self._replaying.discard(recipient)
+
+    async def send_system_description(self, peer_version=None):
+        """
+        Sends the system description to the cluster agent, as a full snapshot if
+        peer_version does not match the last version sent, otherwise as a delta of
+        the changed paths. Nothing is sent if the description did not change.
+
+        Args:
+            peer_version (int): The description version the cluster agent holds,
+            None to force a full snapshot.
+        """
+        message = self.description_sync.diff(self.state.configuration.system_description, peer_version)
+        if message is None:
+            return
+
+        message['node'] = self.state.configuration.node
+        if 'snapshot' in message:
+            event = MessageEvents.NODE_SYSTEM_DESCRIPTION_SUBMITTED.value
+        else:
+            event = MessageEvents.NODE_SYSTEM_DESCRIPTION_DELTA.value
+        await self.send_message_to_node(self.state.configuration.cluster, event, message)
 
     async def update_plan_status(self, plan_uid, mechanism, status):
         """
@@ -174,11 +292,29 @@ class MLSAgent:
             bool: True if the update was successful, False otherwise.
         """
         try:
-            return self.state.update_plan_status(plan_uid, mechanism, status)
+            updated = self.state.update_plan_status(plan_uid, mechanism, status)
+            latency = self.state.plan_registry.latency(plan_uid)
+            if updated and latency is not None:
+                logger.test(f"|1| Plan planuid:{plan_uid} completed end-to-end latency:{latency:.3f}s")
+            return updated
         except Exception as e:
             logger.warning(f"Error updating plan status: {e}")
             return False
 
+    async def wait_for_plan(self, plan_uid, timeout=None):
+        """
+        Waits for the outcome of a scheduled plan.
+
+        Args:
+            plan_uid: Unique identifier of the plan.
+            timeout: Seconds to wait, None to wait until the plan deadline.
+
+        Returns:
+            dict: The plan outcome with its status, mechanism statuses and latency,
+            or None if the plan is unknown or the wait timed out.
+        """
+        return await self.state.plan_registry.wait(plan_uid, timeout)
+
 
 
     async def run(self):
@@ -196,10 +332,7 @@ class MLSAgent:
                 })
             if self.state.configuration.continuum_layer == 'node':
                 logger.debug(f"Send my {self.state.configuration.node} description to cluster")
-                await self.send_message_to_node(
-                    self.state.configuration.cluster,
-                     MessageEvents.NODE_SYSTEM_DESCRIPTION_SUBMITTED.value,
-                    self.state.configuration.system_description)
+                await self.send_system_description()
         except Exception as e:
             logger.error(f"Error executing command: {e}")
 
@@ -215,6 +348,9 @@ class MLSAgent:
         except Exception as e:
             logger.error(f"Error starting SPADE: {traceback.format_exc()}")
 
+        if self.state.configuration.outbox_retry_interval > 0:
+            self.running_tasks.append(asyncio.create_task(self.retry_outbox()))
+
         # Start global policies
         await self.policy_controller.start_global_policies()
         self.policy_controller.start_policy_directory_monitor()
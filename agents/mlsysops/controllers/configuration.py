@@ -32,11 +32,12 @@ class ConfigurationController:
     including loading, updating, and saving.
     """
 
-    def __init__(self, agent_state: MLSState):
+    def __init__(self, agent_state: MLSState, node_name: str = None):
         """
         Initializes the ConfigManager.
 
-        :param config_path: The path to the YAML configuration file.
+        :param agent_state: The state of the agent to configure.
+        :param node_name: Identity of the agent, defaults to NODE_NAME or the hostname.
         """
         # Load environment variables from the .env file
         load_dotenv()
@@ -59,12 +60,14 @@ class ConfigurationController:
         else:
             logger.info(f"Directory {mlsysops_path} already exists.")
 
-        self.config_path = os.getenv("CONFIG_PATH", f"{mlsysops_path}/config/{os.getenv('NODE_NAME',socket.gethostname())}-config.yaml")
+        node_name = node_name or os.getenv('NODE_NAME', socket.gethostname())
+        self.config_path = os.getenv("CONFIG_PATH", f"{mlsysops_path}/config/{node_name}-config.yaml")
         self.description_path = os.getenv("DESCRIPTION_PATH", f"{mlsysops_path}/descriptions")
         logger.info(f"Using configuration file: {self.config_path}")
 
         self.agent_state = agent_state
-        self.agent_state.configuration = AgentConfig()
+        self.agent_state.configuration = AgentConfig(node=node_name)
+        self.agent_state.hostname = node_name
         self.load_config()
         self.load_system_description()
 
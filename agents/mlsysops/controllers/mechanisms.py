@@ -22,21 +22,18 @@ from mlsysops.logger_util import logger
 
 
 class MechanismsController:
-    _instance = None
-    __initialized = False  # Tracks whether __init__ has already run
-    _state: MLSState
-    queues = {}
+    """
+    Loads the mechanisms of an agent and owns their message queues. Each agent owns
+    its controller, so several agents can be hosted in the same process.
+    """
 
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super(MechanismsController, cls).__new__(cls, *args, **kwargs)
-        return cls._instance
+    def __init__(self):
+        self._state = None
+        self.queues = {}
 
     def init(self,state: MLSState):
-        if not self.__initialized:
-            self.__initialized = True
-            self._state = state
-        return self._instance
+        self._state = state
+        return self
 
     def get_enabled_mechanisms(self,application_id):
         for policy in self._state.policies:
@@ -44,25 +44,39 @@ class FileEvents(Enum):
     DELETED = 2
 
 
+_shared_observer = None
+
+
+def get_shared_observer():
+    """
+    Returns the watchdog observer shared by all the agents of the process, started on
+    first use. One observer thread serves the policy directories of every agent.
+    """
+    global _shared_observer
+    if _shared_observer is None:
+        _shared_observer = Observer()
+        _shared_observer.daemon = True
+        _shared_observer.start()
+    return _shared_observer
+
+
 class PolicyController:
-    _instance = None
-    __initialized = False  # Tracks whether __init__ has already run
-    state = None
-    agent = None
-    active_policies = {"global" : {}, "application": {}}
-    observer = None
-
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super(PolicyController, cls).__new__(cls, *args, **kwargs)
-        return cls._instance
+    """
+    Loads the policies of an agent and keeps their active instances. Each agent owns
+    its controller, so several agents can be hosted in the same process.
+    """
+
+    def __init__(self):
+        self.state = None
+        self.agent = None
+        self.active_policies = {"global" : {}, "application": {}}
+        self.observer_handler = None
+        self.observer_watch = None
 
     def init(self,agent, state: MLSState):
-        if not self.__initialized:
-            self.__initialized = True
-            self.state = state
-            self.agent = agent
-        return self._instance
+        self.state = state
+        self.agent = agent
+        return self
 
     def get_policy_instance(self, scope: str, id: str, policy_name: str = None ):
         """
@@ -324,13 +338,9 @@ class PolicyController:
         """
         directory = self.state.configuration.policy_directory
 
-        # Set up the event handler and observer
-        event_handler = PolicyDirectoryHandler(callback=self.handle_policy_change)
-        self.observer = Observer()
-        self.observer.schedule(event_handler, directory, recursive=False)
-
-        # Start the observer in the background (non-blocking)
-        self.observer.start()
+        # Set up the event handler on the observer shared by the agents of this process
+        self.observer_handler = PolicyDirectoryHandler(callback=self.handle_policy_change)
+        self.observer_watch = get_shared_observer().schedule(self.observer_handler, directory, recursive=False)
         logger.info(f"Started monitoring the policy directory: {directory}")
 
     def stop_policy_directory_monitor(self):
@@ -338,10 +348,11 @@ class PolicyController:
         Stops the directory monitoring process gracefully.
         Ensures the observer is properly stopped and cleaned up.
         """
-        if self.observer:
-            self.observer.stop()
-            self.observer.join()
-            self.observer = None
+        if self.observer_watch:
+            # Other agents may watch the same directory, only remove this agent's handler
+            get_shared_observer().remove_handler_for_watch(self.observer_handler, self.observer_watch)
+            self.observer_handler = None
+            self.observer_watch = None
             logger.info("Policy directory monitor stopped successfully.")
 
 class PolicyDirectoryHandler(FileSystemEventHandler):
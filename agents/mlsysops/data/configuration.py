@@ -33,6 +33,15 @@ class AgentConfig:
     behaviours: Dict[str, bool] = field(default_factory=dict)
 
     system_description: dict = field(default_factory=dict)
+    # Seconds between system description and node state delta syncs, 0 to disable
+    description_sync_interval: int = 30
+    # Seconds a scheduled plan may wait for its mechanism outcomes before it times out
+    plan_timeout: int = 120
+    # Store-and-forward of plan messages to unreachable agents: directory and seconds they stay deliverable
+    outbox_directory: str = field(default_factory=lambda: os.getenv("MLSYSOPS_OUTBOX_DIR", "outbox"))
+    outbox_ttl: int = 300
+    # Seconds between retries of the stored messages of agents not known to be down, 0 to disable
+    outbox_retry_interval: int = 30
 
     # Telemetry
     node_exporter_scrape_interval: str = "5s"
@@ -43,6 +52,9 @@ class AgentConfig:
 
     node: str = field(default_factory=lambda: os.getenv("NODE_NAME", socket.gethostname()))
     cluster: str = field(default_factory=lambda: os.getenv("CLUSTER_NAME", ""))
+    continuum: str = field(default_factory=lambda: os.getenv("CONTINUUM_NAME", "continuum"))
+    # Messaging transport: "spade" (XMPP) or "loopback" (in-process, no outside services)
+    transport: str = field(default_factory=lambda: os.getenv("MLSYSOPS_TRANSPORT", "spade"))
     domain: str = field(default_factory=lambda: os.getenv("EJABBERD_DOMAIN", ""))
     n_pass: str = field(default_factory=lambda: os.getenv("NODE_PASSWORD", ""))
     n_jid: str = field(init=False)
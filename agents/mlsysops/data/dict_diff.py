@@ -0,0 +1,367 @@
+#   Copyright (c) 2025. MLSysOps Consortium
+#   #
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#   #
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   #
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  #
+#  #
+
+import copy
+import hashlib
+import json
+import re
+
+from deepdiff import DeepDiff
+
+
+class DeepDiffPathApplier:
+    """
+    Utility class for applying DeepDiff-style changes to a dictionary.
+
+    This class provides methods to parse path strings, navigate deeply nested
+    dictionaries, and apply transformations such as additions, deletions, and value
+    changes based on DeepDiff-style paths. It is useful for synchronizing changes
+    between data structures or applying patch-like transformations.
+
+    Attributes:
+        source: dict
+            The source dictionary representing the current state from which paths
+            and values will be extracted and applied to a target dictionary.
+    """
+
+    def __init__(self, source_dict):
+        self.source = source_dict
+
+    def parse_path(self, path):
+        """
+        Parse a DeepDiff-style path string into a list of keys.
+        
+        Args:
+            path (str): A path string in DeepDiff format (e.g. "['key1'][0]['key2']")
+            
+        Returns:
+            list: A list of keys where string keys are preserved as strings and numeric 
+                 indices are converted to integers
+        """
+        # Matches ['key'] or [0]
+        return [int(m[1]) if m[0] == '' else m[0]
+                for m in re.findall(r"\['(.*?)'\]|\[(\d+)\]", path)]
+
+    def get_nested(self, keys):
+        """
+        Get a nested value from the source dictionary using a sequence of keys.
+
+        Args:
+            keys (list): A list of keys to traverse the nested dictionary structure
+
+        Returns:
+            The value found at the nested location
+            
+        Raises:
+            KeyError: If any key in the path doesn't exist
+        """
+        curr = self.source
+        for k in keys:
+            curr = curr[k]
+        return curr
+
+    def set_nested(self, target_dict, keys, value):
+        """
+        Set a value in a nested dictionary structure, creating intermediate dictionaries
+        and lists as needed.
+
+        Args:
+            target_dict (dict): The dictionary to modify
+            keys (list): A sequence of keys defining the nested path
+            value: The value to set at the specified path
+        """
+        curr = target_dict
+        for k in keys[:-1]:
+            if isinstance(k, int):
+                while len(curr) <= k:
+                    curr.append({})
+                curr = curr[k]
+            else:
+                curr = curr.setdefault(k, {})
+        last_key = keys[-1]
+        if isinstance(last_key, int):
+            while len(curr) <= last_key:
+                curr.append({})
+            curr[last_key] = value
+        else:
+            curr[last_key] = value
+
+    def delete_nested(self, target_dict, keys):
+        """
+        Delete a value from a nested dictionary structure.
+
+        Args:
+            target_dict (dict): The dictionary to modify
+            keys (list): A sequence of keys defining the path to the value to delete
+        """
+        curr = target_dict
+        for k in keys[:-1]:
+            curr = curr[k]
+        last_key = keys[-1]
+        if isinstance(curr, list) and isinstance(last_key, int):
+            if 0 <= last_key < len(curr):
+                curr.pop(last_key)
+        elif last_key in curr:
+            del curr[last_key]
+
+    def apply_added_paths(self, target_dict, added_paths):
+        """
+        Apply additions from source to target dictionary based on provided paths.
+
+        Args:
+            target_dict (dict): The dictionary to modify
+            added_paths (set): Set of paths for items to be added
+        """
+        for path in added_paths:
+            keys = self.parse_path(path)
+            value = self.get_nested(keys)
+            self.set_nested(target_dict, keys, value)
+
+    def remove_deleted_paths(self, target_dict, deleted_paths):
+        """
+        Remove items from target dictionary based on provided paths.
+
+        Args:
+            target_dict (dict): The dictionary to modify
+            deleted_paths (set): Set of paths for items to be deleted
+        """
+        for path in deleted_paths:
+            keys = self.parse_path(path)
+            self.delete_nested(target_dict, keys)
+
+    def apply_value_changes(self, target_dict, value_changes):
+        """
+        Apply value changes to target dictionary based on change specifications.
+
+        Args:
+            target_dict (dict): The dictionary to modify
+            value_changes (dict): Dictionary mapping paths to change specifications
+                                containing 'new_value' keys
+        """
+        for path, change in value_changes.items():
+            keys = self.parse_path(path)
+            self.set_nested(target_dict, keys, change['new_value'])
+
+
+def _format_path(keys):
+    """Build a DeepDiff-style path string from a list of keys."""
+    return 'root' + ''.join('[{}]'.format(k) if isinstance(k, int) else "['{}']".format(k) for k in keys)
+
+
+def content_hash(data):
+    """
+    Hash of the content of a dictionary, as it is after a JSON round trip.
+
+    Args:
+        data (dict): The dictionary
+
+    Returns:
+        str: The hex digest
+    """
+    normalized = json.loads(json.dumps(data, default=str))
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+
+def _sorted_paths(applier, paths, reverse=False):
+    """Order paths by their keys so list indices are handled in a stable order."""
+    return sorted(paths, key=lambda path: [(isinstance(k, str), k) for k in applier.parse_path(path)],
+                  reverse=reverse)
+
+
+def compute_delta(old_dict, new_dict):
+    """
+    Compute the changed paths that turn one dictionary into another.
+
+    List items cannot be addressed reliably (an insert shifts every later index),
+    so a change anywhere inside a list sets the whole outermost list instead.
+
+    Args:
+        old_dict (dict): The last synchronised version of the dictionary
+        new_dict (dict): The current version of the dictionary
+
+    Returns:
+        dict: A delta with a 'set' mapping of DeepDiff paths to their new values and a
+              'removed' list of DeepDiff paths, or an empty dict if nothing changed
+    """
+    diff = DeepDiff(old_dict, new_dict)
+    if not diff:
+        return {}
+
+    applier = DeepDiffPathApplier(new_dict)
+    changed_paths = set(diff.get('dictionary_item_added', set()))
+    changed_paths.update(diff.get('iterable_item_added', {}).keys())
+    changed_paths.update(diff.get('values_changed', {}).keys())
+    changed_paths.update(diff.get('type_changes', {}).keys())
+    changed_paths.update(diff.get('iterable_item_removed', {}).keys())
+    changed_paths.update(diff.get('repetition_change', {}).keys())
+    removed_paths = set()
+    for path in diff.get('dictionary_item_removed', set()):
+        if any(isinstance(k, int) for k in applier.parse_path(path)):
+            changed_paths.add(path)
+        else:
+            removed_paths.add(path)
+
+    set_keys = {}
+    for path in changed_paths:
+        keys = applier.parse_path(path)
+        list_keys = [i for i, k in enumerate(keys) if isinstance(k, int)]
+        if list_keys:
+            keys = keys[:list_keys[0]]
+        set_keys[_format_path(keys)] = keys
+    # A path inside another set path is carried by it
+    set_paths = {path for path, keys in set_keys.items()
+                 if not any(len(other) < len(keys) and keys[:len(other)] == other for other in set_keys.values())}
+
+    return {
+        'set': {path: copy.deepcopy(applier.get_nested(applier.parse_path(path)))
+                for path in _sorted_paths(applier, set_paths)},
+        'removed': _sorted_paths(applier, removed_paths, reverse=True)
+    }
+
+
+def apply_delta(target_dict, delta):
+    """
+    Apply a delta produced by compute_delta to a dictionary in place.
+
+    Args:
+        target_dict (dict): The dictionary to modify
+        delta (dict): The delta with 'set' and 'removed' paths
+    """
+    applier = DeepDiffPathApplier(target_dict)
+    # Removals come highest list index first, so earlier indices stay valid.
+    applier.remove_deleted_paths(target_dict, delta.get('removed', []))
+    for path, value in delta.get('set', {}).items():
+        applier.set_nested(target_dict, applier.parse_path(path), copy.deepcopy(value))
+
+
+def delta_to_merge_patch(delta, new_dict):
+    """
+    Convert a delta into a JSON merge patch (RFC 7386) against new_dict.
+
+    Merge patches cannot address list items, so any path that goes through a
+    list carries the whole list from new_dict instead.
+
+    Args:
+        delta (dict): The delta with 'set' and 'removed' paths
+        new_dict (dict): The dictionary the delta was computed towards
+
+    Returns:
+        dict: The merge patch
+    """
+    applier = DeepDiffPathApplier(new_dict)
+    patch = {}
+    for path in list(delta.get('set', {}).keys()) + list(delta.get('removed', [])):
+        keys = applier.parse_path(path)
+        list_keys = [i for i, k in enumerate(keys) if isinstance(k, int)]
+        if list_keys:
+            keys = keys[:list_keys[0]]
+            if not keys:
+                continue
+            value = copy.deepcopy(applier.get_nested(keys))
+        elif path in delta.get('set', {}):
+            value = copy.deepcopy(delta['set'][path])
+        else:
+            value = None
+        applier.set_nested(patch, keys, value)
+    return patch
+
+
+class VersionedDict:
+    """
+    Last synchronised copy of a dictionary and its version.
+
+    The sending side calls diff() with the version its peer last acknowledged and
+    gets back a full snapshot on mismatch, only the changed paths otherwise.
+    The receiving side feeds those messages to receive(). A delta carries the
+    content hash of the result, so a receiver whose copy drifted asks for a
+    full snapshot instead of keeping a wrong copy.
+
+    Attributes:
+        version: int
+            Version of the snapshot, 0 before the first snapshot.
+        snapshot: dict
+            The last synchronised copy of the dictionary.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.snapshot = None
+
+    def snapshot_message(self, new_dict):
+        """
+        Reset to new_dict and return a full snapshot message.
+
+        Args:
+            new_dict (dict): The current version of the dictionary
+
+        Returns:
+            dict: {'version': ..., 'snapshot': ...}
+        """
+        self.snapshot = copy.deepcopy(new_dict)
+        self.version += 1
+        return {'version': self.version, 'snapshot': copy.deepcopy(self.snapshot)}
+
+    def diff(self, new_dict, peer_version):
+        """
+        Build the message that brings a peer at peer_version up to new_dict.
+
+        Args:
+            new_dict (dict): The current version of the dictionary
+            peer_version (int): The version the peer holds, None if unknown
+
+        Returns:
+            dict: A snapshot or delta message, or None if the peer is up to date
+        """
+        if self.snapshot is None or peer_version != self.version:
+            return self.snapshot_message(new_dict)
+
+        delta = compute_delta(self.snapshot, new_dict)
+        if not delta:
+            return None
+
+        base_version = self.version
+        self.snapshot = copy.deepcopy(new_dict)
+        self.version += 1
+        return {'base_version': base_version, 'version': self.version, 'delta': delta,
+                'hash': content_hash(self.snapshot)}
+
+    def receive(self, message):
+        """
+        Apply a snapshot or delta message built by diff().
+
+        Args:
+            message (dict): The received message
+
+        Returns:
+            bool: True if applied, False if the delta does not match the local
+                  version or content and a full snapshot has to be requested
+        """
+        if 'snapshot' in message:
+            self.snapshot = message['snapshot']
+            self.version = message.get('version', 0)
+            return True
+
+        if self.snapshot is None or message.get('base_version') != self.version:
+            return False
+
+        snapshot = copy.deepcopy(self.snapshot)
+        apply_delta(snapshot, message.get('delta', {}))
+        if 'hash' in message and content_hash(snapshot) != message['hash']:
+            return False
+
+        self.snapshot = snapshot
+        self.version = message.get('version', self.version + 1)
+        return True
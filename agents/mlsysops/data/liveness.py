@@ -0,0 +1,123 @@
+#  Copyright (c) 2025. MLSysOps Consortium
+#  #
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  #
+#      http://www.apache.org/licenses/LICENSE-2.0
+#  #
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+ALIVE = "alive"
+SUSPECT = "suspect"
+DEAD = "dead"
+
+
+@dataclass
+class LivenessTracker:
+    """
+    Tracks the heartbeats of lower-tier agents and summarises them into digests.
+
+    An agent is suspect when no heartbeat arrived for suspect_after times its own
+    heartbeat interval, and dead after dead_after times. Each agent reports its
+    interval, so agents that backed off are not flagged early.
+
+    Attributes:
+        suspect_after (float): Missed intervals before an agent is suspect.
+        dead_after (float): Missed intervals before an agent is dead.
+        forget_after (float): Seconds after which a dead agent is dropped.
+        last_seen (Dict[str, float]): Last heartbeat time per agent.
+        intervals (Dict[str, float]): Last reported heartbeat interval per agent.
+        reported (Dict[str, str]): Liveness state per agent in the last digest.
+        seq (int): Sequence number of the last digest.
+    """
+    suspect_after: float = 3
+    dead_after: float = 6
+    forget_after: float = 3600
+    default_interval: float = 10
+    last_seen: Dict[str, float] = field(default_factory=dict)
+    intervals: Dict[str, float] = field(default_factory=dict)
+    reported: Dict[str, str] = field(default_factory=dict)
+    seq: int = 0
+
+    def heartbeat(self, agent: str, interval: Optional[float] = None, now: Optional[float] = None):
+        """
+        Record a heartbeat from an agent.
+
+        :param agent: The agent JID.
+        :param interval: The heartbeat interval the agent currently uses.
+        :param now: Time of the heartbeat, defaults to the current time.
+        """
+        self.last_seen[agent] = now if now is not None else time.time()
+        self.intervals[agent] = interval or self.intervals.get(agent, self.default_interval)
+
+    def status(self, agent: str, now: Optional[float] = None) -> str:
+        """Liveness state of a tracked agent."""
+        now = now if now is not None else time.time()
+        missed = (now - self.last_seen[agent]) / self.intervals.get(agent, self.default_interval)
+        if missed >= self.dead_after:
+            return DEAD
+        if missed >= self.suspect_after:
+            return SUSPECT
+        return ALIVE
+
+    def digest(self, now: Optional[float] = None) -> dict:
+        """
+        Build the periodic digest: the alive, suspect and dead sets and the agents
+        whose state changed since the previous digest. Dead agents not seen for
+        forget_after seconds are reported as removed once and then dropped.
+
+        :return: {'seq', 'alive', 'suspect', 'dead', 'changes'}
+        """
+        now = now if now is not None else time.time()
+        sets = {ALIVE: [], SUSPECT: [], DEAD: []}
+        changes = {}
+
+        for agent in list(self.last_seen):
+            if now - self.last_seen[agent] >= self.forget_after:
+                del self.last_seen[agent]
+                self.intervals.pop(agent, None)
+                if self.reported.pop(agent, None) is not None:
+                    changes[agent] = None
+                continue
+            state = self.status(agent, now)
+            sets[state].append(agent)
+            if self.reported.get(agent) != state:
+                changes[agent] = state
+                self.reported[agent] = state
+
+        self.seq += 1
+        return {"seq": self.seq, **{state: sorted(agents) for state, agents in sets.items()}, "changes": changes}
+
+
+@dataclass
+class LivenessView:
+    """
+    Global liveness picture assembled from the digests of each cluster.
+
+    Attributes:
+        clusters (Dict[str, dict]): Last digest per cluster, with its receive time.
+    """
+    clusters: Dict[str, dict] = field(default_factory=dict)
+
+    def apply_digest(self, cluster: str, digest: dict, now: Optional[float] = None) -> dict:
+        """
+        Store the digest of a cluster.
+
+        :return: The changes reported in the digest.
+        """
+        self.clusters[cluster] = {**digest, "received": now if now is not None else time.time()}
+        return digest.get("changes", {})
+
+    def summary(self) -> dict:
+        """Number of alive, suspect and dead agents per cluster."""
+        return {cluster: {state: len(digest.get(state, [])) for state in (ALIVE, SUSPECT, DEAD)}
+                for cluster, digest in self.clusters.items()}
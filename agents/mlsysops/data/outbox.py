@@ -0,0 +1,202 @@
+#  Copyright (c) 2025. MLSysOps Consortium
+#  #
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  #
+#      http://www.apache.org/licenses/LICENSE-2.0
+#  #
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from ..logger_util import logger
+
+
+class PlanOutbox:
+    """
+    Durable store-and-forward queue of the messages sent to unreachable agents.
+
+    Each destination has an append-only JSON lines file in the outbox directory.
+    A 'put' record stores a message, an 'ack' record marks it as delivered, expired
+    or superseded. A message put with the same key as an older pending message of
+    the same destination supersedes it, so only the latest plan per mechanism is
+    replayed. Sending is fire-and-forget, so a sent message stays pending until the
+    destination is seen again after the send (confirm). Files are compacted once
+    most of their records are acknowledged.
+
+    Attributes:
+        directory (str): Directory of the outbox files.
+        ttl (float): Default seconds a message stays deliverable.
+        entries (Dict[str, Dict[int, dict]]): Pending messages per destination, by sequence number.
+        sent (Dict[str, Dict[int, float]]): Send time of the pending messages already sent, by sequence number.
+    """
+
+    def __init__(self, directory: str, ttl: float = 300):
+        self.directory = directory
+        self.ttl = ttl
+        self.entries: Dict[str, Dict[int, dict]] = {}
+        self.sent: Dict[str, Dict[int, float]] = {}
+        self._seq: Dict[str, int] = {}
+        self._records: Dict[str, int] = {}
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _path(self, destination: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9_.@-]", "_", destination) + ".jsonl")
+
+    def _load(self):
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith(".jsonl"):
+                continue
+            entries = {}
+            records = 0
+            max_seq = 0
+            destination = None
+            try:
+                with open(os.path.join(self.directory, file_name)) as file:
+                    for line in file:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # torn write at the end of the file
+                        records += 1
+                        if record.get("op") == "put":
+                            destination = record["destination"]
+                            entries[record["seq"]] = record
+                            max_seq = max(max_seq, record["seq"])
+                        elif record.get("op") == "ack":
+                            entries.pop(record["seq"], None)
+            except OSError as e:
+                logger.error(f"Error loading outbox file {file_name}: {e}")
+                continue
+            if destination is None:
+                continue
+            self.entries[destination] = entries
+            self._records[destination] = records
+            self._seq[destination] = max_seq
+            logger.debug(f"Loaded {len(entries)} pending outbox messages for {destination}")
+
+    def _append(self, destination: str, records: List[dict]):
+        with open(self._path(destination), "a") as file:
+            for record in records:
+                file.write(json.dumps(record, default=str) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self._records[destination] = self._records.get(destination, 0) + len(records)
+
+    def put(self, destination: str, event: str, payload: dict, key: Optional[str] = None) -> int:
+        """
+        Store a message for a destination.
+
+        :param destination: The recipient agent.
+        :param event: The message event.
+        :param payload: The message payload.
+        :param key: Supersession key, older pending messages with the same key are dropped.
+        :return: The sequence number of the message.
+        """
+        now = time.time()
+        entries = self.entries.setdefault(destination, {})
+        records = []
+        if key is not None:
+            for seq in [seq for seq, entry in entries.items() if entry.get("key") == key]:
+                del entries[seq]
+                self.sent.get(destination, {}).pop(seq, None)
+                records.append({"op": "ack", "seq": seq, "reason": "superseded"})
+
+        seq = self._seq.get(destination, 0) + 1
+        self._seq[destination] = seq
+        entry = {
+            "op": "put",
+            "seq": seq,
+            "destination": destination,
+            "key": key,
+            "event": event,
+            "payload": payload,
+            "ts": now,
+            "expires": now + self.ttl,
+        }
+        entries[seq] = entry
+        records.append(entry)
+        self._append(destination, records)
+        return seq
+
+    def has_pending(self, destination: str) -> bool:
+        return bool(self.entries.get(destination))
+
+    def pending(self, destination: str, now: Optional[float] = None) -> List[dict]:
+        """
+        The deliverable messages of a destination in the order they were put.
+        Expired messages are dropped.
+        """
+        now = now if now is not None else time.time()
+        entries = self.entries.get(destination, {})
+        expired = [seq for seq, entry in entries.items() if entry["expires"] <= now]
+        if expired:
+            for seq in expired:
+                del entries[seq]
+                self.sent.get(destination, {}).pop(seq, None)
+            self._append(destination, [{"op": "ack", "seq": seq, "reason": "expired"} for seq in expired])
+            logger.debug(f"Dropped {len(expired)} expired outbox messages for {destination}")
+        return [entries[seq] for seq in sorted(entries)]
+
+    def unsent(self, destination: str, now: Optional[float] = None) -> List[dict]:
+        """The deliverable messages of a destination not sent yet."""
+        sent = self.sent.get(destination, {})
+        return [entry for entry in self.pending(destination, now) if entry["seq"] not in sent]
+
+    def mark_sent(self, destination: str, seq: int, now: Optional[float] = None):
+        """Record that a message was sent, it stays pending until confirmed."""
+        self.sent.setdefault(destination, {})[seq] = now if now is not None else time.time()
+
+    def confirm(self, destination: str, now: Optional[float] = None) -> int:
+        """
+        Mark as delivered the messages sent before the destination was seen at now.
+
+        :return: The number of confirmed messages.
+        """
+        now = now if now is not None else time.time()
+        sent = self.sent.get(destination)
+        if not sent:
+            return 0
+        confirmed = [seq for seq, sent_at in sent.items() if sent_at < now]
+        for seq in confirmed:
+            self.ack(destination, seq)
+        return len(confirmed)
+
+    def ack(self, destination: str, seq: int):
+        """Mark a message as delivered."""
+        entries = self.entries.get(destination, {})
+        self.sent.get(destination, {}).pop(seq, None)
+        if entries.pop(seq, None) is None:
+            return
+        self._append(destination, [{"op": "ack", "seq": seq, "reason": "delivered"}])
+        if self._records[destination] > 2 * len(entries) + 100:
+            self.compact(destination)
+
+    def compact(self, destination: str):
+        """Rewrite the file of a destination with its pending messages only."""
+        entries = self.entries.get(destination, {})
+        path = self._path(destination)
+        if not entries:
+            if os.path.exists(path):
+                os.remove(path)
+            self._records[destination] = 0
+            return
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            for seq in sorted(entries):
+                file.write(json.dumps(entries[seq], default=str) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+        self._records[destination] = len(entries)
@@ -0,0 +1,195 @@
+#  Copyright (c) 2025. MLSysOps Consortium
+#  #
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  #
+#      http://www.apache.org/licenses/LICENSE-2.0
+#  #
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+PENDING = "Pending"
+TIMEOUT = "Timeout"
+
+# Results of PlanRegistry.complete
+ACCEPTED = "accepted"
+LATE = "late"
+DUPLICATE = "duplicate"
+
+
+@dataclass
+class PlanTracking:
+    """
+    Correlation entry of a plan that is waiting for its mechanism outcomes.
+
+    Attributes:
+        plan_uid (str): The plan identifier.
+        mechanisms (Dict[str, str]): Status per mechanism of the plan.
+        submitted_at (float): Time the plan was registered.
+        deadline (float): Time after which the plan is resolved as timed out.
+        future (asyncio.Future): Resolved with the plan outcome.
+    """
+    plan_uid: str
+    mechanisms: Dict[str, str]
+    submitted_at: float
+    deadline: float
+    future: asyncio.Future
+
+    def outcome(self, status: str, now: float) -> dict:
+        return {
+            "plan_uid": self.plan_uid,
+            "status": status,
+            "mechanisms": dict(self.mechanisms),
+            "submitted_at": self.submitted_at,
+            "completed_at": now,
+            "latency": now - self.submitted_at,
+        }
+
+
+@dataclass
+class PlanRegistry:
+    """
+    Correlates the PLAN_EXECUTED replies with the plans that caused them.
+
+    Every scheduled plan is registered with a deadline and gets a future that is
+    resolved once all of its mechanisms reported a final status, or when the
+    deadline passes. Completed plans are evicted from the pending set and only their
+    outcome is remembered, so duplicate replies can be recognised and dropped, and
+    the first reply of a mechanism after its plan timed out is recognised as late.
+
+    Attributes:
+        timeout (float): Default seconds a plan may take before it times out.
+        remember (int): Number of completed plan outcomes kept for deduplication.
+        pending (Dict[str, PlanTracking]): Plans waiting for their outcome.
+        completed (OrderedDict): Outcomes of the most recently completed plans.
+        duplicates (int): Number of replies dropped as duplicate.
+        late (int): Number of replies that arrived after their plan timed out.
+    """
+    timeout: float = 120
+    remember: int = 1000
+    pending: Dict[str, PlanTracking] = field(default_factory=dict)
+    completed: OrderedDict = field(default_factory=OrderedDict)
+    duplicates: int = 0
+    late: int = 0
+
+    def register(self, plan_uid: str, mechanisms, timeout: Optional[float] = None) -> asyncio.Future:
+        """
+        Start tracking a plan. Registering a plan again adds the given mechanisms to
+        it and returns the existing future.
+
+        :param plan_uid: The plan identifier.
+        :param mechanisms: The mechanisms the plan was dispatched to.
+        :param timeout: Seconds before the plan times out, defaults to self.timeout.
+        :return: Future resolved with the plan outcome dictionary.
+        """
+        tracking = self.pending.get(plan_uid)
+        if tracking is not None:
+            for mechanism in mechanisms:
+                tracking.mechanisms.setdefault(mechanism, PENDING)
+            return tracking.future
+
+        future = asyncio.get_running_loop().create_future()
+        if plan_uid in self.completed:
+            future.set_result(self.completed[plan_uid])
+            return future
+
+        now = time.time()
+        self.pending[plan_uid] = PlanTracking(
+            plan_uid=plan_uid,
+            mechanisms={mechanism: PENDING for mechanism in mechanisms},
+            submitted_at=now,
+            deadline=now + (timeout if timeout is not None else self.timeout),
+            future=future,
+        )
+        return future
+
+    def complete(self, plan_uid: str, mechanism: str, status) -> str:
+        """
+        Record the status a mechanism reported for a plan.
+
+        :param plan_uid: The plan identifier.
+        :param mechanism: The mechanism that reported.
+        :param status: The reported status, "Pending" is not final.
+        :return: DUPLICATE if the mechanism already reported and the reply must be
+            ignored, LATE for its first reply after the plan timed out (the outcome
+            is real and must still be applied), ACCEPTED otherwise. Replies for plans
+            that were never registered here are accepted, as they belong to plans
+            tracked by another agent.
+        """
+        outcome = self.completed.get(plan_uid)
+        if outcome is not None:
+            if outcome["status"] == TIMEOUT and outcome["mechanisms"].get(mechanism) == PENDING:
+                outcome["mechanisms"][mechanism] = status
+                self.late += 1
+                return LATE
+            self.duplicates += 1
+            return DUPLICATE
+
+        tracking = self.pending.get(plan_uid)
+        if tracking is None:
+            return ACCEPTED
+
+        previous = tracking.mechanisms.get(mechanism, PENDING)
+        if previous != PENDING:
+            self.duplicates += 1
+            return DUPLICATE
+
+        tracking.mechanisms[mechanism] = status
+        if all(value != PENDING for value in tracking.mechanisms.values()):
+            failed = [value for value in tracking.mechanisms.values() if value in (False, "Failed")]
+            self._resolve(tracking, "Failed" if failed else "Completed")
+        return ACCEPTED
+
+    def expire(self, now: Optional[float] = None) -> list:
+        """
+        Resolve the plans whose deadline passed as timed out.
+
+        :param now: Current time, defaults to time.time().
+        :return: The uids of the plans that timed out.
+        """
+        now = now if now is not None else time.time()
+        expired = [tracking for tracking in self.pending.values() if tracking.deadline <= now]
+        for tracking in expired:
+            self._resolve(tracking, TIMEOUT, now)
+        return [tracking.plan_uid for tracking in expired]
+
+    async def wait(self, plan_uid: str, timeout: Optional[float] = None) -> Optional[dict]:
+        """
+        Wait for the outcome of a plan without polling the task log.
+
+        :param plan_uid: The plan identifier.
+        :param timeout: Seconds to wait, defaults to waiting until the plan deadline.
+        :return: The outcome dictionary, or None if the plan is unknown or the wait timed out.
+        """
+        if plan_uid in self.completed:
+            return self.completed[plan_uid]
+        tracking = self.pending.get(plan_uid)
+        if tracking is None:
+            return None
+        try:
+            return await asyncio.wait_for(asyncio.shield(tracking.future), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def latency(self, plan_uid: str) -> Optional[float]:
+        outcome = self.completed.get(plan_uid)
+        return outcome["latency"] if outcome else None
+
+    def _resolve(self, tracking: PlanTracking, status: str, now: Optional[float] = None):
+        outcome = tracking.outcome(status, now if now is not None else time.time())
+        self.pending.pop(tracking.plan_uid, None)
+        self.completed[tracking.plan_uid] = outcome
+        while len(self.completed) > self.remember:
+            self.completed.popitem(last=False)
+        if not tracking.future.done():
+            tracking.future.set_result(outcome)
@@ -27,8 +27,10 @@ import pandas as pd
 
 from ..application import MLSApplication
 from ..data.configuration import AgentConfig
+from ..data.liveness import LivenessTracker, LivenessView
 from ..data.monitor import MonitorData
 from ..data.plan import Plan
+from ..data.plan_registry import PlanRegistry, DUPLICATE, LATE
 from ..data.task_log import TaskLogEntry, Status
 from ..logger_util import logger
 from ..policy import Policy
@@ -49,12 +51,15 @@ class MLSState:
         applications (Dict[str, MLSApplication]): Map of keys to MLSApplication instances.
         task_log (pd.DataFrame): DataFrame holding the task log entries.
         policy (Policy): The policy object determining operational rules and configurations.
+        liveness (LivenessTracker): Heartbeats of the lower-tier agents.
+        liveness_view (LivenessView): Liveness digests received from the lower-tier agents.
+        plan_registry (PlanRegistry): Correlates plan outcomes with the plans awaiting them.
         _save_period (int): The time interval, in seconds, between automatic save operations.
         _lock (asyncio.Lock): Ensures thread-safe operations during save/load processes.
         _save_task (asyncio.Task): Asyncio task for periodic saving.
         _last_save_file (str): Tracks the last file used for saving state, enabling recovery.
     """
-    monitor_data: MonitorData = MonitorData()
+    monitor_data: MonitorData = field(default_factory=MonitorData)
     applications: Dict[str, MLSApplication] = field(default_factory=dict)
     task_log: pd.DataFrame = field(
         default_factory=lambda: pd.DataFrame(
@@ -68,6 +73,9 @@ class MLSState:
     hostname: str = field(default_factory=lambda: os.getenv("NODE_NAME", socket.gethostname()))
     configuration: AgentConfig = None
     agent: object = None
+    liveness: LivenessTracker = field(default_factory=LivenessTracker)
+    liveness_view: LivenessView = field(default_factory=LivenessView)
+    plan_registry: PlanRegistry = field(default_factory=PlanRegistry)
     _save_period: int = 300  # Period (in seconds) for saving the state
     _lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False)  # Lock for thread safety
     _save_task: asyncio.Task = field(default=None, init=False)  # Task for periodic saving
@@ -296,9 +304,19 @@ class MLSState:
             mechanism (str): The name of the mechanism to update.
             status (str): The new status of the mechanism.
 
+        Duplicate statuses for a plan are ignored. A status that arrives after the
+        plan timed out is still recorded, the mechanism did apply it.
+
         Returns:
             bool: True if the task log was updated successfully, False otherwise.
         """
+        result = self.plan_registry.complete(plan_uid, mechanism, status)
+        if result == DUPLICATE:
+            logger.debug(f"Ignoring duplicate status for plan {plan_uid} mechanism {mechanism}")
+            return False
+        if result == LATE:
+            logger.info(f"Status {status} of mechanism {mechanism} arrived after plan {plan_uid} timed out")
+
         # Get the current task log
         task_log = self.get_task_log(plan_uid)
 
@@ -0,0 +1,157 @@
+#  Copyright (c) 2025. MLSysOps Consortium
+#  #
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  #
+#      http://www.apache.org/licenses/LICENSE-2.0
+#  #
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, List, Optional
+
+from ..logger_util import logger
+
+
+@dataclass
+class TraceEvent:
+    """
+    One recorded message.
+
+    Attributes:
+        seq (int): Sequence number, increasing over the recorder lifetime.
+        ts (float): Time the message was recorded.
+        event (str): The message event (or watch operation).
+        app (str): The application the message refers to, if any.
+        message (Any): The message itself, kept by reference.
+    """
+    seq: int
+    ts: float
+    event: Optional[str]
+    app: Optional[str]
+    message: Any
+
+    def to_dict(self) -> dict:
+        return {"seq": self.seq, "ts": self.ts, "event": self.event, "app": self.app, "message": self.message}
+
+
+@dataclass
+class TraceRecorder:
+    """
+    Fixed-size in-memory ring buffer of the messages handled by a component.
+
+    Recording only appends a reference to a deque, the oldest events are dropped
+    once the capacity is reached. Snapshots of the buffer are written to a file
+    on demand, or periodically by run(), with the file I/O in a worker thread.
+
+    Attributes:
+        capacity (int): Number of events kept.
+        path (str): File the snapshots are written to.
+        interval (float): Seconds between periodic snapshots, 0 disables them.
+        events (Deque[TraceEvent]): The recorded events, oldest first.
+        dropped (int): Number of events evicted from the buffer.
+    """
+    capacity: int = 1000
+    path: str = "trace.json"
+    interval: float = 0
+    events: Deque[TraceEvent] = field(default=None)
+    dropped: int = 0
+    _seq: int = 0
+    _snapshot_seq: int = 0
+
+    def __post_init__(self):
+        self.events = deque(maxlen=self.capacity)
+
+    def record(self, message: dict) -> TraceEvent:
+        """
+        Record a message. The app is taken from the payload name.
+
+        :param message: The message dictionary.
+        :return: The recorded event.
+        """
+        payload = message.get("payload") if isinstance(message, dict) else None
+        app = payload.get("name") if isinstance(payload, dict) else None
+        event_name = message.get("event") or message.get("operation") if isinstance(message, dict) else None
+
+        if len(self.events) == self.capacity:
+            self.dropped += 1
+        self._seq += 1
+        event = TraceEvent(seq=self._seq, ts=time.time(), event=event_name, app=app, message=message)
+        self.events.append(event)
+        return event
+
+    def query(self, app: Optional[str] = None, event: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None, limit: Optional[int] = None) -> List[TraceEvent]:
+        """
+        The recorded events matching all given filters, oldest first.
+
+        :param app: Keep the events of this application.
+        :param event: Keep the events of this type.
+        :param since: Keep the events recorded at or after this time.
+        :param until: Keep the events recorded before this time.
+        :param limit: Return only the most recent matching events.
+        """
+        matches = [
+            entry for entry in self.events
+            if (app is None or entry.app == app)
+            and (event is None or entry.event == event)
+            and (since is None or entry.ts >= since)
+            and (until is None or entry.ts < until)
+        ]
+        if limit is not None:
+            matches = matches[-limit:] if limit > 0 else []
+        return matches
+
+    async def snapshot(self, path: Optional[str] = None) -> bool:
+        """
+        Write the buffer to a file, replacing the previous snapshot.
+
+        The events are serialized on the event loop, so the messages cannot change
+        while they are written, and the file is written in a worker thread.
+
+        :param path: Target file, defaults to self.path.
+        :return: True if the snapshot was written.
+        """
+        target = path or self.path
+        data = json.dumps({"dropped": self.dropped, "events": [entry.to_dict() for entry in self.events]},
+                          skipkeys=True, indent=4, default=str, ensure_ascii=False, sort_keys=True)
+        try:
+            await asyncio.to_thread(_write_atomic, target, data)
+        except OSError as e:
+            logger.error(f"Error writing trace snapshot {target}: {e}")
+            return False
+        self._snapshot_seq = self._seq
+        return True
+
+    async def run(self):
+        """Write a snapshot every interval seconds, if new events were recorded."""
+        if self.interval <= 0:
+            return
+        while True:
+            await asyncio.sleep(self.interval)
+            if self._seq != self._snapshot_seq:
+                await self.snapshot()
+
+
+def _write_atomic(path: str, data: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -31,6 +31,8 @@ class MessageEvents(Enum):
     NODE_SYSTEM_DESCRIPTION_SUBMITTED = "node_sys_desc_submitted"
     NODE_SYSTEM_DESCRIPTION_UPDATED = "node_sys_desc_updated"
     NODE_SYSTEM_DESCRIPTION_REMOVED = "node_sys_desc_removed"
+    NODE_SYSTEM_DESCRIPTION_DELTA = "node_sys_desc_delta"
+    NODE_SYSTEM_DESCRIPTION_RESYNC = "node_sys_desc_resync"
     KUBERNETES_NODE_ADDED = "kubernetes_node_added"
     KUBERNETES_NODE_MODIFIED = "kubernetes_node_modified"
     KUBERNETES_NODE_REMOVED = "kubernetes_node_removed"
@@ -59,6 +61,7 @@ class MessageEvents(Enum):
     NODE_EXPORTER_REMOVE = "node_exporter_remove"
     OTEL_NODE_INTERVAL_UPDATE = "otel_node_interval_update"
     NODE_STATE_SYNC = "node_state_sync"
+    LIVENESS_DIGEST = "liveness_digest"
 
     # Fluidity Messages
     MESSAGE_TO_FLUIDITY = "message_to_fluidity"
@@ -14,6 +14,7 @@
 #
 import importlib
 import copy
+import os
 import subprocess
 import sys
 import time
@@ -23,6 +24,12 @@ import asyncio
 
 from .logger_util import logger
 
+# Policy modules loaded in this process, shared by all policy instances and agents.
+# Keyed by file path and checked against the modification time, so an edited
+# policy file is loaded again.
+_module_cache = {}
+
+
 class Policy:
     def __init__(self, name, module_path, core=False):
         self.name = name
@@ -87,6 +94,12 @@ class Policy:
     def load_module(self):
         # Dynamically import the policy module
         try:
+            mtime = os.path.getmtime(self.module_path)
+            cached = _module_cache.get(self.module_path)
+            if cached and cached[0] == mtime:
+                self.module = cached[1]
+                return
+
             packages = self.parse_module_for_context_data()
             if packages and isinstance(packages, list):
                 for pkg in packages:
@@ -108,6 +121,7 @@ class Policy:
             self.module = importlib.util.module_from_spec(spec)
             # Load the module
             spec.loader.exec_module(self.module)
+            _module_cache[self.module_path] = (mtime, self.module)
         except Exception as e:
             logger.error(f"Failed to load module {self.name} from {self.module_path}: {e}")
 
@@ -46,6 +46,11 @@ class PlanScheduler:
                 # check for previous plans
                 await self.update_pending_plans()
 
+                # resolve the plans whose outcome did not arrive in time
+                for plan_uid in self.state.plan_registry.expire():
+                    logger.test(f"|1| Plan planuid:{plan_uid} status:Timeout")
+                    self.state.update_task_log(plan_uid, updates={"status": Status.FAILED.value})
+
                 # Empty the queue
                 while not self.state.plans.empty():
                     # Get plans from the queue
@@ -100,6 +105,8 @@ class PlanScheduler:
 
 
                             self.state.update_task_log(plan.uuid,updates={"status": "Scheduled"})
+                            self.state.plan_registry.register(plan.uuid, [asset],
+                                                             timeout=self.state.configuration.plan_timeout)
                             logger.test(f"|1| Plan with planuid:{plan.uuid} scheduled for execution status:Scheduled")
                             # mark mechanism touched only for non-core
                             if not plan.core:
@@ -13,29 +13,23 @@
 #  limitations under the License.
 #
 
-from datetime import datetime
-from spade.message import Message
-import json
+import asyncio
+
 from ...logger_util import logger
 from spade.behaviour import PeriodicBehaviour
-from datetime import datetime, timedelta
 
 
 class CheckInactiveClustersBehaviour(PeriodicBehaviour):
-    """ Checks for inactive node agents and removes them from Redis. """
+    """ Checks for inactive node agents and removes them from Redis once their deadline,
+    set by HBReceiverBehaviour from the interval they report, has passed. """
 
-    def __init__(self, redis_manager):
-        super().__init__(period=10)
+    def __init__(self, redis_manager, period=10):
+        super().__init__(period=period)
         self.r = redis_manager
-        self.timeout = timedelta(seconds=60)
 
     async def run(self):
         logger.debug(f"CheckInactiveClustersBehaviour")
-        now = datetime.now()
-        registered_agents = self.r.get_dict("cluster_agents")
-        if registered_agents:
-            for node_jid, last_seen in registered_agents.items():
-                last_seen_time = datetime.fromisoformat(last_seen)
-                if now - last_seen_time > self.timeout:
-                    self.r.remove_key(self.r.redis_dict, node_jid)
-                    print(f"Node {node_jid} removed due to inactivity.")
+        # Only the stale agents are read from the heartbeat index and evicted in one round-trip
+        evicted = await asyncio.to_thread(self.r.evict_stale_agents, (self.r.redis_dict, self.r.redis_agents))
+        for node_jid in evicted:
+            logger.info(f"Node {node_jid} removed due to inactivity.")
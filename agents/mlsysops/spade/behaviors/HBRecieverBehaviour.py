@@ -13,7 +13,7 @@
 #  limitations under the License.
 #
 
-from datetime import datetime
+import asyncio
 
 from spade.behaviour import CyclicBehaviour
 from spade.message import Message
@@ -22,19 +22,48 @@ from ...logger_util import logger
 
 
 class HBReceiverBehaviour(CyclicBehaviour):
-    """ Handles heartbeat pings from node agents and updates last seen time in Redis. """
+    """ Handles heartbeat pings from node agents and updates last seen time in Redis.
 
-    def __init__(self, redis_manager):
+    An agent is evicted after timeout seconds without a heartbeat, or after
+    missed_beats of the interval it reports if that is longer, so agents that
+    backed off their heartbeat are not evicted between two pings. """
+
+    def __init__(self, redis_manager, batch_size=500, timeout=60, missed_beats=3):
         super().__init__()
         self.r = redis_manager
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.missed_beats = missed_beats
+
+    @staticmethod
+    def reported_interval(msg):
+        """ Heartbeat interval announced by the sender, None for plain pings. """
+        try:
+            return float(json.loads(msg.body).get("interval"))
+        except (ValueError, TypeError, AttributeError):
+            return None
 
     async def run(self):
         logger.debug(f"HBReceiverBehaviour")
         msg = await self.receive(timeout=5)
-        if msg and msg.get_metadata("performative") == "clus_hb":
-            node_jid = str(msg.sender).split("/")[0]
-            now = datetime.now().isoformat()
-            self.r.update_dict_value(self.r.redis_dict, node_jid, now)
-            self.r.update_dict_value(self.r.redis_agents, node_jid, now)
+        senders = set()
+        timeouts = {}
+        # Drain the heartbeats already queued so a burst costs a single Redis round-trip
+        while msg and len(senders) < self.batch_size:
+            if msg.get_metadata("performative") == "clus_hb":
+                node_jid = str(msg.sender).split("/")[0]
+                senders.add(node_jid)
+                interval = self.reported_interval(msg)
+                self.agent.state.liveness.heartbeat(node_jid, interval)
+                if interval:
+                    timeouts[node_jid] = max(self.timeout, self.missed_beats * interval)
+            msg = await self.receive(timeout=0)
 
-            logger.debug(f"Ping received from {node_jid}. Updated last seen time in Redis.")
+        if senders:
+            await asyncio.to_thread(self.r.record_heartbeats, list(senders),
+                                    (self.r.redis_dict, self.r.redis_agents), self.timeout, timeouts)
+            logger.debug(f"Ping received from {', '.join(senders)}. Updated last seen time in Redis.")
+            agent = self.agent.state.agent
+            if agent is not None:
+                for sender in senders:
+                    agent.agent_seen(sender)
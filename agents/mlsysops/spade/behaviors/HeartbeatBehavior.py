@@ -13,6 +13,8 @@
 #  limitations under the License.
 #
 
+import json
+
 from ...logger_util import logger
 from ...data.configuration import AgentConfig
 from spade.behaviour import PeriodicBehaviour
@@ -21,15 +23,48 @@ from spade.template import Template
 
 
 class HeartbeatBehaviour(PeriodicBehaviour):
+    """
+    Pings the upper-tier agent. While the set of applications on the agent does not
+    change, the interval is multiplied by backoff every stable_beats heartbeats, up to
+    max_period; any change resets it to period. The interval is sent with each ping so
+    the receiver knows when the next one is due.
+    """
+
+    def __init__(self, period=10, max_period=60, backoff=2, stable_beats=3):
+        super().__init__(period=period)
+        self.base_period = period
+        self.interval = period
+        self.max_period = max_period
+        self.backoff = backoff
+        self.stable_beats = stable_beats
+        self.beats = 0
+        self.last_applications = None
 
+    def adapt_period(self):
+        applications = set(self.agent.state.applications.keys())
+        if applications != self.last_applications:
+            self.last_applications = applications
+            self.beats = 0
+            self.interval = self.base_period
+            self.period = self.interval
+            return
+
+        self.beats += 1
+        if self.beats >= self.stable_beats and self.interval < self.max_period:
+            self.beats = 0
+            self.interval = min(self.interval * self.backoff, self.max_period)
+            self.period = self.interval
+            logger.debug(f"Agent stable, heartbeat interval backed off to {self.interval}s")
 
     async def run(self):
 
         logger.debug("Ping behaviour running\n")
 
+        self.adapt_period()
+
         msg = Message(to=self.agent.state.configuration.c_jid)  # Instantiate the message
-        msg.set_metadata("performative", "inform")  # Set the "inform" FIPA performative
-        msg.body = "Ping"  # Set the message content
+        msg.set_metadata("performative", "clus_hb")  # Heartbeat performative handled by HBReceiverBehaviour
+        msg.body = json.dumps({"interval": self.interval})  # Next heartbeat is due within this interval
 
         await self.send(msg)
         logger.debug("HB sent!\n")
\ No newline at end of file
@@ -0,0 +1,51 @@
+#  Copyright (c) 2025. MLSysOps Consortium
+#  #
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  #
+#      http://www.apache.org/licenses/LICENSE-2.0
+#  #
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+from spade.behaviour import PeriodicBehaviour
+
+from ...events import MessageEvents
+from ...logger_util import logger
+
+
+class LivenessDigestBehaviour(PeriodicBehaviour):
+    """
+    Summarises the heartbeats of the node agents into a digest with the alive, suspect
+    and dead sets and the changes since the previous digest, and forwards it to the
+    continuum agent. The upper tier receives one message per cluster per period,
+    which also serves as the cluster agent's own heartbeat.
+    """
+
+    def __init__(self, period=30, suspect_after=3, dead_after=6, forget_after=3600):
+        super().__init__(period=period)
+        self.digest_period = period
+        self.suspect_after = suspect_after
+        self.dead_after = dead_after
+        self.forget_after = forget_after
+
+    async def on_start(self):
+        liveness = self.agent.state.liveness
+        liveness.suspect_after = self.suspect_after
+        liveness.dead_after = self.dead_after
+        liveness.forget_after = self.forget_after
+
+    async def run(self):
+        logger.debug(f"LivenessDigestBehaviour")
+        digest = self.agent.state.liveness.digest()
+        for node_jid, state in digest["changes"].items():
+            logger.info(f"Node {node_jid} is now {state or 'forgotten'}")
+
+        payload = {"cluster": self.agent.state.configuration.cluster, "interval": self.digest_period, **digest}
+        await self.agent.send_message(self.agent.state.configuration.continuum,
+                                      MessageEvents.LIVENESS_DIGEST.value, payload)
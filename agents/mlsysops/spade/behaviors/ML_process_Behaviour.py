@@ -66,13 +66,24 @@ class ML_process_Behaviour(CyclicBehaviour):
           A behavior that processes tasks from a Redis queue in a cyclic manner.
     """
 
-    def __init__(self, redis_manager,message_queue):
+    def __init__(self, redis_manager,message_queue, pop_timeout=5):
         super().__init__()
         self.r = redis_manager
         self.message_queue=message_queue
+        self.pop_timeout = pop_timeout
 
     async def run(self):
         """Continuously process tasks from the Redis queue."""
+        if not self.r.redis_conn:
+            await asyncio.sleep(self.pop_timeout)
+            return
+
+        # Block (off the event loop) until an ML deployment request is queued
+        q_info = await asyncio.to_thread(self.r.blocking_pop, self.r.ml_q, self.pop_timeout)
+        if q_info is None:
+            logger.debug("Queue is empty, waiting for the next iteration...")
+            return
+
         logger.debug("MLs Agent is processing for ML Deployments...")
 
         karmada_api_kubeconfig = os.getenv("KARMADA_API_KUBECONFIG", "kubeconfigs/karmada-api.kubeconfig")
@@ -81,18 +92,15 @@ class ML_process_Behaviour(CyclicBehaviour):
             await kubernetes_asyncio.config.load_kube_config(config_file=karmada_api_kubeconfig)
         except kubernetes_asyncio.config.ConfigException:
             logger.error(f"Error loading karmada api config with external kubeconfig: {karmada_api_kubeconfig}")
+            # Put the request back at the head so that it is not lost nor reordered
+            self.r.push_front(self.r.ml_q, q_info)
+            await asyncio.sleep(self.pop_timeout)
             return
 
         # Initialize Kubernetes custom API client
         async with kubernetes_asyncio.client.ApiClient() as api_client:
             custom_api = CustomObjectsApi(api_client)
 
-            if self.r.is_empty(self.r.ml_q):
-                logger.debug("Queue is empty, waiting for the next iteration...")
-                await asyncio.sleep(10)
-                return
-
-            q_info = self.r.pop(self.r.ml_q)
             q_info = q_info.replace("'", '"')
             print(q_info)
             data_queue = json.loads(q_info)
@@ -207,6 +215,4 @@ class ML_process_Behaviour(CyclicBehaviour):
 
                 except Exception as e:
                     logger.error(f"Error during deployment of '{name}': {e}")
-                    self.r.update_dict_value("endpoint_hash", model_id, "Deployment_Failed")
-
-            await asyncio.sleep(1)
\ No newline at end of file
+                    self.r.update_dict_value("endpoint_hash", model_id, "Deployment_Failed")
\ No newline at end of file
@@ -14,7 +14,6 @@
 #
 
 import asyncio
-from datetime import datetime
 
 from spade.behaviour import CyclicBehaviour
 from spade.message import Message
@@ -32,15 +31,15 @@ class ManageSubscriptionBehaviour(CyclicBehaviour):
         msg = await self.receive(timeout=10)
         if msg and msg.get_metadata("performative") == "subscribe":
             cluster_jid = str(msg.sender).split("/")[0]
-            now = datetime.now().isoformat()
 
-            existing_entry = self.r.get_dict_value(self.r.redis_dict, cluster_jid)
+            # The Redis client is synchronous, keep it off the event loop
+            existing_entry = await asyncio.to_thread(self.r.get_dict_value, self.r.redis_dict, cluster_jid)
             if existing_entry:
                 logger.debug(f"Cluster {cluster_jid} is re-registering. Updating last seen timestamp.")
             else:
                 logger.debug(f"New Cluster {cluster_jid} subscribed.")
 
-            self.r.update_dict_value(self.r.redis_dict, cluster_jid, now)
+            await asyncio.to_thread(self.r.record_heartbeats, [cluster_jid], (self.r.redis_dict,))
 
             response = Message(to=cluster_jid)
             response.set_metadata("performative", "sub_ack")
@@ -48,3 +47,8 @@ class ManageSubscriptionBehaviour(CyclicBehaviour):
 
             await self.send(response)
             logger.debug(f" Node {cluster_jid} registered or updated in Redis.")
+
+            # A (re)subscribed agent is reachable, send it what it missed
+            agent = self.agent.state.agent
+            if agent is not None:
+                agent.agent_seen(cluster_jid)
@@ -36,6 +36,9 @@ class MessageReceivingBehavior(CyclicBehaviour):
         msg = await self.receive(timeout=10)  # wait for a message for 10 seconds
         if msg:
             sender = str(msg._sender).split("/")[0]
+            # Any message shows the sender is up, confirm what was sent to it before
+            if self.agent.state.agent is not None:
+                self.agent.state.agent.agent_seen(sender)
 
             # Decode message
             performative = msg.get_metadata("performative")
@@ -46,6 +49,9 @@ class MessageReceivingBehavior(CyclicBehaviour):
             resp.thread = msg.thread
             logger.debug(f"Received {event} from {sender} of performative {performative}")
             match (performative, event):
+                case ("clus_hb", _):
+                    # Heartbeats are handled by HBReceiverBehaviour
+                    pass
                 case ("request", MessageEvents.COMPONENT_PLACED.value):
                     logger.debug("Application Component Placed")
                     # Decode payload
@@ -16,6 +16,7 @@
 import asyncio
 import json
 import os
+import socket
 import subprocess
 import time
 from ...logger_util import logger
@@ -23,7 +24,6 @@ import yaml
 from spade.behaviour import CyclicBehaviour
 import kubernetes_asyncio
 from kubernetes_asyncio.client.api import CustomObjectsApi
-from kubernetes_asyncio.client import ApiException
 from ruamel.yaml import YAML
 
 
@@ -48,61 +48,104 @@ def transform_description(input_dict):
 
 class ProcessBehaviour(CyclicBehaviour):
     """
-          A behavior that processes tasks from a Redis queue in a cyclic manner.
+          A behavior that processes application descriptions from the Redis intake stream.
+
+          Entries are read through a consumer group, so several continuum agents share the
+          work. An entry stays in the group's pending list until it is acknowledged together
+          with its final status; after a restart the agent first resumes its own pending
+          entries, and entries left idle by a crashed replica are claimed after
+          ``claim_idle_timeout`` seconds.
     """
 
-    def __init__(self, redis_manager, message_queue):
+    def __init__(self, redis_manager, message_queue, pop_timeout=5, batch_size=10, claim_idle_timeout=60):
         super().__init__()
         self.r = redis_manager
         self.message_queue = message_queue
+        self.pop_timeout = pop_timeout
+        self.batch_size = batch_size
+        self.claim_idle_timeout = claim_idle_timeout
+        # Stable across restarts, so that the agent finds its own pending entries again
+        self.consumer = os.getenv("NODE_NAME", socket.gethostname())
+        self.resume_pending = True
+        self.last_claim = 0
+
+    async def on_start(self):
+        if self.r.redis_conn:
+            await asyncio.to_thread(self.r.ensure_stream_group, self.r.stream_name, self.r.stream_group)
+
+    async def read_entries(self):
+        # Descriptions pushed by producers that still use the list queue
+        await asyncio.to_thread(self.r.move_list_to_stream, self.r.q_name, self.r.stream_name)
+
+        if self.resume_pending:
+            entries = await asyncio.to_thread(self.r.stream_read_group, self.r.stream_name, self.r.stream_group,
+                                              self.consumer, self.batch_size, pending=True)
+            if entries:
+                logger.info(f"Resuming {len(entries)} unacknowledged descriptions.")
+                return entries
+            self.resume_pending = False
+
+        if time.monotonic() - self.last_claim > self.claim_idle_timeout:
+            self.last_claim = time.monotonic()
+            entries = await asyncio.to_thread(self.r.stream_claim_stale, self.r.stream_name, self.r.stream_group,
+                                              self.consumer, self.claim_idle_timeout * 1000, self.batch_size)
+            if entries:
+                logger.info(f"Claimed {len(entries)} descriptions left idle by another agent.")
+                return entries
+
+        # Block (off the event loop) until the northbound API submits a description
+        return await asyncio.to_thread(self.r.stream_read_group, self.r.stream_name, self.r.stream_group,
+                                       self.consumer, self.batch_size, self.pop_timeout * 1000)
 
     async def run(self):
-        """Continuously process tasks from the Redis queue."""
-        logger.info("MLs Agent is processing for Application ...")
+        """Continuously process tasks from the Redis stream."""
+        if not self.r.redis_conn:
+            await asyncio.sleep(self.pop_timeout)
+            return
 
-        if self.r.is_empty(self.r.q_name):
-            logger.debug(self.r.q_name + " queue is empty, waiting for next iteration...")
-            await asyncio.sleep(10)
+        entries = await self.read_entries()
+        if not entries:
+            logger.debug(self.r.stream_name + " stream is empty, waiting for next iteration...")
+            return
+
+        for entry_id, q_info in entries:
+            await self.process_entry(entry_id, q_info)
+
+    def ack(self, entry_id, app_id="", status=""):
+        """Acknowledges the entry and applies the final status of the application atomically."""
+        if not self.r.stream_ack(self.r.stream_name, self.r.stream_group, entry_id,
+                                 "system_app_hash", app_id, status):
+            logger.warning(f"Entry {entry_id} was already acknowledged, status '{status}' not applied.")
+
+    async def process_entry(self, entry_id, q_info):
+        logger.info("MLs Agent is processing for Application ...")
+        try:
+            data_dict = json.loads(q_info)
+            app_id = data_dict['MLSysOpsApp']['name']
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Discarding malformed description {entry_id}: {e}")
+            self.ack(entry_id)
             return
 
-        q_info = self.r.pop(self.r.q_name)
-        data_dict = json.loads(q_info)
-        app_id = data_dict['MLSysOpsApp']['name']
         logger.debug(self.r.get_dict_value("system_app_hash", app_id))
 
-        group = "mlsysops.eu"
-        version = "v1"
-        plural = "mlsysopsapps"
-        namespace = "default"
         name = app_id
 
         if self.r.get_dict_value("system_app_hash", app_id) == "To_be_removed":
-            try:
-                # Delete the existing custom resource
-                logger.info(f"Deleting Custom Resource: {name}")
-                # SEND MESSAGE TO THE QUEUE
-                await self.message_queue.put({
-                    "event": "application_removed",
-                    "payload": data_dict
-                }
-                )
-
-                logger.info(f"Custom Resource '{name}' deleted successfully.")
-                self.r.update_dict_value("system_app_hash", app_id, "Removed")
-                self.r.remove_key("system_app_hash", app_id)
-
-            except ApiException as e:
-                if e.status == 404:
-                    logger.warning(f"Custom Resource '{name}' not found. Skipping deletion.")
-                else:
-                    logger.error(f"Error deleting Custom Resource '{name}': {e}")
-                    raise
+            # SEND MESSAGE TO THE QUEUE
+            logger.info(f"Deleting Custom Resource: {name}")
+            await self.message_queue.put({
+                "event": "application_removed",
+                "payload": data_dict
+            }
+            )
+
+            logger.info(f"Custom Resource '{name}' deleted successfully.")
+            # Removed applications are dropped from the hash
+            self.ack(entry_id, app_id)
         else:
-
             try:
-
                 # SEND MESSAGE TO THE QUEUE
-
                 self.r.update_dict_value("system_app_hash", app_id, "Under_deployment")
 
                 await self.message_queue.put(
@@ -112,10 +155,7 @@ class ProcessBehaviour(CyclicBehaviour):
                     }
                 )
 
-                self.r.update_dict_value("system_app_hash", app_id, "Deployed")
-                await asyncio.sleep(2)
+                self.ack(entry_id, app_id, "Deployed")
             except Exception as e:
                 logger.error(f"Error during deployment of '{name}': {e}")
-                self.r.update_dict_value("system_app_hash", app_id, "Deployment_Failed")
-
-        await asyncio.sleep(2)
+                self.ack(entry_id, app_id, "Deployment_Failed")
@@ -25,6 +25,7 @@ from spade.template import Template
 from .behaviors.CheckInactiveClustersBehaviour import CheckInactiveClustersBehaviour
 from .behaviors.Check_ml_deployment_Behaviour import Check_ml_deployment_Behaviour
 from .behaviors.HBRecieverBehaviour import HBReceiverBehaviour
+from .behaviors.LivenessDigestBehaviour import LivenessDigestBehaviour
 from .behaviors.ML_process_Behaviour import ML_process_Behaviour
 from .behaviors.ManagementModeBehaviour import ManagementModeBehaviour
 from .behaviors.FailoverBehaviour import FailoverBehavior
@@ -64,6 +65,7 @@ class MLSSpade(Agent):
             "Check_ml_deployment_Behaviour": Check_ml_deployment_Behaviour,
             "HBReceiverBehaviour": HBReceiverBehaviour,
             "HeartbeatBehaviour": HeartbeatBehaviour,
+            "LivenessDigestBehaviour": LivenessDigestBehaviour,
             "ML_process_Behaviour": ML_process_Behaviour,
             "ManagementModeBehaviour": ManagementModeBehaviour,
             "ManageSubscriptionBehaviour": ManageSubscriptionBehaviour,
@@ -15,6 +15,8 @@
 
 import json
 import os
+import time
+from datetime import datetime
 import redis
 from ..logger_util import logger
 
@@ -28,6 +30,81 @@ redis_channel_name = os.getenv('REDIS_CHANNEL_NAME', 'my_channel')  # Default ch
 redis_dict_name = os.getenv('REDIS_DICT_NAME', 'system_app_hash')  # Default dictionary name
 redis_dict2_name = os.getenv('REDIS_DICT2_NAME', 'component_metrics')  # Components hash
 redis_ml_queue = os.getenv('REDIS_ML_QUEUE_NAME', 'ml_deployment_queue')  # Default channel name ""
+redis_stream_name = os.getenv('REDIS_STREAM_NAME', 'valid_descriptions_stream')  # Default intake stream
+redis_stream_group = os.getenv('REDIS_STREAM_GROUP', 'continuum_agents')  # Default consumer group
+redis_heartbeat_index = os.getenv('REDIS_HEARTBEAT_INDEX', 'agents_heartbeat_deadlines')  # Sorted set of eviction deadlines
+
+# Acknowledges a stream entry and applies the matching status transition in one step.
+# The status is only written by the consumer whose XACK succeeds, so a redelivered or
+# claimed entry can never be completed twice.
+# KEYS: stream, status hash - ARGV: group, entry id, hash field ('' skips), status ('' removes the field)
+_ACK_WITH_STATUS_LUA = """
+local acked = redis.call('XACK', KEYS[1], ARGV[1], ARGV[2])
+if acked == 1 then
+    if ARGV[3] ~= '' then
+        if ARGV[4] == '' then
+            redis.call('HDEL', KEYS[2], ARGV[3])
+        else
+            redis.call('HSET', KEYS[2], ARGV[3], ARGV[4])
+        end
+    end
+    redis.call('XDEL', KEYS[1], ARGV[2])
+end
+return acked
+"""
+
+# Atomically moves up to ARGV[1] items from a legacy list queue into the intake stream.
+# KEYS: list, stream
+_LIST_TO_STREAM_LUA = """
+local moved = 0
+for i = 1, tonumber(ARGV[1]) do
+    local value = redis.call('LPOP', KEYS[1])
+    if not value then
+        break
+    end
+    redis.call('XADD', KEYS[2], '*', 'data', value)
+    moved = moved + 1
+end
+return moved
+"""
+
+# Removes every agent whose deadline is at or before ARGV[1] from the heartbeat index and from the
+# agent hashes in one round-trip, at most ARGV[2] agents per call.
+# KEYS: heartbeat index, agent hashes... - returns the evicted agents
+_EVICT_STALE_AGENTS_LUA = """
+local stale = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+if #stale > 0 then
+    redis.call('ZREM', KEYS[1], unpack(stale))
+    for i = 2, #KEYS do
+        redis.call('HDEL', KEYS[i], unpack(stale))
+    end
+end
+return stale
+"""
+
+def _merge_patch(target, patch, shallow=False):
+    """
+    Applies a JSON merge patch (RFC 7386) to the dict target in place: None values
+    remove fields, objects are merged recursively and any other value (arrays
+    included) replaces the field whole. With shallow, every top-level field of the
+    patch replaces the stored one as dict.update does, None values included.
+
+    :return: The part of the patch that changed something.
+    """
+    changed = {}
+    for field, value in patch.items():
+        if value is None and not shallow:
+            if field in target:
+                del target[field]
+                changed[field] = None
+        elif isinstance(value, dict) and isinstance(target.get(field), dict) and not shallow:
+            sub_changed = _merge_patch(target[field], value)
+            if sub_changed:
+                changed[field] = sub_changed
+        elif field not in target or target[field] != value:
+            target[field] = value
+            changed[field] = value
+    return changed
 
 
 class RedisManager:
@@ -41,11 +118,19 @@ class RedisManager:
         self.redis_conn = None
         self.redis_password = redis_password
         self.q_name = redis_queue_name
+        self.stream_name = redis_stream_name
+        self.stream_group = redis_stream_group
         self.ml_q = redis_ml_queue
         self.channel_name = redis_channel_name  # Channel name for Pub/Sub
         self.dict_name = redis_dict_name  # Dictionary name (Redis hash map)
         self.redis_dict = "cluster_agents"
         self.redis_agents = "system_agents"
+        self.redis_heartbeats = redis_heartbeat_index
+        self._ack_with_status = None
+        self._list_to_stream = None
+        self._evict_stale_agents = None
+        self.rejson_available = False
+        self.json_merge_available = False
 
     def connect(self):
         """
@@ -55,12 +140,27 @@ class RedisManager:
             self.redis_conn = redis.Redis(host=self.host, port=self.port, db=self.db, password=self.redis_password)
             if self.redis_conn.ping():
                 logger.info(f"Successfully connected to Redis at {self.host}.")
+                self._ack_with_status = self.redis_conn.register_script(_ACK_WITH_STATUS_LUA)
+                self._list_to_stream = self.redis_conn.register_script(_LIST_TO_STREAM_LUA)
+                self._evict_stale_agents = self.redis_conn.register_script(_EVICT_STALE_AGENTS_LUA)
+                self._detect_rejson()
             else:
                 raise Exception("Could not connect to Redis.")
         except redis.ConnectionError as e:
             logger.error(f"Connection error: {e}")
             self.redis_conn = None
 
+    def _detect_rejson(self):
+        """Checks whether RedisJSON is loaded and recent enough (2.6) for JSON.MERGE."""
+        try:
+            modules = self.redis_conn.module_list()
+        except redis.RedisError:
+            modules = []
+        for module in modules:
+            if module.get(b"name", module.get("name")) in (b"ReJSON", "ReJSON"):
+                self.rejson_available = True
+                self.json_merge_available = int(module.get(b"ver", module.get("ver", 0))) >= 20600
+
     # --- Queue Methods ---
     def push(self, q_name, value):
         if self.redis_conn:
@@ -69,6 +169,13 @@ class RedisManager:
         else:
             print("Redis connection not established.")
 
+    def push_front(self, q_name, value):
+        """Puts an item back at the head of the queue (LPUSH), to be popped next."""
+        if self.redis_conn:
+            self.redis_conn.lpush(q_name, value)
+        else:
+            print("Redis connection not established.")
+
     def pop(self, q_name):
         if self.redis_conn:
             value = self.redis_conn.lpop(q_name)
@@ -80,6 +187,25 @@ class RedisManager:
         else:
             print("Redis connection not established.")
 
+    def blocking_pop(self, q_name, timeout=5):
+        """
+        Waits until an item is available in the queue and pops it (BLPOP).
+
+        Each item is delivered to exactly one of the waiting consumers, so several
+        agents may block on the same queue without processing an item twice.
+
+        :param q_name: The queue name.
+        :param timeout: Maximum seconds to wait for an item (0 blocks forever).
+        :return: The decoded item, or None if the timeout expired.
+        """
+        if self.redis_conn:
+            item = self.redis_conn.blpop([q_name], timeout=timeout)
+            if item:
+                logger.debug(f" Info removed from '{q_name}'.")
+                return item[1].decode()
+            return None
+        print("Redis connection not established.")
+
     def is_empty(self, q_name):
         return self.redis_conn.llen(q_name) == 0 if self.redis_conn else True
 
@@ -87,6 +213,148 @@ class RedisManager:
         while not self.is_empty(q_name):
             self.pop(q_name)
 
+    # --- Stream Methods ---
+    def stream_add(self, stream_name, value):
+        if self.redis_conn:
+            return self.redis_conn.xadd(stream_name, {"data": value}).decode()
+        print("Redis connection not established.")
+
+    def ensure_stream_group(self, stream_name, group):
+        """
+        Creates the consumer group (and the stream) if it does not exist yet.
+        New groups start from the beginning of the stream, so nothing queued before
+        the first agent started is skipped.
+        """
+        if not self.redis_conn:
+            return False
+        try:
+            self.redis_conn.xgroup_create(stream_name, group, id="0", mkstream=True)
+            logger.info(f"Created consumer group '{group}' on stream '{stream_name}'.")
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        return True
+
+    @staticmethod
+    def _decode_entries(entries):
+        # Entries deleted while pending are returned with empty fields
+        return [(entry_id.decode(), fields[b"data"].decode())
+                for entry_id, fields in entries if fields and b"data" in fields]
+
+    def stream_read_group(self, stream_name, group, consumer, count=10, block=5000, pending=False):
+        """
+        Reads a batch of entries for this consumer.
+
+        :param pending: If True, re-reads the entries already delivered to this consumer
+            but not acknowledged (used to resume after a restart), without blocking.
+        :return: A list of (entry_id, value) tuples.
+        """
+        if not self.redis_conn:
+            return []
+        stream_id = "0" if pending else ">"
+        try:
+            response = self.redis_conn.xreadgroup(group, consumer, {stream_name: stream_id}, count=count,
+                                                  block=None if pending else block)
+        except redis.ResponseError as e:
+            if "NOGROUP" not in str(e):
+                raise
+            # The stream or the group were removed (e.g. Redis restarted without persistence)
+            self.ensure_stream_group(stream_name, group)
+            return []
+        if not response:
+            return []
+        return self._decode_entries(response[0][1])
+
+    def stream_claim_stale(self, stream_name, group, consumer, min_idle_ms, count=10):
+        """
+        Takes over entries that another consumer received but did not acknowledge
+        within min_idle_ms (e.g. the replica crashed).
+
+        :return: A list of (entry_id, value) tuples now owned by this consumer.
+        """
+        if not self.redis_conn:
+            return []
+        try:
+            response = self.redis_conn.xautoclaim(stream_name, group, consumer, min_idle_ms,
+                                                  start_id="0-0", count=count)
+        except redis.ResponseError as e:
+            if "NOGROUP" not in str(e):
+                raise
+            return []
+        return self._decode_entries(response[1])
+
+    def stream_ack(self, stream_name, group, entry_id, dict_name="", key="", status=""):
+        """
+        Acknowledges an entry and, atomically with it, sets its status in dict_name.
+        An empty status removes the key from the hash, an empty key only acknowledges.
+
+        :return: True if this call acknowledged the entry, False if it was already acknowledged.
+        """
+        if not self.redis_conn:
+            return False
+        acked = self._ack_with_status(keys=[stream_name, dict_name or stream_name],
+                                      args=[group, entry_id, key, status])
+        return acked == 1
+
+    def move_list_to_stream(self, q_name, stream_name, count=100):
+        """Drains items pushed by producers that still use the list queue into the stream."""
+        if not self.redis_conn:
+            return 0
+        return self._list_to_stream(keys=[q_name, stream_name], args=[count])
+
+    # --- Heartbeat Index Methods ---
+    def record_heartbeats(self, agent_jids, dict_names=(), timeout=60, timeouts=None):
+        """
+        Records the agents as seen now, for a whole batch in one pipelined round-trip.
+
+        The heartbeat index is a sorted set scored by the time each agent is evicted
+        at, so stale agents can be found without reading every agent and each agent
+        can have its own timeout. dict_names are agent hashes that map each agent to
+        its last-seen time, e.g. for the northbound API roster.
+
+        :param agent_jids: Bare JIDs of the agents a heartbeat was received from.
+        :param dict_names: Agent hashes to update with the last-seen time.
+        :param timeout: Seconds without a heartbeat after which an agent is evicted.
+        :param timeouts: Per-agent timeouts that override timeout.
+        """
+        if not self.redis_conn:
+            print("Redis connection not established.")
+            return
+        if not agent_jids:
+            return
+        now = time.time()
+        last_seen = datetime.fromtimestamp(now).isoformat()
+        pipe = self.redis_conn.pipeline(transaction=False)
+        timeouts = timeouts or {}
+        pipe.zadd(self.redis_heartbeats, {jid: now + timeouts.get(jid, timeout) for jid in agent_jids})
+        for dict_name in dict_names:
+            pipe.hset(dict_name, mapping={jid: last_seen for jid in agent_jids})
+        pipe.execute()
+
+    def stale_agents(self, count=1000):
+        """
+        :return: The agents past their deadline, oldest first (ZRANGEBYSCORE, O(log N + stale)).
+        """
+        if not self.redis_conn:
+            return []
+        stale = self.redis_conn.zrangebyscore(self.redis_heartbeats, "-inf", time.time(), start=0, num=count)
+        return [jid.decode() for jid in stale]
+
+    def evict_stale_agents(self, dict_names=(), count=1000):
+        """
+        Removes the agents past their deadline (see record_heartbeats) from the
+        heartbeat index and from dict_names in a single atomic round-trip.
+
+        :param dict_names: Agent hashes to remove the evicted agents from.
+        :param count: Maximum agents evicted per call.
+        :return: The evicted agents.
+        """
+        if not self.redis_conn:
+            return []
+        evicted = self._evict_stale_agents(keys=[self.redis_heartbeats, *dict_names],
+                                           args=[time.time(), count])
+        return [jid.decode() for jid in evicted]
+
     # --- Pub/Sub Methods ---
     def pub_ping(self, message):
         if self.redis_conn:
@@ -133,33 +401,98 @@ class RedisManager:
 
     # --- JSON Operations ---
     def json_set(self, key, path, json_data):
+        """Creates the JSON document, or updates its top-level fields as json_update does."""
         try:
-            if not self.redis_conn.execute_command("JSON.GET", key, "$"):
-                self.redis_conn.execute_command("JSON.SET", key, path, json_data)
-                return f"JSON data created at key: {key}, path: {path}"
-            return self.json_update(key, path, json_data)
+            if isinstance(json_data, str):
+                json_data = json.loads(json_data)
+            self._json_apply(key, json_data, path, shallow=True, create=True)
+            return f"JSON data set at key: {key}, path: {path}"
         except redis.RedisError as e:
             return f"Error setting JSON data: {e}"
 
     def json_get(self, key, path="$"):
-        return self.redis_conn.execute_command("JSON.GET", key, path) if self.redis_conn else None
+        if not self.redis_conn:
+            return None
+        if self.rejson_available:
+            return self.redis_conn.execute_command("JSON.GET", key, path)
+        return self.redis_conn.get(key)
+
+    def json_merge(self, key, json_data, path="$"):
+        """
+        Merges json_data (a JSON merge patch, see _merge_patch) into the document at
+        key, creating it if needed. Runs JSON.MERGE when RedisJSON 2.6+ is loaded,
+        otherwise falls back to an optimistic transaction.
+        """
+        if isinstance(json_data, str):
+            json_data = json.loads(json_data)
+        self._json_apply(key, json_data, path, create=True)
 
     def json_update(self, key, path, json_data):
+        """Replaces the top-level fields of the existing document with those of json_data."""
         try:
-            existing_data = self.json_get(key)
-            if not existing_data:
+            if not self.redis_conn.exists(key):
                 return f"No existing data for key: {key}."
-
-            existing_dict = json.loads(existing_data)
             if isinstance(json_data, str):
                 json_data = json.loads(json_data)
-
-            existing_dict.update(json_data)
-            self.redis_conn.execute_command("JSON.SET", key, path, json.dumps(existing_dict))
+            self._json_apply(key, json_data, path, shallow=True)
             return f"JSON updated at key: {key}, path: {path}"
         except Exception as e:
             return f"Error updating JSON: {e}"
 
+    def _json_apply(self, key, patch, path="$", shallow=False, create=False):
+        """
+        Applies patch to the document at key without reading it back when RedisJSON
+        can do the merge: a shallow update sets each top-level field and a deep one
+        runs JSON.MERGE, both in one MULTI.
+        """
+        if not self.redis_conn:
+            return
+        root = path in ("$", ".")
+        if self.rejson_available and (shallow or self.json_merge_available):
+            pipe = self.redis_conn.pipeline(transaction=True)
+            if create and root:
+                pipe.execute_command("JSON.SET", key, "$", "{}", "NX")
+            if shallow:
+                base = "$" if root else path
+                for field, value in patch.items():
+                    pipe.execute_command("JSON.SET", key, f"{base}[{json.dumps(field)}]", json.dumps(value))
+            else:
+                pipe.execute_command("JSON.MERGE", key, "$" if root else path, json.dumps(patch))
+            pipe.execute()
+            return
+        self._json_apply_watched(key, patch, path, shallow)
+
+    def _json_apply_watched(self, key, patch, path="$", shallow=False):
+        """
+        Fallback of _json_apply: the key is watched while the document is read and
+        merged, and the write is retried if another client changed it in between. The
+        merge runs here and not in a Lua script because the cjson library of Redis
+        cannot tell an empty array from an empty object.
+        """
+        # JSONPath '$' returns a list in RedisJSON, the legacy root path returns the object
+        json_path = "." if path == "$" else path
+
+        def apply(pipe):
+            if self.rejson_available:
+                raw = pipe.execute_command("JSON.GET", key, json_path)
+            else:
+                raw = pipe.get(key)
+            try:
+                document = json.loads(raw) if raw else {}
+            except ValueError:
+                document = {}
+            if not isinstance(document, dict):
+                document = {}
+            if not _merge_patch(document, patch, shallow) and raw:
+                return
+            pipe.multi()
+            if self.rejson_available:
+                pipe.execute_command("JSON.SET", key, json_path, json.dumps(document))
+            else:
+                pipe.set(key, json.dumps(document))
+
+        self.redis_conn.transaction(apply, key)
+
     def json_delete(self, key, path="$"):
         return self.redis_conn.execute_command("JSON.DEL", key, path) if self.redis_conn else None
 
@@ -195,8 +528,10 @@ class RedisManager:
 
     # --- Infrastructure Management ---
     def add_cluster(self, cluster_id, nodes):
-        for node in nodes:
-            self.redis_conn.sadd(f"MLSysOpsCluster:{cluster_id}:Nodes", node)
+        """Adds the nodes in one round-trip and returns how many were new."""
+        if not self.redis_conn or not nodes:
+            return 0
+        return self.redis_conn.sadd(f"MLSysOpsCluster:{cluster_id}:Nodes", *nodes)
 
     def list_clusters_in_continuum(self, continuum_id):
         return [c.decode() for c in self.redis_conn.smembers(f"MLSysOpsContinuum:{continuum_id}:Clusters")]
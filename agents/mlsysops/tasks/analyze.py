@@ -20,7 +20,7 @@ import uuid
 
 from ..controllers import telemetry
 from ..data.state import MLSState
-from mlsysops.controllers.policy import PolicyController, PolicyScopes
+from mlsysops.controllers.policy import PolicyScopes
 from ..policy import Policy
 from ..logger_util import logger
 from .base import BaseTask
@@ -84,7 +84,7 @@ class AnalyzeTask(BaseTask):
         # TODO put some standard checks.
             while True:
                 logger.debug(f"Analyze task for {self.id} and scope {self.scope}")
-                active_policies = PolicyController().get_policy_instance(self.scope, self.id)
+                active_policies = self.state.agent.policy_controller.get_policy_instance(self.scope, self.id)
 
                 try:
                     if active_policies is not None:
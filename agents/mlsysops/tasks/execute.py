@@ -52,6 +52,7 @@ class ExecuteTask(BaseTask):
                         f"|1| Plan with planuid:{self.new_command['plan_uid']} executed by applying to mechanism:{self.asset_name} status:Pending")
             except Exception as e:
                 logger.error(f"Error executing command: {e}")
+                self.state.plan_registry.complete(self.plan_uid, self.asset_name, "Failed")
                 self.state.update_task_log(self.plan_uid, updates={"status": "Failed"})
                 return False
 
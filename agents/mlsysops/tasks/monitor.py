@@ -23,6 +23,36 @@ from mlsysops.data.monitor import MonitorData
 from mlsysops.logger_util import logger
 from mlsysops.controllers.telemetry import parse_interval_string
 
+_shared_telemetry_client = None
+# Last value fetched per metric, shared by the monitor tasks of the process: (fetch time, value)
+_metric_cache = {}
+
+
+def get_shared_telemetry_client():
+    """
+    Returns the MLSTelemetry client shared by the agents hosted in this process.
+    """
+    global _shared_telemetry_client
+    if _shared_telemetry_client is None:
+        _shared_telemetry_client = MLSTelemetry("monitor_task", "-")
+    return _shared_telemetry_client
+
+
+def fetch_metric(metric_name, max_age):
+    """
+    Fetches the value of a metric, reusing a value another agent of this process
+    fetched less than max_age seconds ago, so co-hosted agents scrape it once.
+    """
+    now = time.time()
+    cached = _metric_cache.get(metric_name)
+    if cached and now - cached[0] < max_age:
+        return cached[1]
+    metric_status = get_shared_telemetry_client().get_metric_value_with_label(metric_name=metric_name)
+    value = metric_status[0]['value']
+    _metric_cache[metric_name] = (now, value)
+    return value
+
+
 class MonitorTask:
     """
     Represents a task responsible for monitoring metrics, collecting telemetry data,
@@ -50,7 +80,7 @@ class MonitorTask:
         # A list of metrics that this monitor
         self.metrics_list = []
 
-        self.mlsTelemetryClient = MLSTelemetry("monitor_task","-")
+        self.mlsTelemetryClient = get_shared_telemetry_client()
 
     async def set_monitor_interval(self, new_period):
         """
@@ -122,13 +152,11 @@ class MonitorTask:
                         # logger.debug(f"Fetching telemetry for metric: {metric_name}")
                         try:
                             # Call get_metric_value_with_label for the metric
-                            metric_status = self.mlsTelemetryClient.get_metric_value_with_label(
-                                metric_name=metric_name
-                            )
+                            metric_value = fetch_metric(metric_name, self.period / 2)
                             # Add metric value to __data in the format {metric_name: value}
                             # Metric name will be the column, and its value will be the specific recorded data
                             entry = {
-                                metric_name: metric_status[0]['value'],
+                                metric_name: metric_value,
                                 "timestamp": current_time,
                                 "human_timestamp": datetime.fromtimestamp(int(current_time)).strftime('%Y-%m-%d %H:%M:%S')
                             } # TODO handle multiple values and timestamp
@@ -23,7 +23,7 @@ from ..tasks.base import BaseTask
 import time
 from ..logger_util import logger
 from ..data.state import MLSState
-from ..controllers.policy import PolicyController, PolicyScopes
+from ..controllers.policy import PolicyScopes
 import uuid
 
 class PlanTask(BaseTask):
@@ -85,7 +85,7 @@ class PlanTask(BaseTask):
             Exception: An unhandled exception will propagate if encountered within the method.
 
         """
-        active_policy = PolicyController().get_policy_instance(self.scope,self.id,self.policyName)
+        active_policy = self.state.agent.policy_controller.get_policy_instance(self.scope,self.id,self.policyName)
 
         if active_policy is not None:
 
@@ -0,0 +1,176 @@
+#  Copyright (c) 2025. MLSysOps Consortium
+#  #
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  #
+#      http://www.apache.org/licenses/LICENSE-2.0
+#  #
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import asyncio
+import json
+import os
+import random
+from collections import Counter
+
+from .data.state import MLSState
+from .events import MessageEvents
+from .logger_util import logger
+
+
+class LoopbackHub:
+    """
+    In-memory message bus that connects the agents hosted in one process.
+
+    Messages are serialised like on the wire and put in the recipient's message
+    queue after a delay drawn from [min_latency, max_latency]. A message is dropped
+    with probability loss. Counters of sent, delivered, dropped and unroutable
+    messages per event allow benchmarking fan-out and heartbeat load.
+    """
+
+    _default = None
+
+    def __init__(self, min_latency=0.0, max_latency=None, loss=0.0, seed=None):
+        self.min_latency = min_latency
+        self.max_latency = min_latency if max_latency is None else max_latency
+        self.loss = loss
+        self.random = random.Random(seed)
+        self.endpoints = {}
+        self.stats = {"sent": Counter(), "delivered": Counter(), "dropped": Counter(), "unroutable": Counter()}
+
+    @classmethod
+    def default(cls):
+        """
+        The hub shared by all loopback transports of the process, configured from
+        MLSYSOPS_LOOPBACK_LATENCY (seconds, or 'min-max') and MLSYSOPS_LOOPBACK_LOSS.
+        """
+        if cls._default is None:
+            min_latency, _, max_latency = os.getenv("MLSYSOPS_LOOPBACK_LATENCY", "0").partition("-")
+            cls._default = cls(min_latency=float(min_latency),
+                               max_latency=float(max_latency) if max_latency else None,
+                               loss=float(os.getenv("MLSYSOPS_LOOPBACK_LOSS", "0")))
+        return cls._default
+
+    def register(self, name, transport):
+        self.endpoints[name] = transport
+
+    def unregister(self, name):
+        self.endpoints.pop(name, None)
+
+    def send(self, sender, recipient, event, payload, performative="request"):
+        """
+        Schedules the delivery of a message to the recipient's transport.
+
+        Returns:
+            bool: False if the message was lost or the recipient is unknown.
+        """
+        self.stats["sent"][event] += 1
+        transport = self.endpoints.get(recipient)
+        if transport is None:
+            self.stats["unroutable"][event] += 1
+            logger.debug(f"Loopback: no agent named {recipient}, dropping {event}")
+            return False
+        if self.loss and self.random.random() < self.loss:
+            self.stats["dropped"][event] += 1
+            return False
+
+        body = json.dumps(payload)
+        delay = self.random.uniform(self.min_latency, self.max_latency) if self.max_latency else 0
+        asyncio.get_running_loop().call_later(delay, self._deliver, transport, sender, event, body, performative)
+        return True
+
+    def _deliver(self, transport, sender, event, body, performative):
+        if not transport.running:
+            self.stats["unroutable"][event] += 1
+            return
+        self.stats["delivered"][event] += 1
+        transport.receive(sender, event, json.loads(body), performative)
+
+    def reset_stats(self):
+        for counter in self.stats.values():
+            counter.clear()
+
+
+class LoopbackTransport:
+    """
+    Drop-in replacement of MLSSpade that exchanges messages through a LoopbackHub
+    instead of XMPP, so many agents can run in one process without outside services.
+
+    Received requests are put in the agent's message queue in the same form
+    MessageReceivingBehavior produces. If enabled in the configuration, heartbeats
+    (HeartbeatBehaviour) and liveness digests (LivenessDigestBehaviour) are emulated
+    so their load can be measured too.
+    """
+
+    def __init__(self, state: MLSState, message_queue: asyncio.Queue, hub: LoopbackHub = None):
+        self.state = state
+        self.message_queue = message_queue
+        self.hub = hub or LoopbackHub.default()
+        self.name = state.configuration.node
+        self.running = False
+        self.tasks = []
+
+    async def start(self, auto_register=True):
+        self.hub.register(self.name, self)
+        self.running = True
+
+        behaviours = self.state.configuration.behaviours or {}
+        heartbeat = behaviours.get("HeartbeatBehaviour", {})
+        if heartbeat.get("enabled", False):
+            self.tasks.append(asyncio.create_task(self._periodic(heartbeat.get("period", 10), self._send_heartbeat)))
+        digest = behaviours.get("LivenessDigestBehaviour", {})
+        if digest.get("enabled", False):
+            self.tasks.append(asyncio.create_task(self._periodic(digest.get("period", 30), self._send_digest)))
+        logger.debug(f"Loopback transport {self.name} started")
+
+    async def stop(self):
+        self.running = False
+        self.hub.unregister(self.name)
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+
+    async def send_message(self, recipient: str, event: str, payload: dict):
+        self.hub.send(self.name, recipient, event, payload)
+
+    def receive(self, sender, event, payload, performative):
+        if performative == "clus_hb":
+            self.state.liveness.heartbeat(sender, payload.get("interval"))
+            if self.state.agent is not None:
+                self.state.agent.agent_seen(sender)
+            return
+        self.message_queue.put_nowait({"event": event, "payload": payload})
+
+    async def _periodic(self, period, action):
+        # Spread the first run so hundreds of agents do not fire in lockstep
+        await asyncio.sleep(random.uniform(0, period))
+        while self.running:
+            action(period)
+            await asyncio.sleep(period)
+
+    def _send_heartbeat(self, period):
+        self.hub.send(self.name, self.state.configuration.cluster, "heartbeat", {"interval": period},
+                      performative="clus_hb")
+
+    def _send_digest(self, period):
+        digest = self.state.liveness.digest()
+        payload = {"cluster": self.state.configuration.cluster, "interval": period, **digest}
+        self.hub.send(self.name, self.state.configuration.continuum, MessageEvents.LIVENESS_DIGEST.value, payload)
+
+
+def create_transport(state: MLSState, message_queue: asyncio.Queue):
+    """
+    Creates the messaging transport selected by the agent configuration: 'spade'
+    (XMPP, default) or 'loopback' (in-process, for tests and scale benchmarks).
+    """
+    if state.configuration.transport == "loopback":
+        return LoopbackTransport(state, message_queue)
+
+    from .spade.mls_spade import MLSSpade
+    return MLSSpade(state, message_queue)
@@ -17,20 +17,24 @@ import asyncio
 import traceback
 
 from mlsysops.agent import MLSAgent
+from mlsysops.data.dict_diff import VersionedDict
 from mlsysops.events import MessageEvents
 from mlsysops.logger_util import logger
 
 
 class MLSNodeAgent(MLSAgent):
 
-    def __init__(self):
+    def __init__(self, node_name=None):
         # Initialize base MLS agent class
         print("In INIT OF NODE AGENT")
-        super().__init__()
+        super().__init__(node_name)
 
         # { 'app_name' : { "components" : [component_name] } }
         self.active_application = {}
 
+        # Last nodes_state entry received from the cluster and its version
+        self.nodes_state_sync = VersionedDict()
+
 
     async def run(self):
         """
@@ -49,8 +53,13 @@ class MLSNodeAgent(MLSAgent):
         fluidity_proxy_task = asyncio.create_task(self.fluidity_proxy_message_listener())
         self.running_tasks.append(fluidity_proxy_task)
 
+        # Periodically resend description and state sync as deltas
+        if self.state.configuration.description_sync_interval > 0:
+            description_sync_task = asyncio.create_task(self.description_sync_loop())
+            self.running_tasks.append(description_sync_task)
+
         # sending sync request
-        await self.send_message_to_node(self.state.configuration.cluster, MessageEvents.NODE_STATE_SYNC.value, {"node": self.state.configuration.node})
+        await self.request_state_sync()
 
         try:
             results = await asyncio.gather(*self.running_tasks, return_exceptions=True)
@@ -122,7 +131,11 @@ class MLSNodeAgent(MLSAgent):
                     await self.telemetry_controller.add_new_interval(id=self.state.configuration.cluster,new_interval=data[0]['interval'])
                 elif event == MessageEvents.NODE_STATE_SYNC.value:
                     logger.debug(f"Received NODE_STATE_SYNC msg from cluster ")
-                    for application_name, application_data in data.items():
+                    if not self.nodes_state_sync.receive(data):
+                        logger.debug(f"NODE_STATE_SYNC delta does not match version {self.nodes_state_sync.version}, requesting snapshot")
+                        await self.request_state_sync(force_snapshot=True)
+                        continue
+                    for application_name, application_data in self.nodes_state_sync.snapshot.items():
                         for component_name,_ in application_data['components'].items():
                             application_object = self.active_application.get(application_name, None)
 
@@ -138,6 +151,9 @@ class MLSNodeAgent(MLSAgent):
                                     logger.debug(
                                         f"Component {component_name} placed in existing application {application_name}")
                                     await self.application_controller.on_application_updated(application_data)
+                elif event == MessageEvents.NODE_SYSTEM_DESCRIPTION_RESYNC.value:
+                    logger.debug(f"Cluster holds description version {data.get('version')}, resending")
+                    await self.send_system_description(data.get('version'))
                 elif event == MessageEvents.MESSAGE_TO_FLUIDITY_PROXY.value:
                     # forward to fluidity proxy
                     logger.debug(f"Received message to fluidity proxy mechanism")
@@ -150,6 +166,39 @@ class MLSNodeAgent(MLSAgent):
             except Exception as e:
                 logger.error(f"Error processing message: {traceback.format_exc()}")
 
+    async def request_state_sync(self, force_snapshot=False):
+        """
+        Requests the node state from the cluster agent. The cluster answers with the
+        changed paths since the version held locally, or with a full snapshot if it
+        does not match the version it last sent.
+
+        Parameters
+        ----------
+        force_snapshot : bool, optional
+            Ask for a full snapshot regardless of the local version.
+        """
+        version = None if force_snapshot else self.nodes_state_sync.version
+        await self.send_message_to_node(self.state.configuration.cluster, MessageEvents.NODE_STATE_SYNC.value,
+                                        {"node": self.state.configuration.node, "version": version})
+
+    async def description_sync_loop(self):
+        """
+        Reloads the system description every description_sync_interval seconds and
+        sends the changed paths to the cluster agent, then asks the cluster for the
+        node state changes. Nothing is sent for an unchanged description and the
+        cluster does not answer an unchanged state.
+        """
+        while True:
+            try:
+                await asyncio.sleep(self.state.configuration.description_sync_interval)
+                self.configuration_controller.load_system_description()
+                await self.send_system_description(self.description_sync.version)
+                await self.request_state_sync()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in description sync: {e}")
+
     async def fluidity_proxy_message_listener(self):
         """
         Handles incoming messages from the fluidity proxy message queue, processes the
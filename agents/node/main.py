@@ -17,6 +17,7 @@ from __future__ import print_function
 
 import asyncio
 import os
+import socket
 
 from dotenv import load_dotenv
 
@@ -66,27 +67,49 @@ async def shutdown(signal_name, agent, all_tasks):
 
 
 
+def get_virtual_node_names():
+    """
+    Names of the logical node agents to host in this process, from VIRTUAL_NODES.
+    It is either a comma-separated list of names, or a count N that hosts
+    <NODE_NAME>-0 ... <NODE_NAME>-(N-1). Empty when not set (one agent per process).
+    """
+    virtual_nodes = os.getenv("VIRTUAL_NODES", "").strip()
+    if not virtual_nodes:
+        return []
+    if virtual_nodes.isdigit():
+        prefix = os.getenv("NODE_NAME", socket.gethostname())
+        return [f"{prefix}-{i}" for i in range(int(virtual_nodes))]
+    return [name.strip() for name in virtual_nodes.split(",") if name.strip()]
+
+
 async def main():
     """
     Entry point for the node agent program.
-    This function initializes and runs the MLS Node Agent.
+    This function initializes and runs the MLS Node Agent, or one logical node
+    agent per VIRTUAL_NODES entry. Hosted agents share the interpreter, the loaded
+    policy modules, the policy directory observer and the telemetry client, while
+    each keeps its own state and identity.
     """
     global main_task
 
     # Instantiate the MLSAgent class
-    agent = MLSNodeAgent()
+    virtual_nodes = get_virtual_node_names()
+    if virtual_nodes:
+        logger.info(f"Hosting {len(virtual_nodes)} logical node agents")
+        agents = [MLSNodeAgent(node_name) for node_name in virtual_nodes]
+    else:
+        agents = [MLSNodeAgent()]
 
     try:
         # Run the MLSAgent's main process (update with the actual method name)
-        agent_task = asyncio.create_task(agent.run())
-        main_task = agent_task
+        agent_tasks = [asyncio.create_task(agent.run()) for agent in agents]
+        main_task = asyncio.gather(*agent_tasks)
 
-        await asyncio.gather(agent_task)
+        await main_task
 
     except asyncio.CancelledError:
         logger.info("Agent stoped. Performing cleanup...")
-        if agent:
-            await agent.stop()  # Stop the agent during cleanup
+        await asyncio.gather(*(agent.stop() for agent in agents))  # Stop the agents during cleanup
     except Exception as e:
         logger.error(f"An error occurred in the main task: {e}")
 
@@ -25,7 +25,8 @@ setup(
         "PyYAML==6.0.2",
         "redis",
         "ruamel.yaml",
-        "watchdog"
+        "watchdog",
+        "deepdiff"
     ],
     package_data={
         "mlsysops": ["templates/*.j2","policies/*.py"],
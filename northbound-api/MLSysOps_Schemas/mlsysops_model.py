@@ -592,6 +592,20 @@ class Container(BaseModel):
     )
 
 
+class Standby(BaseModel):
+    enabled: Optional[bool] = Field(
+        None, description='Keep a warm standby replica. Default to false.'
+    )
+    cpu: Optional[str] = Field(
+        None,
+        description="CPU request of the standby replica (e.g., 100m). It is resized to the component's request on promotion.",
+    )
+    memory: Optional[str] = Field(
+        None,
+        description="Memory request of the standby replica (e.g., 128Mi). Default to the component's request.",
+    )
+
+
 class Component(BaseModel):
     metadata: Metadata
     node_placement: Optional[NodePlacement] = None
@@ -622,6 +636,10 @@ class Component(BaseModel):
         None,
         description='This property indicates whether the component can be accessed outside of its cluster.',
     )
+    standby: Optional[Standby] = Field(
+        None,
+        description="Warm standby replica for latency-critical components. If enabled, a low-resource replica is kept on a backup node chosen by the policy, outside of the component's service endpoints. A move or failover to that node promotes the replica instead of starting a new one.",
+    )
     host_network: Optional[bool] = Field(
         None,
         description="Host networking requested for this component. Use the host's network namespace. If this option is set, the ports that will be used must be specified. Default to false.",
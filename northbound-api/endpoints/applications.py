@@ -308,8 +308,7 @@ async def deploy_app(request: Request, payload: MlsysopsappSchema) -> Dict[str,
         encoded_clean = _remove_none_fields(encoded)
         payload_json = json.dumps(encoded_clean)
 
-        redis_mgr.push("valid_descriptions_queue", payload_json)
-        redis_mgr.update_dict_value("system_app_hash", app_id, "Queued")
+        redis_mgr.stream_add(redis_mgr.stream_name, payload_json, "system_app_hash", app_id, "Queued")
         redis_mgr.update_dict_value("app_data_hash", app_id, payload_json)
         redis_mgr.add_components(app_id, comp_names)
 
@@ -497,12 +496,11 @@ async def update_app_status(request: Request,app_id: str):
             raise HTTPException(status_code=404, detail=f"App ID '{app_id}' not found in the system.")
 
         # If the app_id exists, update the status to 'removed'
-        redis_mgr.update_dict_value('system_app_hash', app_id, "To_be_removed")
         redis_mgr.remove_key("app_data_hash", app_id)
         redis_mgr.delete_component(app_id)
         redis_mgr.delete_app_components_from_hash("component_metrics", app_id)
         json_data = {"MLSysOpsApp": {"name": app_id}}
-        redis_mgr.push('valid_descriptions_queue', json.dumps(json_data))
+        redis_mgr.stream_add(redis_mgr.stream_name, json.dumps(json_data), 'system_app_hash', app_id, "To_be_removed")
         return {"app_id": app_id, "message": "Application status updated to 'To_be_removed'."}
 
     except Exception as e:
@@ -139,9 +139,8 @@ async def get_cluster_state(app_id: str):
             raise HTTPException(status_code=404, detail=f"App ID '{app_id}' not found in the system.")
 
         # If the app_id exists, update the status to 'removed'
-        r.update_dict_value('system_app_hash', app_id, "To_be_removed")
         json_data = {"MLSysOpsApplication": {"name": app_id}}
-        r.push('valid_descriptions_queue', json.dumps(json_data))
+        r.stream_add(r.stream_name, json.dumps(json_data), 'system_app_hash', app_id, "To_be_removed")
         return {"app_id": app_id, "message": "Application status updated to 'To_be_removed'."}
 
     except Exception as e:
@@ -174,9 +173,8 @@ async def get_dc_state(dc_id: str):
             raise HTTPException(status_code=404, detail=f"App ID '{dc_id}' not found in the system.")
 
         # If the app_id exists, update the status to 'removed'
-        r.update_dict_value('system_app_hash', dc_id, "To_be_removed")
         json_data = {"MLSysOpsApplication": {"name": dc_id}}
-        r.push('valid_descriptions_queue', json.dumps(json_data))
+        r.stream_add(r.stream_name, json.dumps(json_data), 'system_app_hash', dc_id, "To_be_removed")
         return {"app_id": dc_id, "message": "Application status updated to 'To_be_removed'."}
 
     except Exception as e:
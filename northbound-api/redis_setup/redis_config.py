@@ -10,3 +10,4 @@ redis_channel_name = os.getenv('REDIS_CHANNEL_NAME', 'my_channel')  # Default ch
 redis_dict_name = os.getenv('REDIS_DICT_NAME', 'system_app_hash')  # Default dictionary name
 redis_dict2_name = os.getenv('REDIS_DICT2_NAME', 'component_metrics')  # Components hash
 redis_ml_queue = os.getenv('REDIS_ML_QUEUE_NAME', 'ml_deployment_queue')  # Default channel name ""
+redis_stream_name = os.getenv('REDIS_STREAM_NAME', 'valid_descriptions_stream')  # Default intake stream
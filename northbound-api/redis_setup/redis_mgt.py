@@ -3,6 +3,17 @@ import json
 import time
 from redis_setup import redis_config as rc
 
+# Appends the components not in the list yet. KEYS: list - ARGV: component ids - returns the added ids
+_ADD_UNIQUE_TO_LIST_LUA = """
+local added = {}
+for i = 1, #ARGV do
+    if not redis.call('LPOS', KEYS[1], ARGV[i]) then
+        redis.call('RPUSH', KEYS[1], ARGV[i])
+        table.insert(added, ARGV[i])
+    end
+end
+return added
+"""
 
 class RedisManager:
     def __init__(self):
@@ -15,10 +26,12 @@ class RedisManager:
         self.redis_conn = None
         self.redis_password = rc.redis_password
         self.q_name = rc.redis_queue_name
+        self.stream_name = rc.redis_stream_name
         self.ml_q = rc.redis_ml_queue
         self.channel_name = rc.redis_channel_name  # Channel name for Pub/Sub
         self.dict_name = rc.redis_dict_name  # Dictionary name (Redis hash map)
         self.dict2_name = rc.redis_dict2_name
+        self._add_unique_to_list = None
 
     def connect(self):
         """
@@ -28,6 +41,7 @@ class RedisManager:
             self.redis_conn = redis.Redis(host=self.host, port=self.port, db=self.db, password=self.redis_password)
             if self.redis_conn.ping():
                 print(f"Successfully connected to Redis at {self.host}.")
+                self._add_unique_to_list = self.redis_conn.register_script(_ADD_UNIQUE_TO_LIST_LUA)
             else:
                 raise Exception("Could not connect to Redis.")
         except redis.ConnectionError as e:
@@ -59,6 +73,23 @@ class RedisManager:
         while not self.is_empty(q_name):
             self.pop(q_name)
 
+    # --- Stream Methods ---
+    def stream_add(self, stream_name, value, dict_name=None, key=None, status=None):
+        """
+        Appends a description to the agents' intake stream. If a status is given, it is
+        written to dict_name in the same MULTI transaction, so the request and its status
+        are never observed separately.
+        """
+        if self.redis_conn:
+            pipe = self.redis_conn.pipeline(transaction=True)
+            pipe.xadd(stream_name, {"data": value})
+            if dict_name and key and status:
+                pipe.hset(dict_name, key, status)
+            entry_id = pipe.execute()[0]
+            print(f"Entry '{entry_id.decode()}' added to the stream '{stream_name}'.")
+            return entry_id.decode()
+        print("Redis connection not established.")
+
     # --- Pub/Sub Methods ---
     def pub_ping(self, message):
         if self.redis_conn:
@@ -106,8 +137,7 @@ class RedisManager:
     # --- JSON Operations ---
     def json_set(self, key, path, json_data):
         try:
-            if not self.redis_conn.execute_command("JSON.GET", key, "$"):
-                self.redis_conn.execute_command("JSON.SET", key, path, json_data)
+            if self.redis_conn.execute_command("JSON.SET", key, path, json_data, "NX"):
                 return f"JSON data created at key: {key}, path: {path}"
             return self.json_update(key, path, json_data)
         except redis.RedisError as e:
@@ -117,17 +147,21 @@ class RedisManager:
         return self.redis_conn.execute_command("JSON.GET", key, path) if self.redis_conn else None
 
     def json_update(self, key, path, json_data):
+        """
+        Replaces the top-level fields of the existing document with those of json_data,
+        one JSON.SET per field in a single MULTI instead of rewriting the whole document.
+        """
         try:
-            existing_data = self.json_get(key)
-            if not existing_data:
+            if not self.redis_conn.exists(key):
                 return f"No existing data for key: {key}."
-
-            existing_dict = json.loads(existing_data)
             if isinstance(json_data, str):
                 json_data = json.loads(json_data)
 
-            existing_dict.update(json_data)
-            self.redis_conn.execute_command("JSON.SET", key, path, json.dumps(existing_dict))
+            base = "$" if path in ("$", ".") else path
+            pipe = self.redis_conn.pipeline(transaction=True)
+            for field, value in json_data.items():
+                pipe.execute_command("JSON.SET", key, f"{base}[{json.dumps(field)}]", json.dumps(value))
+            pipe.execute()
             return f"JSON updated at key: {key}, path: {path}"
         except Exception as e:
             return f"Error updating JSON: {e}"
@@ -137,9 +171,11 @@ class RedisManager:
 
     # --- Component Management ---
     def add_components(self, app_id, component_ids):
-        if self.redis_conn and isinstance(component_ids, list):
-            for component_id in component_ids:
-                self.redis_conn.rpush(f"app_components_list:{app_id}", component_id)
+        """Appends the components not listed yet in one round-trip and returns them."""
+        if self.redis_conn and isinstance(component_ids, list) and component_ids:
+            added = self._add_unique_to_list(keys=[f"app_components_list:{app_id}"], args=component_ids)
+            return [component_id.decode() for component_id in added]
+        return []
 
     def get_components(self, app_id):
         return [c.decode() for c in self.redis_conn.lrange(f"app_components_list:{app_id}", 0, -1)] if self.redis_conn else []
@@ -165,8 +201,10 @@ class RedisManager:
 
     # --- Infrastructure Management ---
     def add_cluster(self, cluster_id, nodes):
-        for node in nodes:
-            self.redis_conn.sadd(f"MLSysOpsCluster:{cluster_id}:Nodes", node)
+        """Adds the nodes in one round-trip and returns how many were new."""
+        if not self.redis_conn or not nodes:
+            return 0
+        return self.redis_conn.sadd(f"MLSysOpsCluster:{cluster_id}:Nodes", *nodes)
 
     def list_clusters_in_continuum(self, continuum_id):
         return [c.decode() for c in self.redis_conn.smembers(f"MLSysOpsContinuum:{continuum_id}:Clusters")]